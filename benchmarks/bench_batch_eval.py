@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_batch_eval.py - Évaluation position par position contre echecs.batch (NumPy).
+
+Les positions viennent de parties aléatoires à graine fixe. La boucle de
+référence parcourt Board.board case par case (matériel, pièce-case, mobilité
+approchée via is_square_attacked) ; la version par lot encode les positions
+puis calcule les mêmes termes sur tout le tableau. Les deux résultats sont
+comparés avant d'afficher l'accélération.
+Usage : python benchmarks/bench_batch_eval.py [positions]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs import batch  # noqa: E402
+from echecs.engine import BLACK, WHITE, Board  # noqa: E402
+from echecs.evaluation import PIECE_VALUES, PST  # noqa: E402
+
+
+def make_positions(n, seed=11):
+    rng = random.Random(seed)
+    positions, b = [], Board()
+    while len(positions) < n:
+        moves = b.generate_moves(legal=True)
+        if not moves or len(b.history) >= 120:
+            b = Board()
+            continue
+        b.push_move(rng.choice(moves))
+        positions.append(b.copy())
+    return positions
+
+
+def loop_eval(b):
+    score = 0
+    for r in range(8):
+        for c in range(8):
+            p = b.board[r][c]
+            if p:
+                v = PIECE_VALUES[p.upper()] + PST[p][r * 8 + c]
+                score += v if p.isupper() else -v
+    return score
+
+
+def loop_mobility(b):
+    counts = {WHITE: 0, BLACK: 0}
+    for r in range(8):
+        for c in range(8):
+            p = b.board[r][c]
+            for color in (WHITE, BLACK):
+                if (p is None or b.piece_color(p) != color) and b.is_square_attacked((r, c), color):
+                    counts[color] += 1
+    return counts[WHITE] - counts[BLACK]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    positions = make_positions(n)
+
+    t0 = time.perf_counter()
+    ref_eval = [loop_eval(b) for b in positions]
+    t_loop_eval = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ref_mob = [loop_mobility(b) for b in positions]
+    t_loop_mob = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    planes = batch.encode(positions)
+    t_encode = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    vec_eval = batch.evaluate(planes)
+    t_vec_eval = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    vec_mob = batch.mobility(planes)
+    t_vec_mob = time.perf_counter() - t0
+
+    assert vec_eval.tolist() == ref_eval, "évaluation divergente"
+    assert vec_mob.tolist() == ref_mob, "mobilité divergente"
+
+    def rate(k, t): return f"{k / t:>12,.0f} pos/s"
+    print(f"{n} positions")
+    print(f"encode (N, 12, 64)            : {t_encode * 1000:8.1f} ms  {rate(n, t_encode)}")
+    print(f"matériel + PST   boucle       : {t_loop_eval * 1000:8.1f} ms  {rate(n, t_loop_eval)}")
+    print(f"                 NumPy        : {t_vec_eval * 1000:8.1f} ms  {rate(n, t_vec_eval)}"
+          f"  x{t_loop_eval / t_vec_eval:.0f} (x{t_loop_eval / (t_vec_eval + t_encode):.1f} encodage compris)")
+    print(f"mobilité approchée boucle     : {t_loop_mob * 1000:8.1f} ms  {rate(n, t_loop_mob)}")
+    print(f"                   NumPy      : {t_vec_mob * 1000:8.1f} ms  {rate(n, t_vec_mob)}"
+          f"  x{t_loop_mob / t_vec_mob:.0f} (x{t_loop_mob / (t_vec_mob + t_encode):.1f} encodage compris)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_game_status.py - Coût de Board.game_status() après chaque demi-coup.
+
+Des parties aléatoires à graine fixe sont rejouées deux fois. La référence
+refait tout à chaque appel (génération complète des coups légaux, puis
+comptage des répétitions sur tout l'historique) ; game_status() s'arrête au
+premier coup légal, mémorise mat et pat par clé de position et lit le compte
+de répétitions tenu à jour par push_move / undo_move. Les deux doivent donner
+le même résultat partout.
+Usage : python benchmarks/bench_game_status.py [parties] [demi-coups]
+"""
+import collections
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs import engine  # noqa: E402
+from echecs.engine import Board  # noqa: E402
+
+
+def status_from_scratch(b: Board):
+    moves = b.generate_moves(legal=True)
+    if not moves:
+        return ('checkmate', b._opponent(b.turn)) if b.king_in_check(b.turn) else ('stalemate', None)
+    if b.halfmove_clock >= 100: return ('draw', None)
+    if collections.Counter(b.hash_history)[b.hash] >= 3: return ('draw', None)
+    return ('ongoing', None)
+
+
+def make_games(n_games, n_plies, seed=11):
+    rng = random.Random(seed)
+    games = []
+    for _ in range(n_games):
+        b, moves = Board(), []
+        for _ in range(n_plies):
+            legal = b.generate_moves(legal=True)
+            if not legal: break
+            m = rng.choice(legal)
+            moves.append(m.uci())
+            b.push_move(m)
+        games.append(moves)
+    return games
+
+
+def run(games, status):
+    results, elapsed, calls = [], 0.0, 0
+    for moves in games:
+        b = Board()
+        for uci in moves:
+            b.push_move(b.find_move_uci(uci))
+            t0 = time.perf_counter()
+            results.append(status(b))
+            elapsed += time.perf_counter() - t0
+            calls += 1
+    return results, calls, elapsed
+
+
+def main():
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    n_plies = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    games = make_games(n_games, n_plies)
+    ref, n, t_ref = run(games, status_from_scratch)
+    print(f"référence        : {n} appels en {t_ref:.2f} s -> {t_ref / n * 1e6:.1f} µs/appel")
+    engine._TERMINAL_CACHE.clear()
+    new, _, t_new = run(games, Board.game_status)
+    print(f"game_status      : {n} appels en {t_new:.2f} s -> {t_new / n * 1e6:.1f} µs/appel")
+    _, _, t_warm = run(games, Board.game_status)
+    print(f"  (cache chaud)  : {t_warm / n * 1e6:.1f} µs/appel")
+    assert new == ref, "résultats différents"
+    print(f"Accélération     : x{t_ref / t_new:.1f}")
+
+
+if __name__ == '__main__':
+    main()
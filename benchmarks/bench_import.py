@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_import.py - Temps de démarrage à froid : moteur seul vs application Tk.
+Chaque import est mesuré dans un interpréteur neuf (médiane sur N lancements).
+Usage : python benchmarks/bench_import.py [N]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("interpréteur nu", "pass"),
+    ("moteur (echecs.engine)", "import echecs.engine; echecs.engine.Board()"),
+    ("application (main)", "import main; main.Board()"),
+]
+
+
+def time_import(stmt: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-S", "-c", f"import sys; sys.path.insert(0, {ROOT!r}); {stmt}"],
+                       check=True, cwd=ROOT)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    results = {label: time_import(stmt, runs) for label, stmt in CASES}
+    base = results["interpréteur nu"]
+    for label, t in results.items():
+        print(f"{label:<28} {t * 1000:8.1f} ms  (+{(t - base) * 1000:6.1f} ms)")
+    gain = results["application (main)"] - results["moteur (echecs.engine)"]
+    print(f"\nGain au démarrage pour un consommateur moteur seul : {gain * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
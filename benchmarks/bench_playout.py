@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_playout.py - Débit des parties aléatoires (Board.playout) et de l'analyse Monte-Carlo.
+
+Les mêmes parties à graines fixes sont réparties sur 1, 2, 4... processus
+(run_playouts) ; on rapporte parties/s, demi-coups/s et pic de mémoire
+résidente par processus, et on vérifie que les résultats ne dépendent pas du
+nombre de processus (test de charge du générateur de coups). Suit le débit de
+MonteCarloSearch (itérations/s) sur la position initiale.
+Usage : python benchmarks/bench_playout.py [parties] [processus max] [itérations MCTS]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs.engine import Board  # noqa: E402
+from echecs.mcts import MonteCarloSearch, run_playouts  # noqa: E402
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    print(f"{games} parties aléatoires depuis la position initiale ({os.cpu_count()} cœurs)")
+    reference = None
+    workers = 1
+    while workers <= max_workers:
+        r = run_playouts(Board(), games, workers)
+        rss = [kb for kb in r['max_rss_kb'].values() if kb is not None]
+        mem = f"{max(rss) / 1024:.1f} Mo max par processus" if rss else "mémoire non mesurée"
+        print(f"  {workers:2d} processus : {r['games_per_s']:7.1f} parties/s, {r['plies_per_s']:9.0f} demi-coups/s, "
+              f"{mem}  ({r['plies'] / games:.0f} demi-coups par partie)")
+        if reference is None:
+            reference = r['results']
+            print(f"     résultats : {dict(sorted(reference.items()))}")
+        elif r['results'] != reference:
+            print(f"     ÉCHEC : résultats différents {r['results']}")
+            sys.exit(1)
+        workers *= 2
+    info = MonteCarloSearch(Board(), seed=0).iterate(iterations)
+    best = info['lines'][0][1][0].uci() if info['lines'] else '-'
+    print(f"MCTS : {info['nodes']} itérations en {info['elapsed']:.1f} s ({info['nps']} it/s, "
+          f"{info['plies'] / max(info['elapsed'], 1e-9):.0f} demi-coups/s), coup {best}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_ponder.py - Gain de la réflexion sur le temps adverse (ponder).
+
+Un EnginePlayer à profondeur fixe affronte un adversaire qui joue le meilleur
+coup d'une recherche à profondeur 2 puis « réfléchit » (attend) un temps fixe,
+comme un humain pendant lequel la pendule tourne. Les mêmes parties sont
+jouées avec et sans ponder ; on compare le temps pris par le moteur sur sa
+propre pendule et on rapporte le taux de ponder hit et le temps de recherche
+déjà fait au moment des hits.
+Usage : python benchmarks/bench_ponder.py [coups du moteur] [profondeur] [s de réflexion adverse]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs.engine import Board  # noqa: E402
+from echecs.search import EnginePlayer, choose_move  # noqa: E402
+
+START_FENS = (
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+)
+MAX_MOVE_TIME = 120.0
+
+
+def play(ponder: bool, n_moves: int, depth: int, human_time: float):
+    engine = EnginePlayer(max_depth=depth, ponder=ponder)
+    times = []
+    for fen in START_FENS:
+        board = Board(fen)
+        for _ in range(n_moves):
+            t0 = time.perf_counter()
+            m = engine.think(board, MAX_MOVE_TIME)
+            times.append(time.perf_counter() - t0)
+            if m is None: break
+            board.push_move(m)
+            engine.ponder(board)
+            if board.game_status()[0] != 'ongoing': break
+            t0 = time.perf_counter()
+            reply = choose_move(board, depth=2)
+            time.sleep(max(0.0, human_time - (time.perf_counter() - t0)))
+            if reply is None: break
+            board.push_move(reply)
+            if board.game_status()[0] != 'ongoing': break
+        engine.stop_pondering()
+    return times, engine.stats()
+
+
+def main():
+    n_moves = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    human_time = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    for ponder in (False, True):
+        times, st = play(ponder, n_moves, depth, human_time)
+        line = (f"{'avec ponder' if ponder else 'sans ponder'} : {len(times)} coups, "
+                f"{sum(times):.1f} s à la pendule du moteur ({sum(times) / max(len(times), 1):.2f} s par coup)")
+        if ponder:
+            line += (f", ponder hit {st['hits']}/{st['ponders']} ({st['hit_rate']:.0%}), "
+                     f"{st['time_saved']:.1f} s de recherche gagnés "
+                     f"({st['time_saved'] / max(st['hits'], 1):.2f} s par hit)")
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_positions.py - Navigation dans l'historique de parties sauvegardées.
+
+Simule un utilisateur qui clique au hasard dans l'historique de plusieurs
+parties (TreeviewHistory) : chaque clic reconstruit le plateau au demi-coup
+choisi, avec la liste des coups légaux et le statut de la partie, et la liste
+des coups est réaffichée en notation. Référence : GameRecord.board() plus
+génération des coups et move_to_san ; comparé à PositionGraph.replay().
+Usage : python benchmarks/bench_positions.py [parties] [clics]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs.engine import Board  # noqa: E402
+from echecs.pgn import move_to_san  # noqa: E402
+from echecs.positions import PositionGraph  # noqa: E402
+
+
+def make_records(n_games, n_plies=80, seed=5):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(n_games):
+        b = Board()
+        for _ in range(n_plies):
+            legal = b.generate_moves(legal=True)
+            if not legal: break
+            b.push_move(rng.choice(legal))
+        records.append(b.record())
+    return records
+
+
+def clicks(records, n_clicks, seed=9):
+    rng = random.Random(seed)
+    for _ in range(n_clicks):
+        r = rng.choice(records)
+        yield r, rng.randint(1, len(r))
+
+
+def run_baseline(records, n_clicks):
+    t0 = time.perf_counter()
+    for record, plies in clicks(records, n_clicks):
+        board = record.board(plies)
+        replay = record.board(0)
+        sans = []
+        for m, _ in board.history:
+            sans.append(move_to_san(replay, m))
+            replay.push_move(m)
+        board.generate_moves(legal=True)
+        board.game_status()
+    return time.perf_counter() - t0
+
+
+def run_graph(records, n_clicks, graph):
+    t0 = time.perf_counter()
+    for record, plies in clicks(records, n_clicks):
+        board, sans = graph.replay(record, plies)
+        graph.legal_moves(board)
+        graph.status(board)
+    return time.perf_counter() - t0
+
+
+def main():
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    n_clicks = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    records = make_records(n_games)
+    t_ref = run_baseline(records, n_clicks)
+    print(f"reconstruction complète : {t_ref / n_clicks * 1000:7.1f} ms par clic")
+    graph = PositionGraph()
+    t_cold = run_graph(records, n_clicks, graph)
+    print(f"graphe (1er passage)    : {t_cold / n_clicks * 1000:7.1f} ms par clic")
+    t_warm = run_graph(records, n_clicks, graph)
+    st = graph.stats()
+    print(f"graphe (positions vues) : {t_warm / n_clicks * 1000:7.1f} ms par clic "
+          f"({st['nodes']} nœuds, {st['bytes'] / 1e6:.1f} Mo estimés) -> x{t_ref / t_warm:.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_quiesce.py - Nœuds de la recherche de calme sur des positions tactiques.
+
+Compare, à profondeur fixe, l'ancienne recherche de calme (génération
+complète filtrée sur les prises, toutes les prises essayées) à la version
+actuelle (Board.generate_captures, prises perdantes écartées par Board.see).
+Usage : python benchmarks/bench_quiesce.py [profondeur]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs.engine import Board  # noqa: E402
+from echecs.search import Search  # noqa: E402
+
+TACTICAL_FENS = (
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "r2q1rk1/ppp2ppp/2np1n2/2b1p1B1/2B1P1b1/2NP1N2/PPP2PPP/R2Q1RK1 w - - 6 8",
+    "1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1",
+    "r1b1k2r/ppppnppp/2n2q2/2b5/3NP3/2P1B3/PP3PPP/RN1QKB1R w KQkq - 0 7",
+    "2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - - 0 1",
+)
+
+
+class LegacySearch(Search):
+    def _quiesce(self, alpha: int, beta: int) -> int:
+        self._check_stop()
+        stand = self._evaluate()
+        if stand >= beta: return stand
+        if stand > alpha: alpha = stand
+        captures = [m for m in self.board.generate_moves(legal=True) if m.captured or m.promotion]
+        for m in self._ordered(captures, None):
+            self.board.push_move(m)
+            score = -self._quiesce(-beta, -alpha)
+            self.board.undo_move()
+            if score >= beta: return score
+            if score > alpha: alpha = score
+        return alpha
+
+
+def run(cls, depth):
+    nodes, t0, best = 0, time.perf_counter(), []
+    for fen in TACTICAL_FENS:
+        info = cls(Board(fen)).iterate(max_depth=depth)
+        nodes += info['nodes']
+        best.append(info['lines'][0][1][0].uci())
+    return nodes, time.perf_counter() - t0, best
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    n0, t0, best0 = run(LegacySearch, depth)
+    print(f"génération complète, sans SEE : {n0:8d} nœuds en {t0:6.2f} s")
+    n1, t1, best1 = run(Search, depth)
+    print(f"prises seules + SEE           : {n1:8d} nœuds en {t1:6.2f} s")
+    print(f"nœuds x{n0 / n1:.1f} moins, temps x{t0 / t1:.1f} ; meilleurs coups identiques : "
+          f"{sum(a == b for a, b in zip(best0, best1))}/{len(best0)}")
+
+
+if __name__ == '__main__':
+    main()
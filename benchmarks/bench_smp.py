@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_smp.py - Passage à l'échelle de la recherche Lazy SMP (echecs.smp).
+
+Pour chaque nombre de processus, recherche jusqu'à une profondeur fixe sur
+quelques positions de test : temps avant la première itération terminée à
+chaque profondeur (time-to-depth), nœuds par seconde cumulés sur tous les
+processus, et accélération par rapport à un seul processus.
+Usage : python benchmarks/bench_smp.py [profondeur] [processus, ex. 1,2,4,8,16]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs.engine import Board  # noqa: E402
+from echecs.smp import parallel_search  # noqa: E402
+
+POSITIONS = (
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+)
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    counts = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 2, 4, 8, 16]
+    print(f"{os.cpu_count()} cœurs, profondeur {depth}")
+    print("processus | " + " | ".join(f"{f't(d{d})':>6}" for d in range(1, depth + 1)) + " |   nœuds/s | accél.")
+    base = None
+    for n in counts:
+        totals = [0.0] * depth
+        nodes = elapsed = 0.0
+        for fen in POSITIONS:
+            info = parallel_search(Board(fen), depth, workers=n)
+            for d in range(1, depth + 1):
+                totals[d - 1] += info['depth_times'].get(d, info['elapsed'])
+            nodes += info['nodes']
+            elapsed += info['elapsed']
+        if base is None: base = totals[-1]
+        print(f"{n:9d} | " + " | ".join(f"{t:6.2f}" for t in totals)
+              + f" | {nodes / elapsed:9,.0f} | x{base / totals[-1]:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_spectators.py - Diffusion LAN vers des centaines de spectateurs (localhost).
+
+Un SpectatorHub publie une partie (coups + pendules) ; les spectateurs rapides
+sont lus par un seul sélecteur, les lents ne lisent jamais (petit tampon de
+réception) et doivent être rattrapés puis déconnectés sans freiner les autres.
+Des retardataires se connectent en cours de partie et doivent recevoir un
+instantané SNAP avant le flux.
+Usage : python benchmarks/bench_spectators.py [spectateurs] [messages]
+"""
+import os
+import selectors
+import socket
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs.network import SpectatorHub  # noqa: E402
+
+SLOW_FRACTION = 0.05
+LATE_JOINERS = 20
+PAD = 'x' * 120  # charge utile réaliste (coup + pendules + marge)
+
+
+def connect(port, rcvbuf=None):
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if rcvbuf: s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    s.connect(('127.0.0.1', port))
+    s.setblocking(False)
+    return s
+
+
+def main():
+    n_viewers = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    n_messages = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    hub = SpectatorHub(host='127.0.0.1', port=0, max_pending=16 * 1024).start()
+    hub.set_snapshot("SNAP:rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1|300|300")
+
+    n_slow = int(n_viewers * SLOW_FRACTION)
+    fast = [connect(hub.port) for _ in range(n_viewers - n_slow)]
+    slow = [connect(hub.port, rcvbuf=4096) for _ in range(n_slow)]
+    while hub.viewer_count() < n_viewers: time.sleep(0.01)
+
+    sel = selectors.DefaultSelector()
+    buffers, received = {}, {}
+    for s in fast:
+        sel.register(s, selectors.EVENT_READ)
+        buffers[s] = b''
+    late, first_lines = [], {}
+    publish_time, delivered = {}, {}
+
+    def pump(timeout=0.0):
+        for key, _ in sel.select(timeout):
+            s = key.fileobj
+            try:
+                data = s.recv(65536)
+            except BlockingIOError:
+                continue
+            if not data:
+                sel.unregister(s)
+                continue
+            buffers[s] += data
+            *lines, buffers[s] = buffers[s].split(b'\n')
+            now = time.perf_counter()
+            for line in lines:
+                if s not in first_lines: first_lines[s] = line
+                if line.startswith(b'MOVE '):
+                    seq = int(line.split()[1])
+                    received[seq] = received.get(seq, 0) + 1
+                    delivered[seq] = now
+
+    t0 = time.perf_counter()
+    for seq in range(n_messages):
+        hub.publish(f"MOVE {seq} {PAD}", snapshot=f"SNAP:fen-{seq}|300|300")
+        publish_time[seq] = time.perf_counter()
+        hub.publish(f"CLOCK:{300 - seq % 300}:{300 - seq % 300}")
+        if seq == n_messages // 2:
+            for _ in range(LATE_JOINERS):
+                s = connect(hub.port)
+                late.append(s)
+                buffers[s] = b''
+                sel.register(s, selectors.EVENT_READ)
+        pump()
+    deadline = time.perf_counter() + 10
+    expected = len(fast)
+    while time.perf_counter() < deadline and received.get(n_messages - 1, 0) < expected + len(late):
+        pump(0.05)
+    elapsed = time.perf_counter() - t0
+
+    complete = [seq for seq in range(n_messages) if received.get(seq, 0) >= expected]
+    latencies = [delivered[seq] - publish_time[seq] for seq in complete]
+    late_ok = sum(1 for s in late if first_lines.get(s, b'').startswith(b'SNAP:'))
+    lines_out = 2 * n_messages * (n_viewers + LATE_JOINERS / 2)
+    print(f"spectateurs : {n_viewers} ({n_slow} lents) + {LATE_JOINERS} retardataires, {n_messages} coups")
+    print(f"durée totale          : {elapsed:.2f} s  (~{lines_out / elapsed:,.0f} lignes diffusées/s)")
+    print(f"coups reçus par tous  : {len(complete)}/{n_messages}")
+    if latencies:
+        latencies.sort()
+        print(f"latence de diffusion  : p50 {statistics.median(latencies) * 1000:.2f} ms, "
+              f"p99 {latencies[int(0.99 * (len(latencies) - 1))] * 1000:.2f} ms")
+    print(f"retardataires avec SNAP en tête : {late_ok}/{len(late)}")
+    print(f"rattrapages : {hub.stats['catchups']}, déconnectés (trop lents) : {hub.stats['dropped']}")
+    hub.close()
+    for s in fast + slow + late: s.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_validation.py - Validations de coups par seconde sur un cœur (hôte multi-parties).
+
+Des parties aléatoires à graine fixe sont rejouées en parallèle : à chaque tour,
+la rafale contient le coup suivant de chaque partie plus quelques coups
+illégaux. On compare Board.make_move_uci (génération complète à chaque coup)
+et MoveValidator.apply_batch (dictionnaire UCI + cache de positions).
+Usage : python benchmarks/bench_validation.py [parties] [demi-coups]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs.engine import Board  # noqa: E402
+from echecs.validation import MoveValidator  # noqa: E402
+
+
+def make_games(n_games, n_plies, seed=7):
+    rng = random.Random(seed)
+    games = []
+    for g in range(n_games):
+        # Les parties partagent souvent leurs premiers coups, comme sur un vrai serveur
+        b, moves = Board(), []
+        opening_rng = random.Random(g % 8)
+        for ply in range(n_plies):
+            legal = b.generate_moves(legal=True)
+            if not legal: break
+            m = (opening_rng if ply < 6 else rng).choice(legal)
+            moves.append(m.uci())
+            b.push_move(m)
+        games.append(moves)
+    return games
+
+
+def bursts(games, illegal_every=10):
+    for ply in range(max(len(g) for g in games)):
+        burst = [(gid, moves[ply]) for gid, moves in enumerate(games) if ply < len(moves)]
+        burst += [(gid, 'a1a8') for gid in range(0, len(games), illegal_every)]
+        yield burst
+
+
+def run_baseline(games):
+    boards = {gid: Board() for gid in range(len(games))}
+    n, t0 = 0, time.perf_counter()
+    for burst in bursts(games):
+        for gid, uci in burst:
+            boards[gid].make_move_uci(uci)
+            n += 1
+    return n, time.perf_counter() - t0
+
+
+def run_cached(games):
+    boards = {gid: Board() for gid in range(len(games))}
+    validator = MoveValidator()
+    n, t0 = 0, time.perf_counter()
+    for burst in bursts(games):
+        validator.apply_batch(boards, burst)
+        n += len(burst)
+    return n, time.perf_counter() - t0, validator.stats()
+
+
+def main():
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_plies = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    games = make_games(n_games, n_plies)
+    n, t = run_baseline(games)
+    print(f"make_move_uci        : {n} validations en {t:.2f} s -> {n / t:,.0f} /s")
+    n2, t2, st = run_cached(games)
+    print(f"MoveValidator (lot)  : {n2} validations en {t2:.2f} s -> {n2 / t2:,.0f} /s "
+          f"(cache {st['entries']} positions, {st['hit_rate']:.0%} de succès)")
+    print(f"Accélération         : x{(n2 / t2) / (n / t):.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+perft.py - Vérification du générateur de coups par comptage de feuilles (perft).
+
+Deux suites : positions classiques (dont Kiwipete) et positions Chess960 avec
+droits de roque Shredder-FEN, comparées aux valeurs de référence publiées.
+Le temps de la suite classique sert aussi à s'assurer que le roque généralisé
+ne ralentit pas les parties standard.
+Usage : python benchmarks/perft.py [profondeur max, défaut 3]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs.engine import Board  # noqa: E402
+
+STANDARD = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", [20, 400, 8902, 197281]),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467]),
+]
+
+CHESS960 = [
+    ("bqnb1rkr/pp3ppp/3ppn2/2p5/5P2/P2P4/NPP1P1PP/BQ1BNRKR w HFhf - 2 9", [21, 528, 12189, 326672]),
+    ("2nnrbkr/p1qppppp/8/1ppb4/6PP/3PP3/PPP2P2/BQNNRBKR w HEhe - 1 9", [21, 807, 18002, 667366]),
+    ("b1q1rrkb/pppppppp/3nn3/8/P7/1PPP4/4PPPP/BQNNRKRB w GE - 1 9", [20, 479, 10471, 273318]),
+    ("qbbnnrkr/2pp2pp/p7/1p2pp2/8/P3PP2/1PPP1KPP/QBBNNR1R w hf - 0 9", [22, 593, 13440, 382958]),
+    ("1nbbnrkr/p1p1ppp1/3p4/1p3P1p/3Pq2P/8/PPP1P1P1/QNBBNRKR w HFhf - 0 9", [28, 1120, 31058, 1171749]),
+]
+
+
+def perft(board: Board, depth: int) -> int:
+    if depth == 0: return 1
+    moves = board.generate_moves(legal=True)
+    if depth == 1: return len(moves)
+    n = 0
+    for m in moves:
+        board.push_move(m)
+        n += perft(board, depth - 1)
+        board.undo_move()
+    return n
+
+
+def run_suite(name, suite, max_depth):
+    print(name)
+    all_ok, total = True, 0.0
+    for fen, expected in suite:
+        board, ok = Board(fen), True
+        for depth, ref in enumerate(expected[:max_depth], 1):
+            t0 = time.perf_counter()
+            n = perft(board, depth)
+            total += time.perf_counter() - t0
+            if n != ref:
+                ok = False
+                print(f"  ÉCHEC  d{depth} {n} != {ref}")
+        print(f"  {'ok' if ok else '--'}  {fen}")
+        all_ok &= ok
+    print(f"  temps {total:.2f} s")
+    return all_ok
+
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    ok = run_suite("Positions classiques", STANDARD, max_depth)
+    ok &= run_suite("Chess960", CHESS960, max_depth)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
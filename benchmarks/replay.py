@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+replay.py - Rejoue un script d'événements UI sur ChessApp et mesure la latence
+clic -> rendu (p50 / p99 par type d'événement).
+
+Le script est une liste JSON d'événements :
+    {"type": "click", "square": "e2"}          clic gauche sur une case
+    {"type": "click", "square": "e8", "promotion": "q"}
+    {"type": "undo"}                           bouton Annuler
+    {"type": "history", "index": 5}            sélection d'un coup dans l'historique
+    {"type": "new"}                            nouvelle partie
+Sans --script, des parties aléatoires à graine fixe sont générées (avec
+annulations et navigation dans l'historique), donc deux exécutions rejouent
+exactement les mêmes événements.
+
+Tk a besoin d'un affichage : sans DISPLAY, Xvfb est lancé s'il est installé.
+--stub-canvas remplace le dessin du canevas par des no-op pour isoler le coût
+moteur + logique de l'interface.
+
+Usage : python benchmarks/replay.py [--games 5] [--seed 1] [--script s.json]
+                                    [--record s.json] [--stub-canvas] [--analysis] [--json out.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from echecs.engine import FILES, RANKS, Board  # noqa: E402
+
+
+# ---------------- Génération de scripts ----------------
+def script_from_game(uci_moves, rng: random.Random):
+    events = []
+    for ply, uci in enumerate(uci_moves):
+        events.append({"type": "click", "square": uci[:2]})
+        click = {"type": "click", "square": uci[2:4]}
+        if len(uci) > 4: click["promotion"] = uci[4]
+        events.append(click)
+        if ply and rng.random() < 0.08:
+            events.append({"type": "history", "index": rng.randrange(ply + 1)})
+        elif rng.random() < 0.05:
+            events.append({"type": "undo"})
+            events.append({"type": "click", "square": uci[:2]})
+            events.append(dict(click))
+    events.append({"type": "new"})
+    return events
+
+
+def random_games_script(n_games: int, seed: int, max_plies: int = 120):
+    rng = random.Random(seed)
+    events = []
+    for _ in range(n_games):
+        board, moves = Board(), []
+        while len(moves) < max_plies and board.game_status()[0] == 'ongoing':
+            m = rng.choice(board.generate_moves(legal=True))
+            moves.append(m.uci())
+            board.push_move(m)
+        events.extend(script_from_game(moves, rng))
+    return events
+
+
+# ---------------- Affichage ----------------
+def ensure_display():
+    if os.environ.get('DISPLAY'): return None
+    if not shutil.which('Xvfb'):
+        sys.exit("Aucun affichage (DISPLAY) et Xvfb introuvable.")
+    proc = subprocess.Popen(['Xvfb', ':97', '-screen', '0', '1280x1024x24'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ['DISPLAY'] = ':97'
+    time.sleep(0.5)
+    return proc
+
+
+# ---------------- Rejeu ----------------
+def build_app(stub_canvas: bool, analysis: bool):
+    os.chdir(ROOT)
+    import main
+    # Boîtes de dialogue non bloquantes
+    main.messagebox.showinfo = lambda *a, **k: None
+    main.messagebox.showwarning = lambda *a, **k: None
+    main.messagebox.askyesno = lambda *a, **k: False
+    app = main.ChessApp(mode='human')
+    app.info_tab.analysis_enabled = analysis
+    # Pendule hors jeu : une longue session ne doit pas finir au temps et dévier du script
+    app.time_control = main.TimeControl.from_seconds(10 ** 9)
+    app.clock = main.GameClock(app.time_control)
+    if stub_canvas:
+        canvas = app.canvas
+        for name in ('create_rectangle', 'create_oval', 'create_line', 'create_image', 'create_text',
+                     'delete', 'tag_raise'):
+            setattr(canvas, name, lambda *a, **k: None)
+    return app
+
+
+def dispatch(app, event, pending_promotion):
+    kind = event["type"]
+    if kind == "click":
+        sq = event["square"]
+        x, y = app._sq_center_coords(RANKS.index(sq[1]), FILES.index(sq[0]))
+        pending_promotion[0] = event.get("promotion")
+        app.on_click_move(SimpleNamespace(x=x, y=y))
+    elif kind == "undo":
+        app.on_undo()
+    elif kind == "history":
+        if len(app.game_record):
+            app.restore_position(min(event["index"], len(app.game_record) - 1), animate=False)
+            app.info_tab.refresh_info()
+    elif kind == "new":
+        app.on_new()
+
+
+def replay(app, events):
+    pending_promotion = [None]
+    app.ask_promotion = lambda: pending_promotion[0]
+    latencies = {}
+    for event in events:
+        t0 = time.perf_counter()
+        dispatch(app, event, pending_promotion)
+        app.update_idletasks()
+        latencies.setdefault(event["type"], []).append(time.perf_counter() - t0)
+        app.update()
+    return latencies
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(latencies):
+    out = {}
+    print(f"{'événement':<10} {'n':>6} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+    for kind, samples in sorted(latencies.items()):
+        row = {'n': len(samples), 'p50_ms': statistics.median(samples) * 1000,
+               'p99_ms': percentile(samples, 0.99) * 1000, 'max_ms': max(samples) * 1000}
+        out[kind] = row
+        print(f"{kind:<10} {row['n']:>6} {row['p50_ms']:>10.2f} {row['p99_ms']:>10.2f} {row['max_ms']:>10.2f}")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    ap.add_argument('--games', type=int, default=5)
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--script')
+    ap.add_argument('--record')
+    ap.add_argument('--json')
+    ap.add_argument('--stub-canvas', action='store_true')
+    ap.add_argument('--analysis', action='store_true', help="garder l'analyse de fond de l'onglet Infos")
+    args = ap.parse_args()
+
+    if args.script:
+        with open(args.script, encoding='utf-8') as f:
+            events = json.load(f)
+    else:
+        events = random_games_script(args.games, args.seed)
+    if args.record:
+        with open(args.record, 'w', encoding='utf-8') as f:
+            json.dump(events, f)
+
+    xvfb = ensure_display()
+    try:
+        app = build_app(args.stub_canvas, args.analysis)
+        latencies = replay(app, events)
+        app.destroy()
+    finally:
+        if xvfb: xvfb.terminate()
+    result = report(latencies)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'events': len(events), 'stub_canvas': args.stub_canvas, 'latency': result}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
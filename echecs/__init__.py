@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+echecs - Paquet moteur du jeu d'échecs.
+Seul le moteur de règles est exposé ici ; l'interface Tk reste dans main.py
+et n'est jamais importée par ce paquet.
+"""
+from echecs.engine import FILES, RANKS, WHITE, BLACK, Move, Board, move_to_readable
+
+__all__ = ['FILES', 'RANKS', 'WHITE', 'BLACK', 'Move', 'Board', 'move_to_readable']
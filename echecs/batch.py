@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/batch.py - Évaluation vectorisée de lots de positions (NumPy).
+
+encode() empile N Board en un tableau (N, 12, 64) de plans de pièces, ordre
+PLANES, case = r * 8 + c (a1 = 0, h8 = 63). Seules les listes de pièces sont
+parcourues, jamais les 64 cases ; tout le reste (matériel, tables pièce-case,
+mobilité approchée) est calculé sur le lot entier par NumPy, scores du point
+de vue des Blancs comme Board.evaluate().
+
+NumPy est une dépendance facultative : le moteur s'en passe, seul ce module
+la demande.
+"""
+from typing import Iterable, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy absent : le module reste importable
+    np = None
+
+from echecs.engine import BLACK, WHITE, Board
+from echecs.evaluation import PIECE_VALUES, PST
+
+PLANES = 'PNBRQKpnbrqk'
+PLANE_INDEX = {p: i for i, p in enumerate(PLANES)}
+_PLANE_OFFSETS = {p: i * 64 for i, p in enumerate(PLANES)}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("echecs.batch nécessite NumPy (pip install numpy)")
+
+
+if np is not None:
+    _SIGN = np.array([1] * 6 + [-1] * 6, dtype=np.int32)
+    MATERIAL_WEIGHTS = _SIGN * np.array([PIECE_VALUES[p.upper()] for p in PLANES], dtype=np.int32)
+    PST_WEIGHTS = (_SIGN[:, None] * np.array([PST[p] for p in PLANES], dtype=np.int32)).reshape(768)
+    # Produit en float32 (BLAS) : exact, les sommes restent très loin de 2**24
+    _PST_WEIGHTS_F = PST_WEIGHTS.astype(np.float32)
+
+    _U = np.uint64
+    _NOT_A = _U(0xFEFEFEFEFEFEFEFE)
+    _NOT_H = _U(0x7F7F7F7F7F7F7F7F)
+    _ALL = _U(0xFFFFFFFFFFFFFFFF)
+    # (décalage, masque des cases d'arrivée valides) ; décalage positif = vers h8
+    _N, _S, _E, _W = (8, _ALL), (-8, _ALL), (1, _NOT_A), (-1, _NOT_H)
+    _NE, _NW, _SE, _SW = (9, _NOT_A), (7, _NOT_H), (-7, _NOT_A), (-9, _NOT_H)
+    _ORTHO = (_N, _S, _E, _W)
+    _DIAG = (_NE, _NW, _SE, _SW)
+    _POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _shift(bb, n):
+    return bb << _U(n) if n > 0 else bb >> _U(-n)
+
+
+def _step(bb, direction):
+    n, mask = direction
+    return _shift(bb, n) & mask
+
+
+def _slide(sliders, empty, direction):
+    """Cases attaquées dans une direction (remplissage Kogge-Stone, arrêt sur la 1re pièce)."""
+    n, mask = direction
+    pro = empty & mask
+    gen = sliders | (pro & _shift(sliders, n))
+    pro = pro & _shift(pro, n)
+    gen = gen | (pro & _shift(gen, 2 * n))
+    pro = pro & _shift(pro, 2 * n)
+    gen = gen | (pro & _shift(gen, 4 * n))
+    return _shift(gen, n) & mask
+
+
+def popcount(bb):
+    """Nombre de bits à 1 de chaque entier d'un tableau uint64."""
+    return _POPCOUNT8[bb.view(np.uint8)].reshape(bb.shape + (8,)).sum(axis=-1, dtype=np.int32)
+
+
+def encode(boards: Sequence[Board]):
+    """Plans de pièces (N, 12, 64) en uint8."""
+    _require_numpy()
+    offsets = _PLANE_OFFSETS
+    flat = []
+    for i, b in enumerate(boards):
+        grid, base = b.board, i * 768
+        flat += [base + offsets[grid[r][c]] + r * 8 + c
+                 for color in (WHITE, BLACK) for r, c in b.piece_squares[color]]
+    planes = np.zeros((len(boards), 12, 64), dtype=np.uint8)
+    planes.reshape(-1)[flat] = 1
+    return planes
+
+
+def bitboards(planes):
+    """Plans (N, 12, 64) -> bitboards (N, 12) uint64, bit k = case k."""
+    _require_numpy()
+    packed = np.packbits(planes, axis=2, bitorder='little')
+    return np.ascontiguousarray(packed).view('<u8')[..., 0].astype(np.uint64, copy=False)
+
+
+def material(planes):
+    """Bilan matériel (N,) en centipions."""
+    return planes.sum(axis=2, dtype=np.int32) @ MATERIAL_WEIGHTS
+
+
+def pst(planes):
+    """Bilan des tables pièce-case (N,)."""
+    return (planes.reshape(len(planes), 768).astype(np.float32) @ _PST_WEIGHTS_F).astype(np.int32)
+
+
+def attacks(bbs, color: str):
+    """Cases attaquées (N,) uint64 par un camp, pièces bloquantes prises en compte."""
+    base = 0 if color == WHITE else 6
+    pawns, knights, bishops, rooks, queens, kings = (bbs[:, base + k] for k in range(6))
+    empty = ~np.bitwise_or.reduce(bbs, axis=1)
+    if color == WHITE:
+        att = _step(pawns, _NE) | _step(pawns, _NW)
+    else:
+        att = _step(pawns, _SE) | _step(pawns, _SW)
+    for d in _ORTHO + _DIAG:
+        att |= _step(kings, d)
+    for d1, d2 in ((_N, _E), (_N, _W), (_S, _E), (_S, _W)):
+        # Saut du cavalier : deux pas dans une direction orthogonale, un dans l'autre
+        att |= _step(_step(_step(knights, d1), d1), d2) | _step(_step(_step(knights, d2), d2), d1)
+    diag, ortho = bishops | queens, rooks | queens
+    for d in _DIAG:
+        att |= _slide(diag, empty, d)
+    for d in _ORTHO:
+        att |= _slide(ortho, empty, d)
+    return att
+
+
+def mobility(planes=None, bbs=None):
+    """
+    Mobilité approchée (N,) : cases attaquées non occupées par son propre camp,
+    Blancs moins Noirs (ni clouages ni échecs pris en compte).
+    """
+    _require_numpy()
+    if bbs is None: bbs = bitboards(planes)
+    own_w = np.bitwise_or.reduce(bbs[:, :6], axis=1)
+    own_b = np.bitwise_or.reduce(bbs[:, 6:], axis=1)
+    return popcount(attacks(bbs, WHITE) & ~own_w) - popcount(attacks(bbs, BLACK) & ~own_b)
+
+
+def evaluate(planes, mobility_weight: int = 0):
+    """Matériel + pièce-case (identique à Board.evaluate), plus mobilité pondérée si demandée."""
+    _require_numpy()
+    score = material(planes) + pst(planes)
+    if mobility_weight: score = score + mobility_weight * mobility(planes)
+    return score
+
+
+def evaluate_boards(boards: Iterable[Board], mobility_weight: int = 0):
+    return evaluate(encode(list(boards)), mobility_weight)
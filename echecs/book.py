@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/book.py - Bibliothèque d'ouvertures binaire, consultée par mmap.
+
+Format : suite d'entrées de 14 octets triées par (clé, coup), sans en-tête.
+    clé de Zobrist (u64) | coup compacté (u16, voir pack_move) | fréquence (u32)
+Le fichier n'est jamais chargé en mémoire : la recherche est une dichotomie
+directement sur la projection mmap.
+
+Construction : python -m echecs.book build book.bin parties1.pgn [parties2.pgn ...]
+Consultation : python -m echecs.book probe book.bin "<FEN>"
+"""
+import collections
+import mmap
+import os
+import random
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from echecs.engine import Board, Move, pack_move, packed_to_uci
+from echecs.pgn import read_games, san_to_move
+
+ENTRY = struct.Struct('>QHI')
+DEFAULT_BOOK_PATH = 'book.bin'
+
+
+class OpeningBook:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self.count = size // ENTRY.size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+    @classmethod
+    def open_default(cls, path: str = DEFAULT_BOOK_PATH) -> Optional['OpeningBook']:
+        """Ouvre la bibliothèque si le fichier existe, sinon None."""
+        try:
+            return cls(path)
+        except OSError:
+            return None
+
+    def close(self):
+        if self._mm: self._mm.close(); self._mm = None
+        self._file.close()
+
+    def _key_at(self, idx: int) -> int:
+        return ENTRY.unpack_from(self._mm, idx * ENTRY.size)[0]
+
+    def _lower_bound(self, key: int) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, key: int) -> List[Tuple[str, int]]:
+        """Coups UCI et fréquences enregistrés pour une clé de position."""
+        if not self._mm: return []
+        entries = []
+        idx = self._lower_bound(key)
+        while idx < self.count:
+            k, code, freq = ENTRY.unpack_from(self._mm, idx * ENTRY.size)
+            if k != key: break
+            entries.append((packed_to_uci(code), freq))
+            idx += 1
+        return entries
+
+    def probe(self, board: Board) -> List[Tuple[Move, int]]:
+        """Coups de bibliothèque légaux dans la position, du plus joué au moins joué."""
+        found = []
+        for uci, freq in self.lookup(board.position_hash()):
+            m = board.find_move_uci(uci)
+            if m: found.append((m, freq))
+        found.sort(key=lambda e: -e[1])
+        return found
+
+    def pick(self, board: Board, rng: Optional[random.Random] = None) -> Optional[Move]:
+        """Tirage d'un coup de bibliothèque pondéré par sa fréquence (pour le moteur)."""
+        entries = self.probe(board)
+        if not entries: return None
+        rng = rng or random
+        return rng.choices([m for m, _ in entries], weights=[f for _, f in entries])[0]
+
+
+def build_book(pgn_paths: Iterable[str], out_path: str, max_ply: int = 24, min_count: int = 1) -> int:
+    """Compile une bibliothèque à partir de fichiers PGN. Renvoie le nombre d'entrées."""
+    counts: Dict[Tuple[int, int], int] = collections.Counter()
+    for path in pgn_paths:
+        for headers, sans in read_games(path):
+            board = Board(headers['FEN']) if 'FEN' in headers else Board()
+            for san in sans[:max_ply]:
+                m = san_to_move(board, san)
+                if m is None: break
+                counts[(board.position_hash(), pack_move(m))] += 1
+                board.push_move(m)
+    entries = sorted((k, code, min(n, 0xFFFFFFFF)) for (k, code), n in counts.items() if n >= min_count)
+    with open(out_path, 'wb') as f:
+        for e in entries:
+            f.write(ENTRY.pack(*e))
+    return len(entries)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 4 and sys.argv[1] == 'build':
+        n = build_book(sys.argv[3:], sys.argv[2])
+        print(f"{n} entrées écrites dans {sys.argv[2]}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'probe':
+        book = OpeningBook(sys.argv[2])
+        b = Board(sys.argv[3]) if len(sys.argv) >= 4 else Board()
+        for m, freq in book.probe(b):
+            print(f"{m.uci():<6} {freq}")
+    else:
+        print(__doc__)
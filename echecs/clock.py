@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/clock.py - Cadences et pendule d'échecs (incrément, délai, périodes).
+
+Notation d'une cadence : périodes séparées par des virgules, chacune de la forme
+    [coups/]minutes[+incrément][d<délai>]
+minutes peut être décimal, incrément et délai sont en secondes. Exemples :
+    5            5 min KO
+    3+2          blitz 3 min + 2 s par coup (Fischer)
+    15d5         15 min, délai Bronstein de 5 s
+    40/90+30, 30+30   90 min pour 40 coups puis 30 min, + 30 s par coup
+La pendule lit time.monotonic() : le temps affiché ne dépend pas du rythme des
+rappels de l'interface, seulement de l'instant de la lecture.
+"""
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from echecs.engine import BLACK, WHITE
+
+FAST_REFRESH = 0.05  # période (s) de rafraîchissement de l'affichage au millième, sous 10 s
+_STAGE_RE = re.compile(r'^(?:(\d+)/)?(\d+(?:\.\d+)?)(?:\+(\d+(?:\.\d+)?))?(?:d(\d+(?:\.\d+)?))?$')
+
+
+@dataclass(frozen=True)
+class Stage:
+    moves: Optional[int]  # coups à jouer dans la période (None : jusqu'à la fin)
+    base: float  # secondes créditées au début de la période
+    increment: float = 0.0  # Fischer, ajouté après chaque coup
+    delay: float = 0.0  # Bronstein, rendu après chaque coup dans la limite du temps utilisé
+
+
+class TimeControl:
+    def __init__(self, stages: List[Stage]):
+        if not stages: raise ValueError("cadence vide")
+        self.stages = stages
+
+    @classmethod
+    def parse(cls, spec: str) -> 'TimeControl':
+        stages = []
+        for part in spec.replace(' ', '').split(','):
+            m = _STAGE_RE.match(part)
+            if not m: raise ValueError(f"cadence invalide : {part!r}")
+            moves, minutes, inc, delay = m.groups()
+            stages.append(Stage(int(moves) if moves else None, float(minutes) * 60,
+                                float(inc or 0), float(delay or 0)))
+        if any(s.moves is None for s in stages[:-1]):
+            raise ValueError("seule la dernière période peut durer jusqu'à la fin de la partie")
+        return cls(stages)
+
+    @classmethod
+    def from_seconds(cls, seconds: float) -> 'TimeControl':
+        return cls([Stage(None, float(seconds))])
+
+    def stage(self, index: int) -> Stage:
+        # La dernière période se répète si elle fixe elle aussi un nombre de coups
+        return self.stages[min(index, len(self.stages) - 1)]
+
+    def __str__(self) -> str:
+        def fmt(x): return f"{x:g}"
+        parts = []
+        for s in self.stages:
+            text = (f"{s.moves}/" if s.moves else '') + fmt(s.base / 60)
+            if s.increment: text += f"+{fmt(s.increment)}"
+            if s.delay: text += f"d{fmt(s.delay)}"
+            parts.append(text)
+        return ', '.join(parts)
+
+
+class GameClock:
+    """Pendule double : au plus un camp tourne, le temps se calcule à la lecture."""
+
+    def __init__(self, control: TimeControl, now: Callable[[], float] = time.monotonic):
+        self.control = control
+        self._now = now
+        first = control.stage(0).base
+        self._remaining: Dict[str, float] = {WHITE: first, BLACK: first}
+        self._moves = {WHITE: 0, BLACK: 0}  # coups joués dans la période en cours
+        self._stage = {WHITE: 0, BLACK: 0}
+        self.running: Optional[str] = None
+        self._since = 0.0
+
+    def remaining(self, color: str) -> float:
+        left = self._remaining[color]
+        if color == self.running: left -= self._now() - self._since
+        return left
+
+    def current_stage(self, color: str) -> Stage:
+        return self.control.stage(self._stage[color])
+
+    def flagged(self, color: str) -> bool:
+        return self.remaining(color) <= 0
+
+    def start(self, color: str):
+        """Met en marche la pendule de color (l'autre est arrêtée)."""
+        self.stop()
+        self.running = color
+        self._since = self._now()
+
+    def stop(self):
+        if self.running is not None:
+            self._remaining[self.running] = self.remaining(self.running)
+            self.running = None
+
+    def press(self, color: str):
+        """color vient de jouer : délai, incrément, changement de période, puis l'adversaire."""
+        used = self._now() - self._since if self.running == color else 0.0
+        self.stop()
+        stage = self.control.stage(self._stage[color])
+        if self._remaining[color] > 0:
+            self._remaining[color] += min(used, stage.delay) + stage.increment
+        self._moves[color] += 1
+        if stage.moves and self._moves[color] >= stage.moves:
+            self._stage[color] += 1
+            self._moves[color] = 0
+            self._remaining[color] += self.control.stage(self._stage[color]).base
+        self.start(BLACK if color == WHITE else WHITE)
+
+    def set_remaining(self, white: float, black: float):
+        """Recale les deux pendules (synchronisation réseau) sans changer le camp en marche."""
+        self._remaining = {WHITE: white, BLACK: black}
+        if self.running is not None: self._since = self._now()
+
+    def snapshot(self) -> Tuple:
+        return (self.remaining(WHITE), self.remaining(BLACK), dict(self._moves), dict(self._stage))
+
+    def restore(self, state: Tuple):
+        w, b, moves, stage = state
+        self._remaining = {WHITE: w, BLACK: b}
+        self._moves, self._stage = dict(moves), dict(stage)
+        if self.running is not None: self._since = self._now()
+
+
+def next_display_change(seconds: float) -> float:
+    """Secondes avant que format_time() change pour une pendule en marche affichant seconds."""
+    if seconds <= 0: return 0.0
+    if seconds < 10: return min(FAST_REFRESH, seconds)
+    # Affichage à la seconde : on vise juste après le passage sous l'entier courant
+    return seconds - math.floor(seconds) + 0.001
+
+
+def format_time(seconds: float) -> str:
+    """MM:SS, H:MM:SS au-delà d'une heure, S.mmm sous les 10 secondes."""
+    if seconds <= 0: return "0.000"
+    if seconds < 10: return f"{seconds:.3f}"
+    s = int(seconds)
+    if s >= 3600: return f"{s // 3600}:{s % 3600 // 60:02d}:{s % 60:02d}"
+    return f"{s // 60:02d}:{s % 60:02d}"
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/dataset.py - Export de positions vers un fichier binaire projeté (mmap).
+
+Chaque position rejouée est écrite dans un enregistrement de taille fixe, ce qui
+permet l'ajout en fin de fichier et l'accès direct au i-ème enregistrement :
+    en-tête (32 octets) : magique | version (u32) | taille d'enregistrement (u32) | nombre (u64)
+    enregistrement (48 octets, petit-boutiste) :
+        plateau (32 octets, 4 bits par case, a1 en poids faible ; 0 = vide,
+                 1..12 = 'PNBRQKpnbrqk')
+        drapeaux (u8 : bit 0 = trait aux Noirs, bits 1..4 = roques KQkq)
+        prise en passant (u8 : case 0..63, 255 = aucune)
+        résultat (i8 : 1 = gain Blancs, 0 = nulle, -1 = gain Noirs)
+        demi-coup dans la partie (u16)
+        clé de Zobrist (u64)
+Le lecteur expose les enregistrements comme une vue NumPy sans copie ; la
+déduplication se fait par clé de Zobrist (première occurrence conservée).
+
+Export : python -m echecs.dataset export positions.bin parties1.pgn [parties2.pgn ...]
+Résumé : python -m echecs.dataset info positions.bin
+"""
+import mmap
+import os
+import struct
+import sys
+from typing import Iterable, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ne sert qu'aux vues du lecteur
+    np = None
+
+from echecs.engine import BLACK, FILES, RANKS, WHITE, Board, Move
+from echecs.pgn import read_games, san_to_move
+from echecs.zobrist import PIECES
+
+MAGIC = b'ECHDSET\0'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQ8x')
+RECORD = struct.Struct('<32sBBbxH2xQ')
+NO_EP = 255
+RESULT_CODES = {'1-0': 1, '0-1': -1, '1/2-1/2': 0}
+_CODES = {p: i + 1 for i, p in enumerate(PIECES)}
+_CASTLING_BITS = (('K', 2), ('Q', 4), ('k', 8), ('q', 16))
+
+if np is not None:
+    RECORD_DTYPE = np.dtype({
+        'names': ['board', 'flags', 'ep', 'result', 'ply', 'key'],
+        'formats': [('u1', (32,)), 'u1', 'u1', 'i1', '<u2', '<u8'],
+        'offsets': [0, 32, 33, 34, 36, 40],
+        'itemsize': RECORD.size,
+    })
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("les vues du jeu de positions nécessitent NumPy (pip install numpy)")
+
+
+def _fields(board: Board, result: int, ply: int) -> tuple:
+    squares = bytearray(32)
+    for color in (WHITE, BLACK):
+        for r, c in board.piece_squares[color]:
+            sq = r * 8 + c
+            squares[sq >> 1] |= _CODES[board.board[r][c]] << (4 * (sq & 1))
+    flags = 1 if board.turn == BLACK else 0
+    for k, bit in _CASTLING_BITS:
+        if board.castling_rights[k]: flags |= bit
+    ep = board.en_passant_target
+    return bytes(squares), flags, ep[0] * 8 + ep[1] if ep else NO_EP, result, ply, board.position_hash()
+
+
+def encode_position(board: Board, result: int, ply: int) -> bytes:
+    return RECORD.pack(*_fields(board, result, ply))
+
+
+def decode_fen(record: bytes) -> str:
+    """FEN (sans compteurs de coups) d'un enregistrement brut."""
+    squares, flags, ep, _, _, _ = RECORD.unpack(record)
+    rows = []
+    for r in range(7, -1, -1):
+        row, empty = '', 0
+        for c in range(8):
+            sq = r * 8 + c
+            code = (squares[sq >> 1] >> (4 * (sq & 1))) & 0xF
+            if not code:
+                empty += 1
+                continue
+            if empty: row += str(empty); empty = 0
+            row += PIECES[code - 1]
+        rows.append(row + (str(empty) if empty else ''))
+    cast = ''.join(k for k, bit in _CASTLING_BITS if flags & bit) or '-'
+    ep_str = FILES[ep % 8] + RANKS[ep // 8] if ep != NO_EP else '-'
+    return f"{'/'.join(rows)} {'b' if flags & 1 else 'w'} {cast} {ep_str}"
+
+
+class DatasetWriter:
+    """Ajout d'enregistrements dans un fichier projeté, agrandi par doublement."""
+
+    def __init__(self, path: str, dedup: bool = True, reserve: int = 4096):
+        self.path = path
+        fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'w+b' if fresh else 'r+b')
+        if fresh:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0))
+            self._file.truncate(HEADER.size + reserve * RECORD.size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self.count = _check_header(self._mm, path)
+        self.dedup = dedup
+        self.skipped = 0
+        self._seen = set()
+        if dedup:
+            key_at = RECORD.size - 8
+            for i in range(self.count):
+                self._seen.add(struct.unpack_from('<Q', self._mm, HEADER.size + i * RECORD.size + key_at)[0])
+
+    def _ensure_capacity(self, n: int):
+        capacity = (len(self._mm) - HEADER.size) // RECORD.size
+        if self.count + n <= capacity: return
+        self._mm.close()
+        self._file.truncate(HEADER.size + max(2 * capacity, self.count + n) * RECORD.size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def add(self, board: Board, result: int, ply: int = 0) -> bool:
+        """Ajoute la position courante ; False si elle est déjà présente (déduplication)."""
+        if self.dedup:
+            key = board.position_hash()
+            if key in self._seen:
+                self.skipped += 1
+                return False
+            self._seen.add(key)
+        self._ensure_capacity(1)
+        RECORD.pack_into(self._mm, HEADER.size + self.count * RECORD.size, *_fields(board, result, ply))
+        self.count += 1
+        return True
+
+    def add_game(self, moves: Iterable[Move], result: int, start_fen: Optional[str] = None) -> int:
+        """Rejoue une partie (liste de Move) et écrit ses positions, jusqu'au premier coup injouable."""
+        board = Board(start_fen) if start_fen else Board()
+        written = self.add(board, result, 0)
+        for ply, m in enumerate(moves, 1):
+            played = board.find_move_uci(m.uci())
+            if played is None: break
+            board.push_move(played)
+            written += self.add(board, result, ply)
+        return written
+
+    def flush(self):
+        struct.pack_into('<Q', self._mm, 16, self.count)
+        self._mm.flush()
+
+    def close(self):
+        self.flush()
+        self._mm.close()
+        self._file.truncate(HEADER.size + self.count * RECORD.size)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(buf, path: str) -> int:
+    magic, version, size, count = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION or size != RECORD.size:
+        raise ValueError(f"{path} : fichier de positions invalide ou de version inconnue")
+    return count
+
+
+class PositionDataset:
+    """Lecture par accès direct ; records est une vue NumPy sur la projection mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = _check_header(self._mm, path)
+        self._records = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def raw(self, i: int) -> bytes:
+        if not 0 <= i < self.count: raise IndexError(i)
+        off = HEADER.size + i * RECORD.size
+        return self._mm[off:off + RECORD.size]
+
+    def board(self, i: int) -> Board:
+        return Board(decode_fen(self.raw(i)))
+
+    def result(self, i: int) -> int:
+        return RECORD.unpack(self.raw(i))[3]
+
+    @property
+    def records(self):
+        """Tableau structuré (N,) de RECORD_DTYPE, partagé avec le fichier (aucune copie)."""
+        if self._records is None:
+            _require_numpy()
+            self._records = np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=self.count, offset=HEADER.size)
+        return self._records
+
+    def piece_codes(self, index=None):
+        """Codes de pièce (n, 64) uint8 : 0 = vide, 1..12 = 'PNBRQKpnbrqk'."""
+        packed = self.records['board'] if index is None else self.records['board'][index]
+        codes = np.empty(packed.shape[:-1] + (64,), dtype=np.uint8)
+        codes[..., 0::2] = packed & 0xF
+        codes[..., 1::2] = packed >> 4
+        return codes
+
+    def planes(self, index=None):
+        """Plans de pièces (n, 12, 64), même convention que echecs.batch.encode."""
+        codes = self.piece_codes(index)
+        return (codes[..., None, :] == np.arange(1, 13, dtype=np.uint8)[:, None]).astype(np.uint8)
+
+    def unique_indices(self):
+        """Indices (croissants) de la première occurrence de chaque clé de position."""
+        _, first = np.unique(self.records['key'], return_index=True)
+        first.sort()
+        return first
+
+    def close(self):
+        self._records = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # des vues NumPy sont encore utilisées : la projection sera libérée avec elles
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_games(pgn_paths: Iterable[str], out_path: str, dedup: bool = True) -> Tuple[int, int]:
+    """
+    Rejoue des parties PGN terminées et ajoute leurs positions à out_path.
+    Renvoie (parties exportées, positions écrites). Les parties sans résultat
+    ('*') sont ignorées.
+    """
+    games = written = 0
+    with DatasetWriter(out_path, dedup=dedup) as writer:
+        for path in pgn_paths:
+            for headers, sans in read_games(path):
+                result = RESULT_CODES.get(headers.get('Result'))
+                if result is None: continue
+                board = Board(headers['FEN']) if 'FEN' in headers else Board()
+                written += writer.add(board, result, 0)
+                for ply, san in enumerate(sans, 1):
+                    m = san_to_move(board, san)
+                    if m is None: break
+                    board.push_move(m)
+                    written += writer.add(board, result, ply)
+                games += 1
+    return games, written
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 4 and sys.argv[1] == 'export':
+        g, n = export_games(sys.argv[3:], sys.argv[2])
+        print(f"{g} parties, {n} positions ajoutées à {sys.argv[2]}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'info':
+        with PositionDataset(sys.argv[2]) as ds:
+            print(f"{len(ds)} positions")
+            if len(ds) and np is not None:
+                res = ds.records['result']
+                print(f"gains Blancs {int((res == 1).sum())}, nulles {int((res == 0).sum())}, "
+                      f"gains Noirs {int((res == -1).sum())}, clés distinctes {len(ds.unique_indices())}")
+    else:
+        print(__doc__)
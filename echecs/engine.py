@@ -0,0 +1,908 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/engine.py - Moteur de règles (Move, Board, notation).
+Aucune dépendance à tkinter : importable sur une machine sans affichage
+(tests, serveurs, traitements par lots).
+"""
+from array import array
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+import collections, itertools, random
+
+from echecs.zobrist import CASTLING_KEYS, CHESS960_KEY, EP_FILE_KEYS, PIECE_INDEX, PIECE_KEYS, SIDE_KEY, castling_keys
+from echecs.evaluation import PIECE_VALUES, PST
+
+# ---------------- CONSTANTES DE BASE ----------------
+FILES = 'abcdefgh'
+RANKS = '12345678'
+WHITE = 'w'
+BLACK = 'b'
+
+KNIGHT_OFFSETS = ((2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1))
+KING_OFFSETS = ((1, 1), (1, 0), (1, -1), (0, 1), (0, -1), (-1, 1), (-1, 0), (-1, -1))
+DIAGONALS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+ORTHOGONALS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# Mat / pat déjà établis, par clé de Zobrist (vidé d'un bloc une fois plein, comme la table de transposition)
+TERMINAL_CACHE_SIZE = 1 << 16
+_TERMINAL_CACHE = {}
+_UNKNOWN = object()
+PLAYOUT_MAX_PLIES = 400  # partie aléatoire coupée au-delà (statut 'ongoing')
+
+
+# ---------------- Move & Board engine ----------------
+@dataclass
+class Move:
+    from_sq: Tuple[int, int]
+    to_sq: Tuple[int, int]
+    piece: str
+    captured: Optional[str] = None
+    promotion: Optional[str] = None
+    is_en_passant: bool = False
+    is_castle: bool = False
+
+    def uci(self) -> str:
+        f = FILES[self.from_sq[1]] + RANKS[self.from_sq[0]]
+        t = FILES[self.to_sq[1]] + RANKS[self.to_sq[0]]
+        prom = self.promotion.lower() if self.promotion else ''
+        return f + t + prom
+
+
+# Codage compact d'un coup sur 16 bits : départ | arrivée << 6 | promotion << 12
+PROMO_CODES = ' nbrq'
+
+
+def pack_move(m: Move) -> int:
+    prom = PROMO_CODES.index(m.promotion.lower()) if m.promotion else 0
+    return (m.from_sq[0] * 8 + m.from_sq[1]) | (m.to_sq[0] * 8 + m.to_sq[1]) << 6 | prom << 12
+
+
+def packed_to_uci(code: int) -> str:
+    fr, to, prom = code & 63, (code >> 6) & 63, code >> 12
+    return FILES[fr & 7] + RANKS[fr >> 3] + FILES[to & 7] + RANKS[to >> 3] + (PROMO_CODES[prom] if prom else '')
+
+
+STANDARD_CASTLING_ROOKS = {(0, 7): 'K', (0, 0): 'Q', (7, 7): 'k', (7, 0): 'q'}
+_KNIGHT_PAIRS = ((0, 1), (0, 2), (0, 3), (0, 4), (1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4))
+
+
+def chess960_fen(index: int) -> str:
+    """FEN (Shredder) de la position de départ Chess960 n° index (0..959, 518 = classique)."""
+    if not 0 <= index < 960: raise ValueError(index)
+    row = [None] * 8
+    n, light = divmod(index, 4)
+    n, dark = divmod(n, 4)
+    row[2 * light + 1] = 'B'
+    row[2 * dark] = 'B'
+    n, queen = divmod(n, 6)
+    empties = [f for f in range(8) if row[f] is None]
+    row[empties[queen]] = 'Q'
+    empties = [f for f in range(8) if row[f] is None]
+    for k in _KNIGHT_PAIRS[n]: row[empties[k]] = 'N'
+    for f, p in zip([f for f in range(8) if row[f] is None], 'RKR'): row[f] = p
+    back = ''.join(row)
+    rooks = [f for f in range(8) if row[f] == 'R']
+    cast = FILES[rooks[1]].upper() + FILES[rooks[0]].upper() + FILES[rooks[1]] + FILES[rooks[0]]
+    return f"{back.lower()}/pppppppp/8/8/8/8/PPPPPPPP/{back} w {cast} - 0 1"
+
+
+class Board:
+    def __init__(self, fen: Optional[str] = None, chess960: bool = False):
+        self.board: List[List[Optional[str]]] = [[None] * 8 for _ in range(8)]
+        self.turn = WHITE
+        self.castling_rights = {'K': True, 'Q': True, 'k': True, 'q': True}
+        self.en_passant_target: Optional[Tuple[int, int]] = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.history: List[Tuple[Move, tuple]] = []  # (coup, état à rétablir par undo_move)
+        # Répétitions : clés de Zobrist depuis set_fen et nombre d'occurrences de chacune
+        self.hash_history: List[int] = []
+        self.rep_counts = collections.Counter()
+        self.hash = 0
+        # Évaluation incrémentale : tenue à jour par _put / _remove
+        self.material = {WHITE: 0, BLACK: 0}
+        self.pst_score = {WHITE: 0, BLACK: 0}
+        self.piece_squares = {WHITE: set(), BLACK: set()}
+        self.king_sq = {WHITE: None, BLACK: None}
+        # Roque généralisé (Chess960) : chess960 demandé au constructeur, activé aussi par
+        # set_fen si roi et tours ne sont pas à leur place classique, jamais modifié ensuite
+        self._chess960_requested = chess960
+        self.chess960 = chess960
+        self.castling_rooks = dict(STANDARD_CASTLING_ROOKS)
+        self.castling_king_file = 4
+        # Clé de Zobrist propre à la variante : les coups de roque ne s'écrivent pas pareil en Chess960
+        self._variant_key = 0
+        self._castling_keys = CASTLING_KEYS
+        if fen:
+            self.set_fen(fen)
+        else:
+            self.set_startpos()
+
+    def set_startpos(self):
+        self.set_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+
+    def set_fen(self, fen: str):
+        parts = fen.split()
+        rows = parts[0].split('/')
+        self.board = [[None] * 8 for _ in range(8)]
+        for r, row in enumerate(rows[::-1]):
+            file_idx = 0
+            for ch in row:
+                if ch.isdigit():
+                    file_idx += int(ch)
+                else:
+                    self.board[r][file_idx] = ch
+                    file_idx += 1
+        self.turn = WHITE if parts[1] == 'w' else BLACK
+        self.chess960 = self._chess960_requested
+        self._set_castling(parts[2])
+        self._variant_key = CHESS960_KEY if self.chess960 else 0
+        self._castling_keys = castling_keys(self)
+        ep = parts[3]
+        if ep != '-':
+            self.en_passant_target = (RANKS.index(ep[1]), FILES.index(ep[0]))
+        else:
+            self.en_passant_target = None
+        if len(parts) >= 6:
+            self.halfmove_clock = int(parts[4]);
+            self.fullmove_number = int(parts[5])
+        else:
+            self.halfmove_clock = 0;
+            self.fullmove_number = 1
+        self.history = []
+        # Demi-coups compactés (pack_move) depuis start_fen, partagés par record()
+        self.move_codes = array('H')
+        self._codes_shared = False
+        self._refresh_incremental()
+        self.hash_history = [self.hash]
+        self.rep_counts = collections.Counter(self.hash_history)
+        self.start_fen = self.fen()
+
+    def _set_castling(self, cast: str):
+        """
+        Droits de roque au format FEN, X-FEN (KQkq = tour la plus excentrée) ou
+        Shredder-FEN (colonne de la tour, ex. HAha). Toute position où roi et
+        tours ne sont pas en e/a/h passe le Board en mode Chess960.
+        """
+        self.castling_rights = {'K': False, 'Q': False, 'k': False, 'q': False}
+        rooks = dict(STANDARD_CASTLING_ROOKS)
+        king_file = 4
+        for ch in cast.replace('-', ''):
+            rank, rook = (0, 'R') if ch.isupper() else (7, 'r')
+            row = self.board[rank]
+            kf = row.index('K' if rank == 0 else 'k') if ('K' if rank == 0 else 'k') in row else 4
+            if ch in 'Kk':
+                files = [f for f in range(7, kf, -1) if row[f] == rook]
+            elif ch in 'Qq':
+                files = [f for f in range(0, kf) if row[f] == rook]
+            else:
+                files = [FILES.index(ch.lower())]
+            if not files: continue
+            f = files[0]
+            side = ('K' if f > kf else 'Q') if rank == 0 else ('k' if f > kf else 'q')
+            rooks = {sq: k for sq, k in rooks.items() if k != side}
+            rooks[(rank, f)] = side
+            self.castling_rights[side] = True
+            king_file = kf
+        self.castling_rooks = rooks
+        self.castling_king_file = king_file
+        if rooks != STANDARD_CASTLING_ROOKS or king_file != 4:
+            self.chess960 = True
+
+    def _castling_field(self) -> str:
+        if not self.chess960:
+            return ''.join([k for k, v in self.castling_rights.items() if v]) or '-'
+        files = {k: sq[1] for sq, k in self.castling_rooks.items()}
+        return ''.join(FILES[files[k]].upper() if k.isupper() else FILES[files[k]]
+                       for k in 'KQkq' if self.castling_rights[k]) or '-'
+
+    def _refresh_incremental(self):
+        """Recalcule matériel, tables pièce-case, listes de pièces et clé depuis la grille."""
+        self.hash = self._state_key()
+        self.material = {WHITE: 0, BLACK: 0}
+        self.pst_score = {WHITE: 0, BLACK: 0}
+        self.piece_squares = {WHITE: set(), BLACK: set()}
+        self.king_sq = {WHITE: None, BLACK: None}
+        for r in range(8):
+            for c in range(8):
+                p = self.board[r][c]
+                if p:
+                    self.board[r][c] = None
+                    self._put(r, c, p)
+
+    def _state_key(self) -> int:
+        """Part de la clé de Zobrist hors pièces : variante, roques, colonne de prise en passant, trait."""
+        h = self._variant_key ^ SIDE_KEY if self.turn == BLACK else self._variant_key
+        keys = self._castling_keys
+        for k, v in self.castling_rights.items():
+            if v: h ^= keys[k]
+        if self.en_passant_target: h ^= EP_FILE_KEYS[self.en_passant_target[1]]
+        return h
+
+    def _put(self, r, c, p):
+        color = WHITE if p.isupper() else BLACK
+        self.board[r][c] = p
+        self.hash ^= PIECE_KEYS[PIECE_INDEX[p]][r * 8 + c]
+        self.material[color] += PIECE_VALUES[p.upper()]
+        self.pst_score[color] += PST[p][r * 8 + c]
+        self.piece_squares[color].add((r, c))
+        if p == 'K' or p == 'k': self.king_sq[color] = (r, c)
+
+    def _remove(self, r, c):
+        p = self.board[r][c]
+        color = WHITE if p.isupper() else BLACK
+        self.board[r][c] = None
+        self.hash ^= PIECE_KEYS[PIECE_INDEX[p]][r * 8 + c]
+        self.material[color] -= PIECE_VALUES[p.upper()]
+        self.pst_score[color] -= PST[p][r * 8 + c]
+        self.piece_squares[color].discard((r, c))
+        if self.king_sq[color] == (r, c): self.king_sq[color] = None
+        return p
+
+    def evaluate(self) -> int:
+        """Score matériel + pièce-case en centipions, du point de vue des Blancs."""
+        return (self.material[WHITE] + self.pst_score[WHITE]) - (self.material[BLACK] + self.pst_score[BLACK])
+
+    def _fen_for_repetition(self) -> str:
+        rows = []
+        for r in range(7, -1, -1):
+            empty = 0;
+            rowstr = ''
+            for c in range(8):
+                p = self.board[r][c]
+                if p is None:
+                    empty += 1
+                else:
+                    if empty: rowstr += str(empty); empty = 0
+                    rowstr += p
+            if empty: rowstr += str(empty)
+            rows.append(rowstr)
+        cast = self._castling_field()
+        ep = FILES[self.en_passant_target[1]] + RANKS[self.en_passant_target[0]] if self.en_passant_target else '-'
+        return f"{'/'.join(rows)} {'w' if self.turn == WHITE else 'b'} {cast} {ep}"
+
+    def fen(self) -> str:
+        return f"{self._fen_for_repetition()} {self.halfmove_clock} {self.fullmove_number}"
+
+    def copy(self) -> 'Board':
+        """Copie de la position (sans pile d'annulation) qui garde l'historique des répétitions."""
+        b = Board(self.fen(), chess960=self.chess960)
+        b.hash_history = list(self.hash_history)
+        b.rep_counts = collections.Counter(self.rep_counts)
+        return b
+
+    def in_bounds(self, r, c):
+        return 0 <= r < 8 and 0 <= c < 8
+
+    def piece_color(self, p):
+        return WHITE if p.isupper() else BLACK
+
+    def _opponent(self, color):
+        return BLACK if color == WHITE else WHITE
+
+    def find_king(self, color):
+        return self.king_sq[color]
+
+    def is_square_attacked(self, sq, by_color):
+        # Recherche inverse : on part de la case et on regarde qui peut l'atteindre
+        r, c = sq
+        b = self.board
+        if by_color == WHITE:
+            pawn, knight, bishop, rook, queen, king = 'P', 'N', 'B', 'R', 'Q', 'K'
+            pr = r - 1
+        else:
+            pawn, knight, bishop, rook, queen, king = 'p', 'n', 'b', 'r', 'q', 'k'
+            pr = r + 1
+        if 0 <= pr < 8:
+            if c > 0 and b[pr][c - 1] == pawn: return True
+            if c < 7 and b[pr][c + 1] == pawn: return True
+        for dr, dc in KNIGHT_OFFSETS:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < 8 and 0 <= nc < 8 and b[nr][nc] == knight: return True
+        for dr, dc in KING_OFFSETS:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < 8 and 0 <= nc < 8 and b[nr][nc] == king: return True
+        for directions, slider in ((DIAGONALS, bishop), (ORTHOGONALS, rook)):
+            for dr, dc in directions:
+                nr, nc = r + dr, c + dc
+                while 0 <= nr < 8 and 0 <= nc < 8:
+                    p = b[nr][nc]
+                    if p is not None:
+                        if p == slider or p == queen: return True
+                        break
+                    nr += dr;
+                    nc += dc
+        return False
+
+    def _least_valuable_attacker(self, sq, by_color, removed) -> Optional[Tuple[Tuple[int, int], str]]:
+        """
+        Attaquant de plus faible valeur de sq pour by_color, recherche inverse comme
+        is_square_attacked ; les cases de removed sont vides (rayons X à travers
+        les pièces déjà échangées).
+        """
+        r, c = sq
+        b = self.board
+        white = by_color == WHITE
+        pawn, knight, bishop, rook, queen, king = 'PNBRQK' if white else 'pnbrqk'
+        pr = r - 1 if white else r + 1
+        if 0 <= pr < 8:
+            for pc in (c - 1, c + 1):
+                if 0 <= pc < 8 and b[pr][pc] == pawn and (pr, pc) not in removed: return (pr, pc), pawn
+        for dr, dc in KNIGHT_OFFSETS:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < 8 and 0 <= nc < 8 and b[nr][nc] == knight and (nr, nc) not in removed:
+                return (nr, nc), knight
+        found = {}
+        for directions, slider in ((DIAGONALS, bishop), (ORTHOGONALS, rook)):
+            for dr, dc in directions:
+                nr, nc = r + dr, c + dc
+                while 0 <= nr < 8 and 0 <= nc < 8:
+                    p = b[nr][nc]
+                    if p is not None and (nr, nc) not in removed:
+                        if (p == slider or p == queen) and p not in found: found[p] = (nr, nc)
+                        break
+                    nr += dr;
+                    nc += dc
+        for p in (bishop, rook, queen):
+            if p in found: return found[p], p
+        for dr, dc in KING_OFFSETS:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < 8 and 0 <= nc < 8 and b[nr][nc] == king and (nr, nc) not in removed:
+                return (nr, nc), king
+        return None
+
+    def see(self, m: Move) -> int:
+        """
+        Évaluation statique de l'échange (centipions, pour le camp qui joue m) :
+        suite de reprises sur la case d'arrivée, chaque camp reprenant avec sa
+        pièce la moins chère et pouvant s'arrêter. Les clouages sont ignorés ;
+        le roi ne reprend que sur une case que l'adversaire ne défend plus.
+        """
+        to = m.to_sq
+        target = self.board[to[0]][to[1]]
+        if m.is_en_passant:
+            target = self.board[m.from_sq[0]][to[1]]
+        mover = m.promotion or m.piece
+        gain = [(PIECE_VALUES[target.upper()] if target and not m.is_castle else 0)
+                + (PIECE_VALUES[m.promotion.upper()] - PIECE_VALUES['P'] if m.promotion else 0)]
+        removed = {m.from_sq}
+        if m.is_en_passant: removed.add((m.from_sq[0], to[1]))
+        on_square = PIECE_VALUES[mover.upper()]
+        side = BLACK if mover.isupper() else WHITE
+        while True:
+            attacker = self._least_valuable_attacker(to, side, removed)
+            if attacker is None: break
+            sq, p = attacker
+            if p.upper() == 'K' and self._least_valuable_attacker(to, self._opponent(side), removed | {sq}):
+                break
+            speculative = on_square - gain[-1]
+            if max(-gain[-1], speculative) < 0: break  # la reprise ne peut plus changer le résultat
+            gain.append(speculative)
+            removed.add(sq)
+            on_square = PIECE_VALUES[p.upper()]
+            side = self._opponent(side)
+        while len(gain) > 1:
+            last = gain.pop()
+            gain[-1] = -max(-gain[-1], last)
+        return gain[0]
+
+    def _leaves_king_safe(self, m: Move) -> bool:
+        # Joue le coup sur la grille seule, teste l'échec puis restaure (pas de deepcopy)
+        if m.is_castle and self.chess960: return True  # déjà vérifié par _castling_moves_960
+        b = self.board
+        fr_r, fr_c = m.from_sq;
+        to_r, to_c = m.to_sq
+        piece = b[fr_r][fr_c]
+        target = b[to_r][to_c]
+        ep_piece = None
+        if m.is_en_passant:
+            ep_piece = b[fr_r][to_c]
+            b[fr_r][to_c] = None
+        b[to_r][to_c] = piece
+        b[fr_r][fr_c] = None
+        color = self.piece_color(piece)
+        kp = (to_r, to_c) if piece.upper() == 'K' else self.find_king(color)
+        safe = kp is not None and not self.is_square_attacked(kp, self._opponent(color))
+        b[fr_r][fr_c] = piece
+        b[to_r][to_c] = target
+        if m.is_en_passant:
+            b[fr_r][to_c] = ep_piece
+        return safe
+
+    def king_in_check(self, color):
+        kp = self.find_king(color)
+        if not kp: return True
+        return self.is_square_attacked(kp, self._opponent(color))
+
+    def generate_moves(self, legal=True) -> List[Move]:
+        moves = []
+        for r, c in self.piece_squares[self.turn]:
+            moves.extend(self._piece_moves(r, c, self.board[r][c]))
+        if legal:
+            return [m for m in moves if self._leaves_king_safe(m)]
+        return moves
+
+    def generate_captures(self, legal=True) -> List[Move]:
+        """Prises (en passant comprise) et promotions seulement, pour la recherche de calme."""
+        moves = []
+        for r, c in self.piece_squares[self.turn]:
+            moves.extend(self._piece_captures(r, c, self.board[r][c]))
+        if legal:
+            return [m for m in moves if self._leaves_king_safe(m)]
+        return moves
+
+    def _piece_captures(self, r, c, p):
+        moves = []
+        b = self.board
+        white = p.isupper()
+        pt = p.upper()
+        if pt == 'P':
+            nr = r + (1 if white else -1)
+            if not 0 <= nr < 8: return moves
+            promos = ('Q', 'R', 'B', 'N') if nr == 0 or nr == 7 else (None,)
+            if b[nr][c] is None and promos[0]:
+                for promo in promos:
+                    moves.append(Move((r, c), (nr, c), p, promotion=promo if white else promo.lower()))
+            for nc in (c - 1, c + 1):
+                if not 0 <= nc < 8: continue
+                target = b[nr][nc]
+                if target and target.isupper() != white:
+                    for promo in promos:
+                        moves.append(Move((r, c), (nr, nc), p, captured=target,
+                                          promotion=(promo if white else promo.lower()) if promo else None))
+                elif self.en_passant_target == (nr, nc):
+                    target = b[r][nc]
+                    if target and target.upper() == 'P' and target.isupper() != white:
+                        moves.append(Move((r, c), (nr, nc), p, captured=target, is_en_passant=True))
+            return moves
+        if pt == 'N' or pt == 'K':
+            for dr, dc in (KNIGHT_OFFSETS if pt == 'N' else KING_OFFSETS):
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < 8 and 0 <= nc < 8:
+                    target = b[nr][nc]
+                    if target and target.isupper() != white:
+                        moves.append(Move((r, c), (nr, nc), p, captured=target))
+            return moves
+        directions = DIAGONALS if pt == 'B' else ORTHOGONALS if pt == 'R' else DIAGONALS + ORTHOGONALS
+        for dr, dc in directions:
+            nr, nc = r + dr, c + dc
+            while 0 <= nr < 8 and 0 <= nc < 8:
+                target = b[nr][nc]
+                if target is not None:
+                    if target.isupper() != white:
+                        moves.append(Move((r, c), (nr, nc), p, captured=target))
+                    break
+                nr += dr;
+                nc += dc
+        return moves
+
+    def _piece_moves(self, r, c, p, check_legality=True):
+        moves = []
+        color = self.piece_color(p)
+        pt = p.upper()
+        dir_sign = 1 if color == WHITE else -1
+
+        if pt == 'P':
+            nr = r + dir_sign
+            if self.in_bounds(nr, c) and self.board[nr][c] is None:
+                if nr == 0 or nr == 7:
+                    for promo in ['Q', 'R', 'B', 'N']:
+                        moves.append(Move((r, c), (nr, c), p, promotion=promo if color == WHITE else promo.lower()))
+                else:
+                    moves.append(Move((r, c), (nr, c), p))
+                start_rank = 1 if color == WHITE else 6
+                nr2 = r + 2 * dir_sign
+                if r == start_rank and self.in_bounds(nr2, c) and self.board[nr2][c] is None:
+                    moves.append(Move((r, c), (nr2, c), p))
+            for dc in (-1, 1):
+                nc = c + dc;
+                nr = r + dir_sign
+                if not self.in_bounds(nr, nc): continue
+                target = self.board[nr][nc]
+                if target and self.piece_color(target) != color:
+                    if nr == 0 or nr == 7:
+                        for promo in ['Q', 'R', 'B', 'N']:
+                            moves.append(Move((r, c), (nr, nc), p, captured=target,
+                                              promotion=promo if color == WHITE else promo.lower()))
+                    else:
+                        moves.append(Move((r, c), (nr, nc), p, captured=target))
+            if self.en_passant_target:
+                ep_r, ep_c = self.en_passant_target
+                if ep_r == r + dir_sign and abs(ep_c - c) == 1:
+                    cap_r = r;
+                    cap_c = ep_c
+                    target = self.board[cap_r][cap_c]
+                    if target and target.upper() == 'P' and self.piece_color(target) != color:
+                        moves.append(Move((r, c), (ep_r, ep_c), p, captured=target, is_en_passant=True))
+            return moves
+
+        if pt == 'N':
+            for dr, dc in [(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)]:
+                nr, nc = r + dr, c + dc
+                if not self.in_bounds(nr, nc): continue
+                target = self.board[nr][nc]
+                if target is None or self.piece_color(target) != color:
+                    moves.append(Move((r, c), (nr, nc), p, captured=target if target else None))
+            return moves
+
+        if pt in ('B', 'R', 'Q'):
+            directions = []
+            if pt in ('B', 'Q'): directions += [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+            if pt in ('R', 'Q'): directions += [(1, 0), (-1, 0), (0, 1), (0, -1)]
+            for dr, dc in directions:
+                nr, nc = r + dr, c + dc
+                while self.in_bounds(nr, nc):
+                    target = self.board[nr][nc]
+                    if target is None:
+                        moves.append(Move((r, c), (nr, nc), p))
+                    else:
+                        if self.piece_color(target) != color:
+                            moves.append(Move((r, c), (nr, nc), p, captured=target))
+                        break
+                    nr += dr;
+                    nc += dc
+            return moves
+
+        if pt == 'K':
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    if dr == 0 and dc == 0: continue
+                    nr, nc = r + dr, c + dc
+                    if not self.in_bounds(nr, nc): continue
+                    target = self.board[nr][nc]
+                    if target is None or self.piece_color(target) != color:
+                        moves.append(Move((r, c), (nr, nc), p, captured=target if target else None))
+
+            if not check_legality: return moves
+
+            if self.chess960:
+                moves.extend(self._castling_moves_960(r, c, p, color))
+            elif (r, c) == ((0, 4) if color == WHITE else (7, 4)):
+                if color == WHITE:
+                    king_side = self.castling_rights.get('K', False)
+                    queen_side = self.castling_rights.get('Q', False)
+                    rank = 0
+                else:
+                    king_side = self.castling_rights.get('k', False)
+                    queen_side = self.castling_rights.get('q', False)
+                    rank = 7
+                if king_side:
+                    if self.board[rank][5] is None and self.board[rank][6] is None:
+                        rook = self.board[rank][7]
+                        if rook and rook.upper() == 'R' and self.piece_color(rook) == color:
+                            if not self.is_square_attacked((rank, 4),
+                                                           self._opponent(color)) and not self.is_square_attacked(
+                                (rank, 5), self._opponent(color)) and not self.is_square_attacked((rank, 6),
+                                                                                                  self._opponent(
+                                                                                                      color)):
+                                moves.append(Move((r, c), (rank, 6), p, is_castle=True))
+                if queen_side:
+                    if self.board[rank][3] is None and self.board[rank][2] is None and self.board[rank][1] is None:
+                        rook = self.board[rank][0]
+                        if rook and rook.upper() == 'R' and self.piece_color(rook) == color:
+                            if not self.is_square_attacked((rank, 4),
+                                                           self._opponent(color)) and not self.is_square_attacked(
+                                (rank, 3), self._opponent(color)) and not self.is_square_attacked((rank, 2),
+                                                                                                  self._opponent(
+                                                                                                      color)):
+                                moves.append(Move((r, c), (rank, 2), p, is_castle=True))
+            return moves
+
+        return moves
+
+    def _castling_moves_960(self, r, c, p, color):
+        """
+        Roques Chess960, codés « le roi prend sa tour » (to_sq = case de la tour)
+        pour rester distincts d'un simple pas du roi vers g1/c1.
+        """
+        rank = 0 if color == WHITE else 7
+        if (r, c) != (rank, self.castling_king_file): return []
+        b = self.board
+        opponent = self._opponent(color)
+        moves = []
+        for (rr, rf), side in self.castling_rooks.items():
+            if rr != rank or not self.castling_rights[side]: continue
+            rook = b[rank][rf]
+            if rook is None or rook.upper() != 'R' or self.piece_color(rook) != color: continue
+            king_to, rook_to = (6, 5) if rf > c else (2, 3)
+            lo, hi = min(c, rf, king_to, rook_to), max(c, rf, king_to, rook_to)
+            if any(b[rank][f] is not None and f != c and f != rf for f in range(lo, hi + 1)): continue
+            # Roi et tour retirés le temps du test : une pièce adverse masquée par la tour compte
+            b[rank][c] = b[rank][rf] = None
+            step = 1 if king_to >= c else -1
+            safe = not any(self.is_square_attacked((rank, f), opponent) for f in range(c, king_to + step, step))
+            b[rank][c], b[rank][rf] = p, rook
+            if safe: moves.append(Move((r, c), (rank, rf), p, is_castle=True))
+        return moves
+
+    def _make_move_internal(self, m: Move):
+        fr_r, fr_c = m.from_sq;
+        to_r, to_c = m.to_sq
+        piece = self.board[fr_r][fr_c]
+        assert piece is not None
+        if piece.upper() == 'P' or m.captured:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if m.is_en_passant:
+            m.captured = self._remove(fr_r, to_c)
+        if m.is_castle and self.chess960:
+            rook = self._remove(to_r, to_c)
+            self._remove(fr_r, fr_c)
+            king_to, rook_to = (6, 5) if to_c > fr_c else (2, 3)
+            self._put(to_r, king_to, piece)
+            self._put(to_r, rook_to, rook)
+            self.en_passant_target = None
+            side = 'KQ' if piece.isupper() else 'kq'
+            self.castling_rights[side[0]] = self.castling_rights[side[1]] = False
+            return
+        if m.is_castle:
+            if to_c == 6:
+                rank = to_r
+                self._put(rank, 5, self._remove(rank, 7))
+            elif to_c == 2:
+                rank = to_r
+                self._put(rank, 3, self._remove(rank, 0))
+        if self.board[to_r][to_c] is not None and not m.is_en_passant:
+            m.captured = self._remove(to_r, to_c)
+        self._remove(fr_r, fr_c)
+        self._put(to_r, to_c, m.promotion if m.promotion else piece)
+        self.en_passant_target = None
+        if piece.upper() == 'P' and abs(to_r - fr_r) == 2:
+            ep_r = (to_r + fr_r) // 2;
+            ep_c = fr_c
+            self.en_passant_target = (ep_r, ep_c)
+        if piece.upper() == 'K':
+            if piece.isupper():
+                self.castling_rights['K'] = False;
+                self.castling_rights['Q'] = False
+            else:
+                self.castling_rights['k'] = False;
+                self.castling_rights['q'] = False
+        if piece.upper() == 'R':
+            side = self.castling_rooks.get((fr_r, fr_c))
+            if side: self.castling_rights[side] = False
+        if m.captured and m.captured.upper() == 'R':
+            side = self.castling_rooks.get((to_r, to_c))
+            if side: self.castling_rights[side] = False
+
+    def push_move(self, m: Move):
+        fr_r, fr_c = m.from_sq
+        to_r, to_c = m.to_sq
+        # Annulation par différences : pièce jouée, pièce prise et sa case, scalaires de la position
+        if m.is_castle:
+            captured, cap_sq = None, None
+        else:
+            cap_sq = (fr_r, to_c) if m.is_en_passant else m.to_sq
+            captured = self.board[cap_sq[0]][cap_sq[1]]
+        state = (self.board[fr_r][fr_c], captured, cap_sq, tuple(self.castling_rights.values()),
+                 self.en_passant_target, self.halfmove_clock, self.fullmove_number, self.turn, self.hash)
+        self.history.append((m, state))
+        self.move_codes.append(pack_move(m))
+        self.hash ^= self._state_key()
+        self._make_move_internal(m)
+        if self.turn == BLACK: self.fullmove_number += 1
+        self.turn = self._opponent(self.turn)
+        self.hash ^= self._state_key()
+        self.hash_history.append(self.hash)
+        self.rep_counts[self.hash] += 1
+
+    def undo_move(self):
+        if not self.history: return
+        m, state = self.history.pop()
+        if self._codes_shared:
+            # Un GameRecord voit encore ce tableau : copie avant la première modification
+            self.move_codes = self.move_codes[:-1]
+            self._codes_shared = False
+        else:
+            self.move_codes.pop()
+        piece, captured, cap_sq, rights, ep, halfmove, fullmove, turn, key = state
+        fr_r, fr_c = m.from_sq
+        to_r, to_c = m.to_sq
+        # _put / _remove remettent aussi matériel, tables pièce-case, listes de pièces et cases des rois
+        if m.is_castle and self.chess960:
+            king_to, rook_to = (6, 5) if to_c > fr_c else (2, 3)
+            rook = self._remove(to_r, rook_to)
+            self._remove(to_r, king_to)
+            self._put(fr_r, fr_c, piece)
+            self._put(to_r, to_c, rook)
+        elif m.is_castle:
+            rook_from, rook_to = (7, 5) if to_c == 6 else (0, 3)
+            self._remove(to_r, to_c)
+            self._put(fr_r, fr_c, piece)
+            self._put(to_r, rook_from, self._remove(to_r, rook_to))
+        else:
+            self._remove(to_r, to_c)
+            self._put(fr_r, fr_c, piece)
+            if captured: self._put(cap_sq[0], cap_sq[1], captured)
+        for side, right in zip(self.castling_rights, rights):
+            self.castling_rights[side] = right
+        self.en_passant_target = ep
+        self.halfmove_clock = halfmove
+        self.fullmove_number = fullmove
+        self.turn = turn
+        if self.hash_history:
+            self.rep_counts[self.hash_history.pop()] -= 1
+        self.hash = key
+
+    def position_hash(self) -> int:
+        return self.hash
+
+    def repetitions(self) -> int:
+        """Occurrences de la position courante depuis set_fen (1 à la première)."""
+        return self.rep_counts[self.hash]
+
+    def record(self) -> 'GameRecord':
+        """Partie jouée depuis start_fen, en O(1) : le tableau de coups est partagé, pas copié."""
+        self._codes_shared = True
+        return GameRecord(self.move_codes, len(self.move_codes), self.start_fen, self.chess960)
+
+    def make_move_uci(self, uci: str, prompt_promotion: bool = False) -> Optional[Move]:
+        m = self.find_move_uci(uci)
+        if m: self.push_move(m)
+        return m
+
+    def find_move_uci(self, uci: str) -> Optional[Move]:
+        """Retrouve le coup légal correspondant à une chaîne UCI, sans le jouer."""
+        if len(uci) < 4: return None
+        try:
+            from_file = FILES.index(uci[0]);
+            from_rank = RANKS.index(uci[1])
+            to_file = FILES.index(uci[2]);
+            to_rank = RANKS.index(uci[3])
+        except ValueError:
+            return None
+        fr = (from_rank, from_file);
+        to = (to_rank, to_file)
+        promotion = uci[4] if len(uci) >= 5 else None
+        moves = self.generate_moves(legal=True)
+        candidates = [m for m in moves if m.from_sq == fr and m.to_sq == to]
+        if not candidates: return None
+        promos = [m for m in candidates if m.promotion]
+        if promos and not promotion: return None
+        for m in candidates:
+            if promotion:
+                if m.promotion and promotion.lower() == m.promotion[0].lower():
+                    return m
+            else:
+                if not m.promotion:
+                    return m
+        return None
+
+    def has_legal_move(self) -> bool:
+        """Vrai dès le premier coup légal trouvé, sans générer la liste complète."""
+        for r, c in self.piece_squares[self.turn]:
+            for m in self._piece_moves(r, c, self.board[r][c]):
+                if self._leaves_king_safe(m): return True
+        return False
+
+    def terminal_status(self) -> Optional[Tuple[str, Optional[str]]]:
+        """Mat ou pat (None sinon), mémorisé par clé de position dans _TERMINAL_CACHE."""
+        status = _TERMINAL_CACHE.get(self.hash, _UNKNOWN)
+        if status is _UNKNOWN:
+            if self.has_legal_move():
+                status = None
+            elif self.king_in_check(self.turn):
+                status = ('checkmate', self._opponent(self.turn))
+            else:
+                status = ('stalemate', None)
+            if len(_TERMINAL_CACHE) >= TERMINAL_CACHE_SIZE: _TERMINAL_CACHE.clear()
+            _TERMINAL_CACHE[self.hash] = status
+        return status
+
+    def game_status(self):
+        status = self.terminal_status()
+        if status: return status
+        if self.halfmove_clock >= 100: return ('draw', None)
+        if self.rep_counts[self.hash] >= 3: return ('draw', None)
+        return ('ongoing', None)
+
+    def playout(self, seed: Optional[int] = None, max_plies: int = PLAYOUT_MAX_PLIES) -> Tuple[str, Optional[str], int]:
+        """
+        Partie à coups légaux tirés au hasard (graine seed) jusqu'à la fin, avec
+        les règles de game_status, ou jusqu'à max_plies demi-coups ; le plateau
+        est ensuite ramené à la position de départ. Renvoie (statut, vainqueur,
+        demi-coups joués). La liste des coups sert aussi à détecter mat et pat,
+        sans passer par _TERMINAL_CACHE que des positions aléatoires videraient.
+        """
+        rng = random.Random(seed)
+        plies = 0
+        try:
+            while True:
+                moves = self.generate_moves(legal=True)
+                if not moves:
+                    status = ('checkmate', self._opponent(self.turn)) if self.king_in_check(self.turn) \
+                        else ('stalemate', None)
+                    break
+                if self.halfmove_clock >= 100 or self.rep_counts[self.hash] >= 3:
+                    status = ('draw', None)
+                    break
+                if plies >= max_plies:
+                    status = ('ongoing', None)
+                    break
+                # Ordre des coups fixé : celui de piece_squares (ensembles) change après undo_move
+                moves.sort(key=pack_move)
+                self.push_move(rng.choice(moves))
+                plies += 1
+        finally:
+            for _ in range(plies): self.undo_move()
+        return status[0], status[1], plies
+
+
+# ---------------- notation ----------------
+class GameRecord:
+    """
+    Partie figée : FEN de départ et demi-coups compactés (2 octets chacun).
+    Le tableau peut être partagé avec le Board qui l'a produit et avec d'autres
+    GameRecord : seuls ses n premiers éléments sont lus, et le Board ne réécrit
+    jamais un coup déjà partagé (copie avant tout retour en arrière).
+    """
+    __slots__ = ('start_fen', 'chess960', '_codes', '_n')
+
+    def __init__(self, codes: Optional[array] = None, n: Optional[int] = None,
+                 start_fen: Optional[str] = None, chess960: bool = False):
+        self._codes = codes if codes is not None else array('H')
+        self._n = len(self._codes) if n is None else n
+        self.start_fen = start_fen
+        self.chess960 = chess960
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> int:
+        if i < 0: i += self._n
+        if not 0 <= i < self._n: raise IndexError(i)
+        return self._codes[i]
+
+    def __iter__(self) -> Iterator[int]:
+        return itertools.islice(self._codes, self._n)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, GameRecord) and self._n == other._n and self.start_fen == other.start_fen
+                and all(a == b for a, b in zip(self, other)))
+
+    @property
+    def nbytes(self) -> int:
+        return self._n * self._codes.itemsize
+
+    def uci(self, i: int) -> str:
+        return packed_to_uci(self[i])
+
+    def prefix(self, n: int) -> 'GameRecord':
+        """Les n premiers demi-coups, sans copie."""
+        return GameRecord(self._codes, max(0, min(n, self._n)), self.start_fen, self.chess960)
+
+    def board(self, plies: Optional[int] = None) -> Board:
+        """Board rejoué jusqu'au demi-coup plies (toute la partie par défaut), annulation comprise."""
+        b = Board(self.start_fen, chess960=self.chess960) if self.start_fen else Board(chess960=self.chess960)
+        for code in itertools.islice(self._codes, self._n if plies is None else min(plies, self._n)):
+            m = b.find_move_uci(packed_to_uci(code))
+            if m is None: break
+            b.push_move(m)
+        return b
+
+    def to_bytes(self) -> bytes:
+        return self._codes[:self._n].tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, start_fen: Optional[str] = None, chess960: bool = False) -> 'GameRecord':
+        codes = array('H')
+        codes.frombytes(data)
+        return cls(codes, len(codes), start_fen, chess960)
+
+
+def move_to_readable(m: Move) -> str:
+    if m.is_castle: return "O-O" if m.to_sq[1] > m.from_sq[1] else "O-O-O"
+    piece = m.piece.upper()
+    dest = FILES[m.to_sq[1]] + RANKS[m.to_sq[0]]
+    capture = 'x' if m.captured else ''
+    promo = f"={m.promotion.upper()}" if m.promotion else ''
+
+    if piece == 'P':
+        if capture:
+            from_file = FILES[m.from_sq[1]]
+            return f"{from_file}x{dest}{promo}"
+        else:
+            return f"{dest}{promo}"
+    else:
+        return f"{piece}{capture}{dest}{promo}"
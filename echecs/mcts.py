@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/mcts.py - Parties aléatoires (Board.playout) : analyse Monte-Carlo et
+génération de charge multiprocessus.
+
+MonteCarloSearch est une recherche arborescente Monte-Carlo (UCT) : chaque
+itération descend l'arbre par la borne UCB1, ajoute un nœud, termine la
+partie au hasard depuis là et remonte le résultat. Son rapport a le format de
+Search.iterate, ce qui permet de la brancher sur AnalysisWorker et
+choose_move (mode 'mcts'). Une partie coupée à rollout_plies compte nulle.
+
+run_playouts répartit des parties aléatoires à graines fixes sur un pool de
+processus : débit du générateur de coups et de push_move / undo_move, et
+résultats identiques quel que soit le nombre de processus.
+"""
+import collections
+import math
+import multiprocessing as mp
+import os
+import random
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from echecs.engine import PLAYOUT_MAX_PLIES, Board, Move, pack_move
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+EXPLORATION = 1.4
+ROLLOUT_PLIES = 80
+DEFAULT_ITERATIONS = 2000
+REPORT_EVERY = 64  # itérations entre deux rapports on_info
+PLAYOUT_CHUNK = 16  # parties par tâche envoyée au pool
+
+
+class MctsNode:
+    __slots__ = ('move', 'parent', 'children', 'untried', 'visits', 'score')
+
+    def __init__(self, move: Optional[Move], parent: Optional['MctsNode'], untried: List[Move]):
+        self.move = move
+        self.parent = parent
+        self.children: List['MctsNode'] = []
+        self.untried = untried
+        self.visits = 0
+        self.score = 0.0  # somme des résultats du point de vue du camp qui a joué move
+
+    def uct(self, log_parent: float, exploration: float) -> float:
+        return self.score / self.visits + exploration * math.sqrt(log_parent / self.visits)
+
+
+def win_rate_to_score(q: float) -> int:
+    """Taux de gain en « centipions » (échelle Elo), pour afficher les lignes comme Search."""
+    q = min(max(q, 0.001), 0.999)
+    return int(round(-400 * math.log10(1 / q - 1)))
+
+
+class MonteCarloSearch:
+    def __init__(self, board: Board, seed: Optional[int] = None, exploration: float = EXPLORATION,
+                 rollout_plies: int = ROLLOUT_PLIES):
+        self.board = board
+        self.rng = random.Random(seed)
+        self.exploration = exploration
+        self.rollout_plies = rollout_plies
+        self.root = MctsNode(None, None, self._untried())
+        self.nodes = 0  # itérations
+        self.plies = 0  # demi-coups joués dans les parties aléatoires
+        self.stop_event: Optional[threading.Event] = None
+        self.throttle: Optional[Callable[[], None]] = None
+
+    def _untried(self) -> List[Move]:
+        if self.board.game_status()[0] != 'ongoing': return []
+        # Trié, pour qu'une même graine redonne le même arbre
+        return sorted(self.board.generate_moves(legal=True), key=pack_move)
+
+    def _select(self) -> Tuple[MctsNode, int]:
+        """Descente UCB1 puis expansion d'un coup non essayé ; renvoie le nœud et les coups joués."""
+        node, pushed = self.root, 0
+        while not node.untried and node.children:
+            log_parent = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.uct(log_parent, self.exploration))
+            self.board.push_move(node.move)
+            pushed += 1
+        if node.untried:
+            m = node.untried.pop(self.rng.randrange(len(node.untried)))
+            self.board.push_move(m)
+            pushed += 1
+            child = MctsNode(m, node, self._untried())
+            node.children.append(child)
+            node = child
+        return node, pushed
+
+    def step(self):
+        """Une itération : sélection, expansion, partie aléatoire, remontée du résultat."""
+        node, pushed = self._select()
+        mover = self.board._opponent(self.board.turn)
+        status, winner, plies = self.board.playout(self.rng.getrandbits(64), self.rollout_plies)
+        for _ in range(pushed): self.board.undo_move()
+        result = 1.0 if winner == mover else 0.0 if winner else 0.5
+        while node is not None:
+            node.visits += 1
+            node.score += result
+            result = 1.0 - result
+            node = node.parent
+        self.nodes += 1
+        self.plies += plies
+
+    def principal_variation(self, first: MctsNode, max_len: int = 12) -> List[Move]:
+        pv, node = [], first
+        while node is not None and len(pv) < max_len:
+            pv.append(node.move)
+            node = max(node.children, key=lambda child: child.visits) if node.children else None
+        return pv
+
+    def lines(self, multipv: int = 1) -> List[Tuple[int, List[Move]]]:
+        """Les multipv coups les plus visités : [(score, PV), ...], comme Search.search_root."""
+        ranked = sorted((c for c in self.root.children if c.visits), key=lambda c: -c.visits)
+        return [(win_rate_to_score(c.score / c.visits), self.principal_variation(c)) for c in ranked[:multipv]]
+
+    def _report(self, t0: float, multipv: int) -> Dict:
+        elapsed = time.perf_counter() - t0
+        lines = self.lines(multipv)
+        return {'depth': len(lines[0][1]) if lines else 0, 'lines': lines, 'nodes': self.nodes,
+                'nps': int(self.nodes / elapsed) if elapsed > 0 else 0, 'elapsed': elapsed, 'plies': self.plies}
+
+    def iterate(self, max_iterations: Optional[int] = DEFAULT_ITERATIONS, multipv: int = 1,
+                on_info: Optional[Callable[[Dict], None]] = None, stop_event: Optional[threading.Event] = None,
+                time_limit: Optional[float] = None) -> Dict:
+        """Itérations jusqu'à max_iterations (None : sans limite), stop_event ou time_limit."""
+        self.stop_event = stop_event
+        t0 = time.perf_counter()
+        deadline = t0 + time_limit if time_limit else None
+        start = self.nodes
+        while self.root.untried or self.root.children:
+            if max_iterations is not None and self.nodes - start >= max_iterations: break
+            if self.stop_event is not None and self.stop_event.is_set(): break
+            if deadline and time.perf_counter() >= deadline: break
+            self.step()
+            if self.throttle: self.throttle()
+            if on_info and (self.nodes - start) % REPORT_EVERY == 0: on_info(self._report(t0, multipv))
+        info = self._report(t0, multipv)
+        if on_info: on_info(info)
+        return info
+
+
+def _max_rss_kb() -> Optional[int]:
+    """Pic de mémoire résidente du processus (Ko), None sans le module resource."""
+    if resource is None: return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def _playout_batch(job: Tuple[str, bool, List[int], int]) -> Dict:
+    fen, chess960, seeds, max_plies = job
+    board = Board(fen, chess960=chess960)
+    results = collections.Counter()
+    plies = 0
+    t0 = time.perf_counter()
+    for seed in seeds:
+        status, winner, n = board.playout(seed, max_plies)
+        results[winner or status] += 1
+        plies += n
+    return {'pid': os.getpid(), 'games': len(seeds), 'plies': plies, 'results': results,
+            'elapsed': time.perf_counter() - t0, 'max_rss_kb': _max_rss_kb()}
+
+
+def run_playouts(board: Board, games: int, workers: Optional[int] = None, seed: int = 0,
+                 max_plies: int = PLAYOUT_MAX_PLIES) -> Dict:
+    """
+    games parties aléatoires depuis board (graines seed, seed + 1, ...) sur
+    workers processus. Résultats par vainqueur ('w', 'b') ou statut ('draw',
+    'stalemate', 'ongoing' si coupée), débits et pic mémoire par processus.
+    """
+    seeds = list(range(seed, seed + games))
+    jobs = [(board.fen(), board.chess960, seeds[i:i + PLAYOUT_CHUNK], max_plies)
+            for i in range(0, games, PLAYOUT_CHUNK)]
+    results = collections.Counter()
+    plies, rss = 0, {}
+    t0 = time.perf_counter()
+    with mp.get_context().Pool(workers) as pool:
+        for batch in pool.imap_unordered(_playout_batch, jobs):
+            results.update(batch['results'])
+            plies += batch['plies']
+            rss[batch['pid']] = batch['max_rss_kb']
+    elapsed = time.perf_counter() - t0
+    return {'games': games, 'plies': plies, 'elapsed': elapsed, 'results': dict(results),
+            'games_per_s': games / elapsed if elapsed > 0 else 0.0,
+            'plies_per_s': plies / elapsed if elapsed > 0 else 0.0,
+            'workers': len(rss), 'max_rss_kb': rss}
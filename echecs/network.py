@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/network.py - Liaison LAN entre deux joueurs et diffusion aux spectateurs.
+
+Protocole texte, un message par ligne (terminé par '\\n') :
+    e2e4            coup UCI
+    TIME:<cadence>  cadence de la partie (voir echecs.clock, ex. 40/90+30, 30+30)
+    CMD:<...>       commandes (revanche, remise à zéro)
+    CLOCK:<w>:<b>   pendules (secondes, décimales), envoyées aux spectateurs après chaque coup
+    SNAP:<fen>|<w>|<b>  instantané pour un spectateur qui rejoint ou rattrape
+
+Entre les deux joueurs, chaque message applicatif est numéroté « <seq>|<message> »
+et conservé dans un journal jusqu'à son acquittement. Messages de contrôle :
+    HELLO:<jeton|->:<dernier seq reçu>     ouverture ou reprise (client -> hôte)
+    WELCOME:<jeton>:<dernier seq reçu>     réponse de l'hôte
+    PING:<dernier seq reçu>                battement de cœur, vaut acquittement
+Si la liaison tombe (ou si aucun battement n'arrive pendant DEAD_PEER_TIMEOUT),
+le client se reconnecte avec son jeton de session, l'hôte le réaccepte, et chaque
+côté ne rejoue que les messages que l'autre n'a pas reçus.
+"""
+import collections
+import secrets
+import selectors
+import socket
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+PORT = 5000
+SPECTATOR_PORT = PORT + 1
+HEARTBEAT_INTERVAL = 1.0
+DEAD_PEER_TIMEOUT = 4.0
+RECONNECT_WINDOW = 60.0
+
+
+class LinkDown(Exception):
+    pass
+
+
+# ---------------- GESTIONNAIRE RÉSEAU ----------------
+class NetworkManager:
+    def __init__(self, is_host, ip=None, spectator=False, port=PORT):
+        self.is_host = is_host
+        self.is_spectator = spectator
+        self.port = port
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.conn = None
+        self.addr = None
+        self.connected = False
+        self.link_up = False
+        self.local_ip = "127.0.0.1"
+        self.target_ip = ip
+        self.spectators: Optional[SpectatorHub] = None
+        self.on_state_change: Optional[Callable[[str], None]] = None
+        self.session_token: Optional[str] = None
+        self.send_seq = 0
+        self.last_rx_seq = 0
+        self.sent_log: Deque[Tuple[int, str]] = collections.deque()
+        self._send_lock = threading.Lock()
+        self._closing = False
+        self._rx = b''
+
+        if self.is_host:
+            self._start_server()
+
+    def _start_server(self):
+        try:
+            try:
+                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                s.connect(("8.8.8.8", 80))
+                self.local_ip = s.getsockname()[0]
+                s.close()
+            except:
+                self.local_ip = socket.gethostbyname(socket.gethostname())
+
+            self.socket.bind(('0.0.0.0', self.port))
+            self.socket.listen(1)
+        except Exception as e:
+            raise RuntimeError(f"Erreur liaison port {self.port}: {e}")
+
+    def enable_spectators(self, port: int = SPECTATOR_PORT):
+        """Côté hôte : ouvre le port spectateurs (alimenté ensuite par broadcast)."""
+        if self.spectators is None:
+            self.spectators = SpectatorHub(port=port).start()
+        return self.spectators
+
+    def connect(self):
+        try:
+            if self.is_host:
+                while True:
+                    self.conn, self.addr = self.socket.accept()
+                    if self._handshake(): break
+            else:
+                self.socket.settimeout(5)
+                self.socket.connect((self.target_ip, self.port))
+                self.socket.settimeout(None)
+                self.conn = self.socket
+                if not self.is_spectator and not self._handshake(): return False
+            self.connected = True
+            if self.is_spectator:
+                self.link_up = True  # joueurs : levé par _replay
+            else:
+                threading.Thread(target=self._heartbeat, daemon=True).start()
+            return True
+        except Exception as e:
+            print(f"Erreur connexion: {e}")
+            return False
+
+    # ---------------- session & reprise ----------------
+    def _handshake(self) -> bool:
+        """Ouvre ou reprend la session puis rejoue ce que le pair n'a pas reçu."""
+        self._rx = b''
+        self.conn.settimeout(DEAD_PEER_TIMEOUT)
+        try:
+            if self.is_host:
+                kind, token, peer_last = self._read_line().split(':')
+                if kind != 'HELLO': return self._reject()
+                if self.session_token is None and token == '-':
+                    self.session_token = secrets.token_hex(8)
+                elif token != self.session_token:
+                    return self._reject()
+                self._send_raw(f"WELCOME:{self.session_token}:{self.last_rx_seq}")
+            else:
+                self._send_raw(f"HELLO:{self.session_token or '-'}:{self.last_rx_seq}")
+                kind, token, peer_last = self._read_line().split(':')
+                if kind != 'WELCOME' or (self.session_token and token != self.session_token): return False
+                self.session_token = token
+            self._replay(int(peer_last))
+            return True
+        except (LinkDown, OSError, ValueError):
+            return self._reject()
+
+    def _reject(self) -> bool:
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        return False
+
+    def _replay(self, peer_last: int):
+        with self._send_lock:
+            self._trim_log(peer_last)
+            for seq, data in self.sent_log:
+                self.conn.sendall(f"{seq}|{data}\n".encode())
+            # Sous le verrou : un send_packet arrivé après le rejeu part directement, sinon il serait perdu
+            self.link_up = True
+
+    def _trim_log(self, acked: int):
+        while self.sent_log and self.sent_log[0][0] <= acked:
+            self.sent_log.popleft()
+
+    def _notify(self, state: str):
+        if self.on_state_change: self.on_state_change(state)
+
+    def _reconnect(self) -> bool:
+        """Tente de rétablir la liaison pendant RECONNECT_WINDOW secondes."""
+        self.link_up = False
+        self._notify('reconnecting')
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        deadline = time.monotonic() + RECONNECT_WINDOW
+        while not self._closing and time.monotonic() < deadline:
+            try:
+                if self.is_host:
+                    self.socket.settimeout(max(0.1, deadline - time.monotonic()))
+                    self.conn, self.addr = self.socket.accept()
+                else:
+                    self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    self.socket.settimeout(2)
+                    self.socket.connect((self.target_ip, self.port))
+                    self.conn = self.socket
+                if self._handshake():
+                    self._notify('connected')
+                    return True
+            except OSError:
+                if not self.is_host: self.socket.close()
+                time.sleep(0.5)
+        self.connected = False
+        self._notify('lost')
+        return False
+
+    def _heartbeat(self):
+        while self.connected and not self._closing:
+            time.sleep(HEARTBEAT_INTERVAL)
+            if self.link_up:
+                try:
+                    self._send_raw(f"PING:{self.last_rx_seq}")
+                except OSError:
+                    pass  # la lecture détectera la coupure et lancera la reprise
+
+    # ---------------- envoi / réception ----------------
+    def _send_raw(self, line: str):
+        with self._send_lock:
+            self.conn.sendall(line.encode() + b'\n')
+
+    def _read_line(self) -> str:
+        while b'\n' not in self._rx:
+            data = self.conn.recv(4096)  # délai DEAD_PEER_TIMEOUT : pas de battement = pair mort
+            if not data: raise LinkDown()
+            self._rx += data
+        line, self._rx = self._rx.split(b'\n', 1)
+        return line.decode()
+
+    def send_packet(self, data: str):
+        """Envoie une donnée (Coup ou Commande)"""
+        if not self.connected or not self.conn: return
+        with self._send_lock:
+            self.send_seq += 1
+            self.sent_log.append((self.send_seq, data))
+            if not self.link_up: return  # sera rejoué à la reprise
+            try:
+                self.conn.sendall(f"{self.send_seq}|{data}\n".encode())
+            except Exception as e:
+                print(f"Erreur d'envoi: {e}")
+
+    def broadcast(self, data: str, snapshot: Optional[str] = None):
+        """Diffuse aux spectateurs ; snapshot est l'état après ce message (pour les arrivants)."""
+        if self.spectators: self.spectators.publish(data, snapshot)
+
+    def receive_packet(self) -> Optional[str]:
+        """Prochain message applicatif ; bloque pendant une reprise, None si la session est perdue."""
+        while self.connected and self.conn:
+            try:
+                line = self._read_line()
+            except (LinkDown, OSError):
+                if self._closing or self.is_spectator or not self._reconnect():
+                    self.connected = False
+                    return None
+                continue
+            if self.is_spectator: return line
+            if line.startswith('PING:'):
+                if line[5:].isdigit():
+                    with self._send_lock:
+                        self._trim_log(int(line[5:]))
+                continue
+            seq, _, data = line.partition('|')
+            if not seq.isdigit(): continue
+            if int(seq) <= self.last_rx_seq: continue  # doublon rejoué
+            self.last_rx_seq = int(seq)
+            return data
+        return None
+
+    def close(self):
+        self._closing = True
+        self.connected = False
+        if self.spectators:
+            self.spectators.close()
+        try:
+            if self.conn:
+                self.conn.shutdown(socket.SHUT_RDWR)
+                self.conn.close()
+        except:
+            pass
+        try:
+            if self.socket: self.socket.close()
+        except:
+            pass
+
+
+# ---------------- DIFFUSION SPECTATEURS ----------------
+class _Viewer:
+    __slots__ = ('sock', 'out', 'partial', 'catchups')
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.out = bytearray()
+        self.partial = False  # le tampon commence au milieu d'une ligne déjà entamée
+        self.catchups = 0
+
+
+class SpectatorHub:
+    """
+    Diffusion en lecture seule vers de nombreux spectateurs.
+    Un seul fil gère toutes les sockets (non bloquantes) via selectors ; chaque
+    spectateur a une file d'envoi bornée. Un spectateur trop lent voit sa file
+    remplacée par l'instantané courant (rattrapage) ; au-delà de max_catchups
+    rattrapages, il est déconnecté. Un nouvel arrivant reçoit l'instantané
+    puis le flux en direct.
+    """
+
+    def __init__(self, host: str = '0.0.0.0', port: int = SPECTATOR_PORT, max_pending: int = 64 * 1024,
+                 max_catchups: int = 3, send_buffer: int = 64 * 1024):
+        self.max_pending = max_pending
+        self.send_buffer = send_buffer  # tampon noyau borné : un spectateur bloqué est détecté vite
+        self.max_catchups = max_catchups
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((host, port))
+        self.listener.listen(128)
+        self.listener.setblocking(False)
+        self.port = self.listener.getsockname()[1]
+        self.snapshot = b''
+        self.viewers: Dict[int, _Viewer] = {}
+        self.stats = {'published': 0, 'catchups': 0, 'dropped': 0, 'joined': 0}
+        self._lock = threading.Lock()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._running = False
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self._running = True
+        self._thread.start()
+        return self
+
+    def set_snapshot(self, snapshot: str):
+        with self._lock:
+            self.snapshot = snapshot.encode() + b'\n'
+
+    def publish(self, msg: str, snapshot: Optional[str] = None):
+        data = msg.encode() + b'\n'
+        with self._lock:
+            # Instantané et message changent ensemble : un arrivant ne voit jamais l'un sans l'autre
+            if snapshot is not None: self.snapshot = snapshot.encode() + b'\n'
+            self.stats['published'] += 1
+            for v in self.viewers.values():
+                if len(v.out) + len(data) > self.max_pending:
+                    self._catch_up(v)
+                else:
+                    v.out += data
+        self._wake()
+
+    def _catch_up(self, v: _Viewer):
+        # On garde la fin de la ligne entamée pour ne pas casser le découpage
+        head = b''
+        if v.partial:
+            end = v.out.find(b'\n')
+            head = bytes(v.out[:end + 1]) if end >= 0 else bytes(v.out)
+        v.out = bytearray(head + self.snapshot)
+        v.catchups += 1
+        self.stats['catchups'] += 1
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def viewer_count(self) -> int:
+        return len(self.viewers)
+
+    def _drop(self, sel, v: _Viewer):
+        try:
+            sel.unregister(v.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            v.sock.close()
+        except OSError:
+            pass
+        with self._lock:
+            self.viewers.pop(id(v), None)
+
+    def _loop(self):
+        sel = selectors.DefaultSelector()
+        sel.register(self.listener, selectors.EVENT_READ, 'accept')
+        sel.register(self._wake_r, selectors.EVENT_READ, 'wake')
+        registered: Dict[int, int] = {}
+        while self._running:
+            with self._lock:
+                viewers: List[_Viewer] = list(self.viewers.values())
+            for v in viewers:
+                if v.catchups > self.max_catchups:
+                    self.stats['dropped'] += 1
+                    registered.pop(id(v), None)
+                    self._drop(sel, v)
+                    continue
+                events = selectors.EVENT_READ | (selectors.EVENT_WRITE if v.out else 0)
+                if registered.get(id(v)) != events:
+                    if id(v) in registered:
+                        sel.modify(v.sock, events, v)
+                    else:
+                        sel.register(v.sock, events, v)
+                    registered[id(v)] = events
+            for key, mask in sel.select(timeout=0.5):
+                if key.data == 'accept':
+                    self._accept()
+                elif key.data == 'wake':
+                    try:
+                        while self._wake_r.recv(4096): pass
+                    except (BlockingIOError, OSError):
+                        pass
+                else:
+                    v = key.data
+                    if mask & selectors.EVENT_READ and not self._read_viewer(v):
+                        registered.pop(id(v), None)
+                        self._drop(sel, v)
+                        continue
+                    if mask & selectors.EVENT_WRITE:
+                        self._flush(v)
+        sel.close()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, OSError):
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+            v = _Viewer(sock)
+            with self._lock:
+                v.out += self.snapshot
+                self.viewers[id(v)] = v
+                self.stats['joined'] += 1
+
+    def _read_viewer(self, v: _Viewer) -> bool:
+        # Les spectateurs n'émettent rien : une lecture vide signale la déconnexion
+        try:
+            return bool(v.sock.recv(1024))
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+
+    def _flush(self, v: _Viewer):
+        with self._lock:
+            if not v.out: return
+            try:
+                sent = v.sock.send(v.out)
+            except BlockingIOError:
+                return
+            except OSError:
+                v.catchups = self.max_catchups + 1
+                return
+            v.partial = sent < len(v.out) and v.out[sent - 1:sent] != b'\n' if sent else v.partial
+            del v.out[:sent]
+
+    def close(self):
+        self._running = False
+        self._wake()
+        with self._lock:
+            for v in self.viewers.values():
+                try:
+                    v.sock.close()
+                except OSError:
+                    pass
+            self.viewers.clear()
+        try:
+            self.listener.close()
+        except OSError:
+            pass
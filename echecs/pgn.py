@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/pgn.py - Lecture et écriture de fichiers PGN, conversions SAN <-> Move.
+"""
+import re
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from echecs.engine import FILES, RANKS, Board, Move
+
+_TAG_RE = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+_COMMENT_RE = re.compile(r'\{[^}]*\}|;[^\n]*')
+_MOVE_NUMBER_RE = re.compile(r'^\d+\.+')
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+SEVEN_TAGS = ('Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result')
+
+
+def _strip_variations(text: str) -> str:
+    out, depth = [], 0
+    for ch in text:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth = max(0, depth - 1)
+        elif depth == 0:
+            out.append(ch)
+    return ''.join(out)
+
+
+def _tokens(movetext: str) -> List[str]:
+    text = _strip_variations(_COMMENT_RE.sub(' ', movetext))
+    tokens = []
+    for tok in text.split():
+        tok = _MOVE_NUMBER_RE.sub('', tok)
+        if not tok or tok.startswith('$') or tok in RESULTS: continue
+        tokens.append(tok)
+    return tokens
+
+
+def read_games(path: str) -> Iterator[Tuple[Dict[str, str], List[str]]]:
+    """Itère sur les parties d'un fichier PGN : (en-têtes, liste de coups SAN)."""
+    headers: Dict[str, str] = {}
+    movetext: List[str] = []
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            m = _TAG_RE.match(line)
+            if m:
+                if movetext:
+                    yield headers, _tokens(' '.join(movetext))
+                    headers, movetext = {}, []
+                headers[m.group(1)] = m.group(2)
+            elif line:
+                movetext.append(line)
+    if movetext or headers:
+        yield headers, _tokens(' '.join(movetext))
+
+
+def san_to_move(board: Board, san: str) -> Optional[Move]:
+    """Retrouve le coup légal désigné par une notation SAN (None si invalide)."""
+    san = san.rstrip('+#!?')
+    legal = board.generate_moves(legal=True)
+    if san.replace('0', 'O') in ('O-O', 'O-O-O'):
+        king_side = san.replace('0', 'O') == 'O-O'
+        for m in legal:
+            if m.is_castle and (m.to_sq[1] > m.from_sq[1]) == king_side: return m
+        return None
+    promotion = None
+    if '=' in san:
+        san, promotion = san.split('=', 1)
+        promotion = promotion[:1].upper()
+    elif len(san) > 2 and san[-1] in 'QRBN' and san[-2] in RANKS:
+        san, promotion = san[:-1], san[-1]
+    piece = san[0] if san[0] in 'NBRQK' else 'P'
+    body = san[1:] if piece != 'P' else san
+    body = body.replace('x', '').replace('-', '')
+    if len(body) < 2 or body[-2] not in FILES or body[-1] not in RANKS: return None
+    to_sq = (RANKS.index(body[-1]), FILES.index(body[-2]))
+    disamb = body[:-2]
+    for m in legal:
+        if m.to_sq != to_sq or m.piece.upper() != piece: continue
+        if (m.promotion.upper() if m.promotion else None) != promotion: continue
+        if any(ch in FILES and FILES[m.from_sq[1]] != ch for ch in disamb): continue
+        if any(ch in RANKS and RANKS[m.from_sq[0]] != ch for ch in disamb): continue
+        return m
+    return None
+
+
+def san_body(board: Board, m: Move, legal: Optional[List[Move]] = None) -> str:
+    """SAN sans le suffixe d'échec ; legal : coups légaux de board, s'ils sont déjà connus."""
+    if m.is_castle: return 'O-O' if m.to_sq[1] > m.from_sq[1] else 'O-O-O'
+    (fr, fc), (tr, tc) = m.from_sq, m.to_sq
+    capture = m.is_en_passant or board.board[tr][tc] is not None
+    target = FILES[tc] + RANKS[tr]
+    piece = m.piece.upper()
+    if piece == 'P':
+        return (FILES[fc] + 'x' if capture else '') + target + ('=' + m.promotion.upper() if m.promotion else '')
+    if legal is None: legal = board.generate_moves(legal=True)
+    rivals = [o.from_sq for o in legal if o.piece == m.piece and o.to_sq == m.to_sq and o.from_sq != m.from_sq]
+    disamb = ''
+    if rivals:
+        if all(c != fc for _, c in rivals):
+            disamb = FILES[fc]
+        elif all(r != fr for r, _ in rivals):
+            disamb = RANKS[fr]
+        else:
+            disamb = FILES[fc] + RANKS[fr]
+    return piece + disamb + ('x' if capture else '') + target
+
+
+def move_to_san(board: Board, m: Move) -> str:
+    """SAN d'un coup légal de board (position avant le coup), avec + ou #."""
+    san = san_body(board, m)
+    board.push_move(m)
+    status = board.game_status()[0]
+    if status == 'checkmate':
+        san += '#'
+    elif board.king_in_check(board.turn):
+        san += '+'
+    board.undo_move()
+    return san
+
+
+def write_game(f: TextIO, headers: Dict[str, str], sans: List[str], result: str):
+    """Écrit une partie : les sept balises obligatoires d'abord, coups coupés à 80 colonnes."""
+    tags = [(k, headers.get(k, '?')) for k in SEVEN_TAGS]
+    tags[SEVEN_TAGS.index('Result')] = ('Result', result)
+    tags += [(k, v) for k, v in headers.items() if k not in SEVEN_TAGS]
+    for k, v in tags:
+        f.write(f'[{k} "{v}"]\n')
+    fen = headers.get('FEN')
+    ply = 0
+    if fen:
+        parts = fen.split()
+        ply = 2 * (int(parts[5]) - 1) + (parts[1] == 'b') if len(parts) >= 6 else int(parts[1] == 'b')
+    words = []
+    for i, san in enumerate(sans, ply):
+        if i % 2 == 0:
+            words.append(f"{i // 2 + 1}.")
+        elif i == ply:
+            words.append(f"{i // 2 + 1}...")
+        words.append(san)
+    words.append(result)
+    line = ''
+    f.write('\n')
+    for w in words:
+        if line and len(line) + 1 + len(w) > 80:
+            f.write(line + '\n')
+            line = w
+        else:
+            line = f"{line} {w}" if line else w
+    f.write(line + '\n\n')
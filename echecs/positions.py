@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/positions.py - Graphe des positions visitées pendant une session.
+
+Chaque position déjà rencontrée (toutes parties confondues) est un nœud indexé
+par sa clé de Zobrist : coups légaux (par UCI), mat ou pat, SAN des coups déjà
+affichés et liens vers les positions filles déjà atteintes. Revenir sur une
+position connue, ou rejouer une partie jusqu'à un demi-coup donné, ne
+régénère plus aucun coup.
+
+Le graphe est borné par un budget mémoire estimé (octets) : les nœuds les
+moins récemment consultés sont évincés en premier (LRU).
+"""
+import collections
+import copy
+from typing import Dict, List, Optional, Tuple
+
+from echecs.engine import Board, GameRecord, Move, packed_to_uci
+from echecs.pgn import san_body
+
+DEFAULT_BUDGET = 32 << 20
+# Estimations (CPython 64 bits) servant au budget : nœud vide, coup légal, SAN, lien vers une fille
+NODE_BYTES = 600
+MOVE_BYTES = 420
+SAN_BYTES = 110
+CHILD_BYTES = 100
+
+
+class PositionNode:
+    __slots__ = ('moves', 'terminal', 'san', 'children', 'nbytes')
+
+    def __init__(self, board: Board):
+        self.moves: Dict[str, Move] = {m.uci(): m for m in board.generate_moves(legal=True)}
+        self.terminal: Optional[Tuple[str, Optional[str]]] = board.terminal_status()  # mat / pat, sinon None
+        self.san: Dict[str, str] = {}
+        self.children: Dict[str, int] = {}  # uci -> clé de la position atteinte
+        self.nbytes = NODE_BYTES + MOVE_BYTES * len(self.moves)
+
+
+class PositionGraph:
+    def __init__(self, max_bytes: int = DEFAULT_BUDGET):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._nodes: 'collections.OrderedDict[int, PositionNode]' = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, board: Board) -> bool:
+        return board.position_hash() in self._nodes
+
+    def node(self, board: Board) -> PositionNode:
+        key = board.position_hash()
+        node = self._nodes.get(key)
+        if node is not None:
+            self._nodes.move_to_end(key)
+            self.hits += 1
+            return node
+        self.misses += 1
+        node = self._nodes[key] = PositionNode(board)
+        self._account(node.nbytes)
+        return node
+
+    def _account(self, nbytes: int):
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes and len(self._nodes) > 1:
+            _, old = self._nodes.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def legal_moves(self, board: Board) -> List[Move]:
+        """Coups légaux (objets partagés par le cache : ne pas les modifier)."""
+        return list(self.node(board).moves.values())
+
+    def find(self, board: Board, uci: str) -> Optional[Move]:
+        m = self.node(board).moves.get(uci)
+        return copy.copy(m) if m else None
+
+    def status(self, board: Board) -> Tuple[str, Optional[str]]:
+        """Comme Board.game_status() ; mat et pat viennent du nœud."""
+        terminal = self.node(board).terminal
+        return terminal if terminal else board.game_status()
+
+    def push(self, board: Board, uci: str) -> Optional[Move]:
+        """Joue uci sur board (None si illégal), SAN et lien vers la position fille mémorisés."""
+        played = self._push(board, uci)
+        return played[0] if played else None
+
+    def _push(self, board: Board, uci: str) -> Optional[Tuple[Move, str]]:
+        parent_key = board.position_hash()
+        parent = self.node(board)
+        m = parent.moves.get(uci)
+        if m is None: return None
+        san = parent.san.get(uci)
+        body = san_body(board, m, list(parent.moves.values())) if san is None else None
+        m = copy.copy(m)
+        board.push_move(m)
+        child = self.node(board)
+        extra = 0
+        if san is None:
+            if child.terminal and child.terminal[0] == 'checkmate':
+                san = body + '#'
+            else:
+                san = body + '+' if board.king_in_check(board.turn) else body
+            parent.san[uci] = san
+            extra += SAN_BYTES
+        if uci not in parent.children:
+            parent.children[uci] = board.position_hash()
+            extra += CHILD_BYTES
+        if extra:
+            parent.nbytes += extra
+            if parent_key in self._nodes: self._account(extra)
+        return m, san
+
+    def san(self, board: Board, uci: str) -> Optional[str]:
+        """SAN de uci dans board (calculée une fois par nœud)."""
+        san = self.node(board).san.get(uci)
+        if san is None:
+            played = self._push(board, uci)
+            if played is None: return None
+            board.undo_move()
+            san = played[1]
+        return san
+
+    def children(self, board: Board) -> Dict[str, int]:
+        """Suites déjà explorées depuis board : uci -> clé de la position fille."""
+        return dict(self.node(board).children)
+
+    def replay(self, record: GameRecord, plies: Optional[int] = None) -> Tuple[Board, List[str]]:
+        """Board rejoué jusqu'au demi-coup plies (annulation comprise) et SAN des coups joués."""
+        board = Board(record.start_fen, chess960=record.chess960) if record.start_fen else Board(
+            chess960=record.chess960)
+        sans = []
+        n = len(record) if plies is None else min(plies, len(record))
+        for i in range(n):
+            played = self._push(board, packed_to_uci(record[i]))
+            if played is None: break
+            sans.append(played[1])
+        return board, sans
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {'nodes': len(self._nodes), 'bytes': self.nbytes, 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
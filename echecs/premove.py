@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/premove.py - Coups anticipés (premoves) saisis pendant le trait adverse.
+
+À la saisie, un coup n'est contrôlé que sur la géométrie de la pièce, dans la
+position obtenue en jouant les coups déjà en file : l'occupation des cases est
+ignorée, puisque le coup adverse attendu va la changer (une reprise sur une
+case encore occupée par une pièce amie reste possible). La légalité complète
+n'est vérifiée qu'à l'arrivée du coup adverse, sur la vraie position ; un coup
+devenu illégal vide toute la file, la suite reposant sur lui.
+"""
+from typing import List, NamedTuple, Optional, Set, Tuple
+
+from echecs.engine import (DIAGONALS, FILES, KING_OFFSETS, KNIGHT_OFFSETS, ORTHOGONALS, RANKS, WHITE,
+                           Board)
+
+PREMOVE_LIMIT = 8  # coups en file au plus
+
+Square = Tuple[int, int]
+_RAYS = {'B': DIAGONALS, 'R': ORTHOGONALS, 'Q': DIAGONALS + ORTHOGONALS}
+
+
+class Premove(NamedTuple):
+    from_sq: Square
+    to_sq: Square
+    promotion: Optional[str] = None  # lettre minuscule 'qrbn'
+
+    def uci(self) -> str:
+        (fr, fc), (tr, tc) = self.from_sq, self.to_sq
+        return FILES[fc] + RANKS[fr] + FILES[tc] + RANKS[tr] + (self.promotion or '')
+
+
+def _targets(board: Board, grid, sq: Square) -> Set[Square]:
+    r, c = sq
+    p = grid[r][c]
+    pt, white = p.upper(), p.isupper()
+    out = set()
+    if pt == 'P':
+        d = 1 if white else -1
+        out.update((r + d, c + dc) for dc in (-1, 0, 1) if 0 <= c + dc < 8 and 0 <= r + d < 8)
+        if r == (1 if white else 6): out.add((r + 2 * d, c))
+    elif pt == 'N' or pt == 'K':
+        offsets = KNIGHT_OFFSETS if pt == 'N' else KING_OFFSETS
+        out.update((r + dr, c + dc) for dr, dc in offsets if 0 <= r + dr < 8 and 0 <= c + dc < 8)
+        if pt == 'K' and (r, c) == ((0 if white else 7), board.castling_king_file):
+            for (rr, rf), side in board.castling_rooks.items():
+                if rr == r and side.isupper() == white and board.castling_rights[side]:
+                    # Chess960 : le roi « prend » sa tour, comme dans Board.generate_moves
+                    out.add((r, rf) if board.chess960 else (r, 6 if rf > c else 2))
+    else:
+        for dr, dc in _RAYS[pt]:
+            nr, nc = r + dr, c + dc
+            while 0 <= nr < 8 and 0 <= nc < 8:
+                out.add((nr, nc))
+                nr += dr; nc += dc
+    out.discard(sq)
+    return out
+
+
+class PremoveQueue:
+    """File des coups anticipés d'un camp, joués un par un à chaque retour du trait."""
+
+    def __init__(self, color: str, limit: int = PREMOVE_LIMIT):
+        self.color = color
+        self.limit = limit
+        self.moves: List[Premove] = []
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def clear(self):
+        self.moves.clear()
+
+    def virtual_grid(self, board: Board):
+        """Grille de board après les coups en file (roques compris, sans contrôle)."""
+        grid = [row[:] for row in board.board]
+        for pm in self.moves:
+            (fr, fc), (tr, tc) = pm.from_sq, pm.to_sq
+            p = grid[fr][fc]
+            grid[fr][fc] = None
+            target = grid[tr][tc]
+            own_rook = target is not None and target.upper() == 'R' and target.isupper() == p.isupper()
+            if p.upper() == 'K' and (own_rook if board.chess960 else abs(tc - fc) == 2):
+                if board.chess960:
+                    grid[tr][tc] = None
+                    tc, rook_from = (6 if tc > fc else 2), tc
+                else:
+                    rook_from = 7 if tc > fc else 0
+                rook = grid[tr][rook_from] or ('R' if p.isupper() else 'r')
+                grid[tr][rook_from] = None
+                grid[tr][5 if tc == 6 else 3] = rook
+            grid[tr][tc] = (pm.promotion.upper() if p.isupper() else pm.promotion) if pm.promotion else p
+        return grid
+
+    def targets(self, board: Board, sq: Square) -> Set[Square]:
+        """Cases d'arrivée admissibles depuis sq (vide si la pièce n'est pas au camp de la file)."""
+        grid = self.virtual_grid(board)
+        p = grid[sq[0]][sq[1]]
+        if not p or (p.isupper() != (self.color == WHITE)) or len(self.moves) >= self.limit: return set()
+        return _targets(board, grid, sq)
+
+    def is_promotion(self, board: Board, from_sq: Square, to_sq: Square) -> bool:
+        p = self.virtual_grid(board)[from_sq[0]][from_sq[1]]
+        return p is not None and p.upper() == 'P' and to_sq[0] in (0, 7)
+
+    def push(self, board: Board, from_sq: Square, to_sq: Square, promotion: Optional[str] = None) -> bool:
+        """Ajoute un coup pseudo-légal ; False (file inchangée) sinon."""
+        if to_sq not in self.targets(board, from_sq): return False
+        if self.is_promotion(board, from_sq, to_sq) != bool(promotion): return False
+        self.moves.append(Premove(from_sq, to_sq, promotion.lower() if promotion else None))
+        return True
+
+    def pop(self, board: Board) -> Optional[str]:
+        """Coup UCI à jouer si le trait est revenu au camp de la file (légalité à vérifier)."""
+        if not self.moves or board.turn != self.color: return None
+        return self.moves.pop(0).uci()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/profiling.py - Instrumentation optionnelle des chemins chauds.
+
+Les méthodes suivies sont remplacées par une enveloppe chronométrée seulement
+pendant que le profilage est actif ; désactivé, les méthodes d'origine sont
+remises en place et le coût est nul.
+
+L'enveloppe est posée sur l'attribut de classe : une méthode liée capturée
+avant l'activation (command= d'un widget, after(), fil déjà lancé avec
+target=self.méthode) garde l'original et n'est pas mesurée. Les appels
+suivis passent donc par self.méthode() au moment de l'appel.
+
+Chaque mesure est rangée selon le fil qui l'a faite : stats ne compte que le
+fil principal (boucle Tk, le chemin chaud de l'interface), background_stats
+les autres fils (AnalysisWorker, ponder, réseau).
+Activation : variable d'environnement ECHECS_PROFILE=1 ou PROFILER.enable().
+Export : PROFILER.dump_json(chemin) pour comparer des sessions hors ligne.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from echecs.engine import Board
+
+ENV_VAR = 'ECHECS_PROFILE'
+N_BUCKETS = 24  # histogramme en puissances de 2 de microsecondes (1 µs .. ~8 s)
+
+
+class Stat:
+    __slots__ = ('count', 'total', 'last', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+        self.buckets = [0] * N_BUCKETS
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max: self.max = seconds
+        self.buckets[min(N_BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+
+    def percentile(self, q: float) -> float:
+        """Borne haute (en secondes) du seau contenant le quantile q."""
+        if not self.count: return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target: return (1 << i) / 1e6
+        return self.max
+
+    def as_dict(self) -> Dict:
+        return {'count': self.count, 'total_ms': self.total * 1000,
+                'mean_us': self.total / self.count * 1e6 if self.count else 0.0,
+                'p50_us': self.percentile(0.5) * 1e6, 'p99_us': self.percentile(0.99) * 1e6,
+                'max_us': self.max * 1e6, 'buckets_log2_us': list(self.buckets)}
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.stats: Dict[str, Stat] = {}  # fil principal
+        self.background_stats: Dict[str, Stat] = {}  # autres fils
+        self._targets: List[Tuple[type, str, str]] = []
+        self._originals: Dict[Tuple[type, str], object] = {}
+
+    def register(self, cls: type, method: str, label: str = None):
+        label = label or f"{cls.__name__}.{method}"
+        self._targets.append((cls, method, label))
+        self.stats.setdefault(label, Stat())
+        self.background_stats.setdefault(label, Stat())
+        if self.enabled: self._wrap(cls, method, label)
+
+    def _wrap(self, cls, method, label):
+        original = cls.__dict__[method]
+        stat, background = self.stats[label], self.background_stats[label]
+        clock, get_ident = time.perf_counter, threading.get_ident
+        main_ident = threading.main_thread().ident
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            t0 = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                (stat if get_ident() == main_ident else background).add(clock() - t0)
+
+        self._originals[(cls, method)] = original
+        setattr(cls, method, timed)
+
+    def enable(self):
+        if self.enabled: return
+        self.enabled = True
+        for cls, method, label in self._targets:
+            self._wrap(cls, method, label)
+
+    def disable(self):
+        if not self.enabled: return
+        self.enabled = False
+        for (cls, method), original in self._originals.items():
+            setattr(cls, method, original)
+        self._originals.clear()
+
+    def reset(self):
+        for label in self.stats:
+            self.stats[label] = Stat()
+            self.background_stats[label] = Stat()
+        if self.enabled:
+            self.disable()
+            self.enable()
+
+    def snapshot(self, background: bool = False) -> Dict:
+        stats = self.background_stats if background else self.stats
+        return {label: stat.as_dict() for label, stat in stats.items()}
+
+    def dump_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': time.time(), 'stats': self.snapshot(),
+                       'background_stats': self.snapshot(background=True)}, f, indent=2)
+
+    def summary(self) -> str:
+        lines = []
+        for title, stats in (('', self.stats), ('Autres fils (analyse, réseau) :', self.background_stats)):
+            rows = [f"{label:<28} {st.count:>8}  moy {st.total / st.count * 1e6:>9.0f} µs  "
+                    f"dernier {st.last * 1000:>7.2f} ms" for label, st in stats.items() if st.count]
+            if rows and title: lines.append(('\n' if lines else '') + title)
+            lines.extend(rows)
+        return '\n'.join(lines) or "Aucune mesure."
+
+
+PROFILER = Profiler()
+for _method in ('generate_moves', 'is_square_attacked', 'game_status'):
+    PROFILER.register(Board, _method)
+if os.environ.get(ENV_VAR):
+    PROFILER.enable()
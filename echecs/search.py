@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/search.py - Recherche alpha-bêta à approfondissement itératif (multi-PV).
+
+Search travaille sur sa propre copie du Board : elle peut tourner dans un fil
+d'arrière-plan (AnalysisWorker) pendant que l'interface continue de jouer.
+EnginePlayer s'en sert aussi pour réfléchir pendant le temps de l'adversaire.
+choose_move et AnalysisWorker acceptent aussi mode='mcts' (echecs/mcts.py).
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from echecs.engine import WHITE, Board, Move, pack_move, packed_to_uci
+from echecs.evaluation import PIECE_VALUES
+from echecs.mcts import MonteCarloSearch
+
+MATE = 100000
+INF = MATE + 1
+MATE_BOUND = MATE - 1000  # au-delà : score de mat, compté en demi-coups depuis la racine
+EXACT, LOWER, UPPER = 0, 1, 2
+TT_MAX_ENTRIES = 1 << 20
+
+
+class SearchStopped(Exception):
+    pass
+
+
+def mate_in(score: int) -> Optional[int]:
+    """Nombre de coups avant mat (positif : on mate, négatif : on est maté), sinon None."""
+    if abs(score) < MATE_BOUND: return None
+    plies = MATE - abs(score)
+    return (plies + 1) // 2 if score > 0 else -((plies + 1) // 2)
+
+
+def score_to_tt(score: int, ply: int) -> int:
+    """Score de mat ramené au nœud (et non plus à la racine) avant rangement dans la table."""
+    if score >= MATE_BOUND: return score + ply
+    if score <= -MATE_BOUND: return score - ply
+    return score
+
+
+def score_from_tt(score: int, ply: int) -> int:
+    """Inverse de score_to_tt : la distance au mat repart de la racine de la recherche en cours."""
+    if score >= MATE_BOUND: return score - ply
+    if score <= -MATE_BOUND: return score + ply
+    return score
+
+
+Evaluation = Callable[[Board], int]  # centipions du point de vue des Blancs, comme Board.evaluate
+
+
+class Search:
+    def __init__(self, board: Board, tt: Optional[Dict] = None, evaluate: Optional[Evaluation] = None):
+        self.board = board
+        self.tt: Dict[int, Tuple[int, int, int, int]] = tt if tt is not None else {}
+        # Un dict grossit sans fin : vidé à TT_MAX_ENTRIES. Une table à cases fixes (SharedTT)
+        # remplace sur place et n'est jamais vidée.
+        self._tt_limit = TT_MAX_ENTRIES if isinstance(self.tt, dict) else None
+        self.evaluate = evaluate
+        self.nodes = 0
+        self.stop_event: Optional[threading.Event] = None
+        self.throttle: Optional[Callable[[], None]] = None
+
+    # ---------------- évaluation & ordre des coups ----------------
+    def _evaluate(self) -> int:
+        score = self.evaluate(self.board) if self.evaluate else self.board.evaluate()
+        return score if self.board.turn == WHITE else -score
+
+    def _ordered(self, moves: List[Move], tt_code: Optional[int]) -> List[Move]:
+        def key(m):
+            if tt_code is not None and pack_move(m) == tt_code: return -INF
+            if m.captured:
+                return -(10 * PIECE_VALUES[m.captured.upper()] - PIECE_VALUES[m.piece.upper()])
+            return 0 if not m.promotion else -PIECE_VALUES[m.promotion.upper()]
+        return sorted(moves, key=key)
+
+    def _check_stop(self):
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            if self.stop_event is not None and self.stop_event.is_set(): raise SearchStopped()
+            if self.throttle: self.throttle()
+
+    # ---------------- recherche ----------------
+    def _quiesce(self, alpha: int, beta: int) -> int:
+        self._check_stop()
+        stand = self._evaluate()
+        if stand >= beta: return stand
+        if stand > alpha: alpha = stand
+        # Prises perdantes à l'échange (SEE < 0) écartées : elles ne relèvent presque jamais alpha
+        captures = [m for m in self.board.generate_captures(legal=True) if m.promotion or self.board.see(m) >= 0]
+        for m in self._ordered(captures, None):
+            self.board.push_move(m)
+            score = -self._quiesce(-beta, -alpha)
+            self.board.undo_move()
+            if score >= beta: return score
+            if score > alpha: alpha = score
+        return alpha
+
+    def _is_draw(self) -> bool:
+        b = self.board
+        return b.halfmove_clock >= 100 or b.repetitions() >= 2
+
+    def _negamax(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self._check_stop()
+        if ply and self._is_draw(): return 0
+        key = self.board.position_hash()
+        entry = self.tt.get(key)
+        tt_code = None
+        if entry:
+            e_depth, e_score, e_flag, tt_code = entry
+            e_score = score_from_tt(e_score, ply)
+            if e_depth >= depth and ply:
+                if e_flag == EXACT: return e_score
+                if e_flag == LOWER and e_score >= beta: return e_score
+                if e_flag == UPPER and e_score <= alpha: return e_score
+        moves = self.board.generate_moves(legal=True)
+        if not moves:
+            return -(MATE - ply) if self.board.king_in_check(self.board.turn) else 0
+        if depth <= 0:
+            return self._quiesce(alpha, beta)
+        alpha0, best, best_code = alpha, -INF, None
+        for m in self._ordered(moves, tt_code):
+            self.board.push_move(m)
+            score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            self.board.undo_move()
+            if score > best: best, best_code = score, pack_move(m)
+            if score > alpha: alpha = score
+            if alpha >= beta: break
+        flag = UPPER if best <= alpha0 else LOWER if best >= beta else EXACT
+        if self._tt_limit and len(self.tt) >= self._tt_limit: self.tt.clear()
+        self.tt[key] = (depth, score_to_tt(best, ply), flag, best_code)
+        return best
+
+    def principal_variation(self, first: Move, max_len: int = 12) -> List[Move]:
+        """PV reconstruite depuis la table de transposition après le coup racine."""
+        pv, seen = [first], set()
+        self.board.push_move(first)
+        pushed = 1
+        while len(pv) < max_len:
+            key = self.board.position_hash()
+            entry = self.tt.get(key)
+            if not entry or entry[3] is None or key in seen: break
+            seen.add(key)
+            m = self.board.find_move_uci(packed_to_uci(entry[3]))
+            if not m: break
+            pv.append(m)
+            self.board.push_move(m)
+            pushed += 1
+        for _ in range(pushed): self.board.undo_move()
+        return pv
+
+    def search_root(self, depth: int, multipv: int = 1) -> List[Tuple[int, List[Move]]]:
+        """Les multipv meilleurs coups à la profondeur donnée : [(score, PV), ...]."""
+        root_len = len(self.board.history)
+        moves = self.board.generate_moves(legal=True)
+        entry = self.tt.get(self.board.position_hash())
+        scored: List[Tuple[int, Move]] = []
+        try:
+            for m in self._ordered(moves, entry[3] if entry else None):
+                # Fenêtre bornée par le multipv-ième meilleur score déjà trouvé
+                floor = sorted((s for s, _ in scored), reverse=True)[multipv - 1] if len(scored) >= multipv else -INF
+                self.board.push_move(m)
+                score = -self._negamax(depth - 1, -INF, -floor, 1)
+                self.board.undo_move()
+                scored.append((score, m))
+        except SearchStopped:
+            while len(self.board.history) > root_len: self.board.undo_move()
+            raise
+        scored.sort(key=lambda e: -e[0])
+        if scored:
+            self.tt[self.board.position_hash()] = (depth, scored[0][0], EXACT, pack_move(scored[0][1]))
+        return [(s, self.principal_variation(m)) for s, m in scored[:multipv]]
+
+    def iterate(self, max_depth: int = 64, multipv: int = 1, on_info: Optional[Callable[[Dict], None]] = None,
+                stop_event: Optional[threading.Event] = None, time_limit: Optional[float] = None) -> Dict:
+        """Approfondissement itératif ; on_info reçoit un rapport à chaque profondeur terminée."""
+        self.stop_event = stop_event
+        self.nodes = 0
+        t0 = time.perf_counter()
+        info: Dict = {'depth': 0, 'lines': [], 'nodes': 0, 'nps': 0, 'elapsed': 0.0}
+        deadline = t0 + time_limit if time_limit else None
+        for depth in range(1, max_depth + 1):
+            try:
+                lines = self.search_root(depth, multipv)
+            except SearchStopped:
+                break
+            elapsed = time.perf_counter() - t0
+            info = {'depth': depth, 'lines': lines, 'nodes': self.nodes,
+                    'nps': int(self.nodes / elapsed) if elapsed > 0 else 0, 'elapsed': elapsed}
+            if on_info: on_info(info)
+            if not lines or abs(lines[0][0]) >= MATE - depth: break
+            if deadline and time.perf_counter() >= deadline: break
+        return info
+
+
+def choose_move(board: Board, book=None, tablebase=None, depth: int = 3,
+                time_limit: Optional[float] = None, mode: str = 'alphabeta') -> Optional[Move]:
+    """Coup du moteur : bibliothèque, puis table de finale, puis recherche (alpha-bêta ou Monte-Carlo)."""
+    if book:
+        m = book.pick(board)
+        if m: return m
+    if tablebase:
+        best = tablebase.best_move(board)
+        if best: return best[0]
+    if mode == 'mcts':
+        info = MonteCarloSearch(board.copy()).iterate(time_limit=time_limit)
+    else:
+        info = Search(board.copy()).iterate(max_depth=depth, time_limit=time_limit)
+    if not info['lines']: return None
+    return board.find_move_uci(info['lines'][0][1][0].uci())
+
+
+class AnalysisWorker:
+    """Analyse en tâche de fond : le dernier rapport est lu par l'interface via latest."""
+
+    def __init__(self, board: Board, multipv: int = 3, max_depth: int = 64, duty_cycle: float = 0.6,
+                 tt: Optional[Dict] = None, mode: str = 'alphabeta', evaluate: Optional[Evaluation] = None):
+        self.board = board.copy()
+        self.mode = mode
+        self.evaluate = evaluate
+        self.multipv = multipv
+        self.max_depth = max_depth
+        self.duty_cycle = duty_cycle
+        self.tt = tt
+        self.stop_event = threading.Event()
+        self.latest: Optional[Dict] = None
+        self.done = False
+        self.started_at = self.finished_at = 0.0
+        self._busy_since = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started_at = self._busy_since = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def elapsed(self) -> float:
+        """Temps passé à chercher (jusqu'à la fin de la recherche si elle est terminée)."""
+        return (self.finished_at if self.done else time.perf_counter()) - self.started_at
+
+    def _throttle(self):
+        # Cède régulièrement le GIL pour que la boucle Tk (_tick, clics) reste fluide
+        busy = time.perf_counter() - self._busy_since
+        if busy > 0.02:
+            time.sleep(busy * (1 - self.duty_cycle) / self.duty_cycle)
+            self._busy_since = time.perf_counter()
+
+    def _publish(self, info: Dict):
+        self.latest = info
+
+    def _run(self):
+        search = MonteCarloSearch(self.board) if self.mode == 'mcts' else Search(self.board, self.tt, self.evaluate)
+        search.throttle = self._throttle
+        try:
+            if self.mode == 'mcts':
+                search.iterate(None, self.multipv, on_info=self._publish, stop_event=self.stop_event)
+            else:
+                search.iterate(self.max_depth, self.multipv, on_info=self._publish, stop_event=self.stop_event)
+        finally:
+            self.finished_at = time.perf_counter()
+            self.done = True
+
+
+class EnginePlayer:
+    """
+    Joueur moteur à temps fixe par coup, avec réflexion sur le temps adverse.
+
+    Après chaque coup du moteur, ponder() lance la recherche de la position qui
+    suivrait la réponse attendue (deuxième coup de la PV). Si l'adversaire la
+    joue (même clé de position), think() laisse simplement continuer cette
+    recherche sur son propre temps : profondeurs déjà terminées et table de
+    transposition sont conservées. Sinon elle est arrêtée et la recherche
+    repart de la vraie position, avec la même table.
+    """
+
+    def __init__(self, book=None, tablebase=None, max_depth: int = 64, ponder: bool = True,
+                 duty_cycle: float = 0.6, evaluate: Optional[Evaluation] = None):
+        self.book = book
+        self.tablebase = tablebase
+        self.max_depth = max_depth
+        self.evaluate = evaluate  # None : Board.evaluate
+        self.pondering = ponder
+        self.duty_cycle = duty_cycle  # part du temps prise par la réflexion sur le temps adverse
+        self.tt: Dict[int, Tuple[int, int, int, int]] = {}
+        self.expected: Optional[str] = None  # réponse attendue (UCI) après le dernier coup joué
+        self.last_info: Optional[Dict] = None
+        self._ponder: Optional[AnalysisWorker] = None
+        self._ponder_key: Optional[int] = None
+        self.ponders = 0
+        self.hits = 0
+        self.time_saved = 0.0  # secondes de recherche déjà faites au moment des ponder hits
+
+    def think(self, board: Board, time_limit: float) -> Optional[Move]:
+        """Coup à jouer dans board après time_limit secondes de recherche (réflexion reprise si hit)."""
+        worker = self._take_ponder(board)
+        if worker is None:
+            self.expected = None
+            if self.book:
+                m = self.book.pick(board)
+                if m: return m
+            if self.tablebase:
+                best = self.tablebase.best_move(board)
+                if best: return best[0]
+            worker = AnalysisWorker(board, 1, self.max_depth, duty_cycle=1.0, tt=self.tt,
+                                    evaluate=self.evaluate).start()
+        else:
+            worker.duty_cycle = 1.0
+        worker.join(time_limit)
+        worker.stop()
+        worker.join()
+        info = worker.latest
+        if not info or not info['lines']:
+            info = Search(board.copy(), self.tt, self.evaluate).iterate(max_depth=1)
+            if not info['lines']: return None
+        self.last_info = info
+        pv = info['lines'][0][1]
+        self.expected = pv[1].uci() if len(pv) > 1 else None
+        return board.find_move_uci(pv[0].uci())
+
+    def ponder(self, board: Board):
+        """board : position après le coup du moteur ; réfléchit sur la réponse attendue."""
+        self.stop_pondering()
+        if not self.pondering or not self.expected: return
+        m = board.find_move_uci(self.expected)
+        if m is None: return
+        after = board.copy()
+        after.push_move(m)
+        self._ponder_key = after.position_hash()
+        self._ponder = AnalysisWorker(after, 1, self.max_depth, self.duty_cycle, tt=self.tt,
+                                      evaluate=self.evaluate).start()
+        self.ponders += 1
+
+    def stop_pondering(self):
+        worker, self._ponder = self._ponder, None
+        if worker:
+            worker.stop()
+            worker.join()
+
+    def _take_ponder(self, board: Board) -> Optional[AnalysisWorker]:
+        worker = self._ponder
+        if worker is None or self._ponder_key != board.position_hash():
+            self.stop_pondering()
+            return None
+        self._ponder = None
+        self.hits += 1
+        self.time_saved += worker.elapsed()
+        return worker
+
+    def stats(self) -> Dict:
+        return {'ponders': self.ponders, 'hits': self.hits,
+                'hit_rate': self.hits / self.ponders if self.ponders else 0.0,
+                'time_saved': self.time_saved}
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/smp.py - Recherche parallèle « Lazy SMP » sur plusieurs processus.
+
+Chaque processus lance sa propre Search sur la même position racine ; la seule
+coopération passe par une table de transposition commune logée dans un bloc
+multiprocessing.shared_memory. Les processus auxiliaires sautent certaines
+profondeurs (tables SKIP_SIZE / SKIP_PHASE) pour ne pas tous chercher la même
+itération au même moment : ils remplissent la table de coups et de bornes que
+les autres relisent.
+
+Table : 2 mots de 64 bits par case (clé XOR données, données). Les écritures
+ne sont pas verrouillées ; une case à moitié écrite par un autre processus ne
+vérifie pas le XOR et se lit comme une case vide.
+"""
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+
+from echecs.engine import Board, GameRecord
+from echecs.search import MATE, Search, SearchStopped
+
+DEFAULT_TT_MB = 64
+# Décalage des itérations des processus auxiliaires (profondeur d sautée si ((d + phase) // size) est impair)
+SKIP_SIZE = (1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4, 4, 4, 4)
+SKIP_PHASE = (0, 1, 0, 1, 2, 3, 0, 1, 2, 3, 4, 5, 0, 1, 2, 3, 4, 5, 6, 7)
+_MASK64 = (1 << 64) - 1
+_SCORE_BIAS = 1 << 31
+
+
+class SharedTT:
+    """Table de transposition à remplacement par case, partagée entre processus."""
+
+    def __init__(self, size_mb: int = DEFAULT_TT_MB, name: Optional[str] = None):
+        if name is None:
+            slots = 1 << max(10, (size_mb * 1024 * 1024 // 16).bit_length() - 1)
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * 16)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self._words = self.shm.buf.cast('Q')
+        self.mask = len(self._words) // 2 - 1
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def clear(self):
+        self.shm.buf[:] = bytes(len(self.shm.buf))
+
+    def get(self, key: int) -> Optional[Tuple[int, int, int, Optional[int]]]:
+        i = (key & self.mask) << 1
+        data = self._words[i + 1]
+        if self._words[i] ^ data != key or not data: return None
+        code = (data >> 16) & 0xFFFF
+        return (data >> 8) & 0xFF, (data >> 32) - _SCORE_BIAS, data & 0xFF, code or None
+
+    def __setitem__(self, key: int, entry: Tuple[int, int, int, Optional[int]]):
+        depth, score, flag, code = entry
+        i = (key & self.mask) << 1
+        old = self._words[i + 1]
+        # Une entrée plus profonde de la même position est conservée
+        if self._words[i] ^ old == key and (old >> 8) & 0xFF > depth: return
+        data = (score + _SCORE_BIAS) << 32 | (code or 0) << 16 | depth << 8 | flag
+        self._words[i + 1] = data
+        self._words[i] = (key ^ data) & _MASK64
+
+    def close(self):
+        self._words.release()
+        self.shm.close()
+        if self.owner: self.shm.unlink()
+
+
+def _skips(worker: int, depth: int) -> bool:
+    if worker == 0: return False
+    k = (worker - 1) % len(SKIP_SIZE)
+    return ((depth + SKIP_PHASE[k]) // SKIP_SIZE[k]) % 2 == 1
+
+
+def _worker(idx: int, record: GameRecord, tt_name: str, max_depth: int, stop, results):
+    tt = SharedTT(name=tt_name)
+    search = Search(record.board(), tt)
+    search.stop_event = stop
+    t0 = time.perf_counter()
+    try:
+        for depth in range(1, max_depth + 1):
+            if _skips(idx, depth) and depth < max_depth: continue
+            try:
+                lines = search.search_root(depth)
+            except SearchStopped:
+                break
+            pv = [m.uci() for m in lines[0][1]] if lines else []
+            results.put((idx, depth, lines[0][0] if lines else 0, pv, search.nodes, time.perf_counter() - t0))
+            if not lines or abs(lines[0][0]) >= MATE - depth: break
+    finally:
+        results.put((idx, None, None, None, search.nodes, time.perf_counter() - t0))
+        del search
+        tt.close()
+
+
+def parallel_search(board: Board, max_depth: int, workers: int = 4, tt_mb: int = DEFAULT_TT_MB,
+                    time_limit: Optional[float] = None, on_info: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Lazy SMP : workers processus sur la position de board, arrêt dès qu'un
+    processus termine max_depth (ou au bout de time_limit). Rapport au format
+    de Search.iterate, plus depth_times {profondeur: secondes avant la première
+    itération terminée à cette profondeur}.
+    """
+    ctx = mp.get_context()
+    tt = SharedTT(tt_mb)
+    stop, results = ctx.Event(), ctx.Queue()
+    record = board.record()
+    t0 = time.perf_counter()
+    procs = [ctx.Process(target=_worker, args=(i, record, tt.name, max_depth, stop, results), daemon=True)
+             for i in range(workers)]
+    for p in procs: p.start()
+    best: Tuple[int, int, List[str]] = (0, 0, [])
+    depth_times: Dict[int, float] = {}
+    nodes = {i: 0 for i in range(workers)}
+    running = workers
+    deadline = t0 + time_limit if time_limit else None
+    try:
+        while running:
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                idx, depth, score, pv, n, _ = results.get(timeout=timeout)
+            except queue.Empty:
+                stop.set()
+                deadline = None
+                continue
+            nodes[idx] = n
+            if depth is None:
+                running -= 1
+                continue
+            if depth not in depth_times: depth_times[depth] = time.perf_counter() - t0
+            if depth > best[0]:
+                best = (depth, score, pv)
+                if on_info: on_info({'depth': depth, 'score': score, 'pv': pv, 'worker': idx})
+            if depth >= max_depth or abs(score) >= MATE - depth: stop.set()
+    finally:
+        stop.set()
+        for p in procs: p.join()
+        tt.close()
+    elapsed = time.perf_counter() - t0
+    total = sum(nodes.values())
+    depth, score, pv = best
+    lines = []
+    if pv:
+        b, moves = board.copy(), []
+        for uci in pv:
+            m = b.find_move_uci(uci)
+            if m is None: break
+            moves.append(m)
+            b.push_move(m)
+        lines = [(score, moves)]
+    return {'depth': depth, 'lines': lines, 'nodes': total, 'nps': int(total / elapsed) if elapsed > 0 else 0,
+            'elapsed': elapsed, 'depth_times': depth_times, 'workers': workers}
@@ -0,0 +1,515 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/tablebase.py - Tables de finales (distance au mat) par analyse rétrograde.
+
+Une table couvre une répartition de matériel (ex. KQvK, KRvK, KPvK, KQvKR) et
+stocke pour chaque position une valeur u16 du point de vue du trait :
+    0       nulle
+    0xFFFF  position impossible (cases occupées deux fois, roi adverse en échec...)
+    v       mat en v - 1 demi-coups (impair = le trait gagne, pair = le trait perd)
+Les droits de roque et la prise en passant ne sont pas représentés.
+
+Indexation : le roi blanc est ramené par symétrie dans le triangle a1-d1-d4
+(10 cases) pour les finales sans pion, dans les colonnes a-d (32 cases) sinon ;
+les autres pièces occupent chacune 64 cases. Les fichiers <nom>.tb sont lus par
+mmap, sans chargement en mémoire.
+
+Génération : la passe avant (coups pseudo-légaux de Board, échec testé pièce
+par pièce, la partie coûteuse) est répartie sur un pool de processus et ne
+garde que quelques octets par position (statut, nombre de coups internes,
+résumé des prises et promotions). La propagation rétrograde qui suit est un
+parcours en largeur par distance au mat ; les parents d'une position résolue
+sont regénérés par coups à rebours au lieu d'être stockés (le graphe complet
+coûterait deux u32 par coup, des centaines de Mo dès 4 pièces).
+Mémoire : ~13 octets par position. Mesures sur un seul cœur : 3 à 11 s par
+table de 3 pièces ; KQvKR (5,2 M positions) 11 min, 100 Mo. Toutes les tables
+de 3 et 4 pièces sont donc à la portée d'un poste ordinaire ; 5 pièces
+(335 M positions sans pion) demandent ~4,5 Go et de l'ordre de 12 h par cœur
+pour la passe avant.
+
+Usage : python -m echecs.tablebase gen KQvK KRvK KPvK [-j 8] [-d tablebases]
+        python -m echecs.tablebase probe "<FEN>" [-d tablebases]
+"""
+import array
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from echecs.engine import WHITE, BLACK, Board, Move
+
+DEFAULT_TB_DIR = 'tablebases'
+PIECE_ORDER = 'KQRBNP'
+PIECE_VALUES = {'K': 0, 'Q': 9, 'R': 5, 'B': 3, 'N': 3, 'P': 1}
+DRAW = 0
+INVALID = 0xFFFF
+
+# ---------------- Symétries ----------------
+_TRANSFORMS = [
+    lambda r, c: (r, c), lambda r, c: (r, 7 - c), lambda r, c: (7 - r, c), lambda r, c: (7 - r, 7 - c),
+    lambda r, c: (c, r), lambda r, c: (c, 7 - r), lambda r, c: (7 - c, r), lambda r, c: (7 - c, 7 - r),
+]
+SYM = [[t(sq >> 3, sq & 7)[0] * 8 + t(sq >> 3, sq & 7)[1] for sq in range(64)] for t in _TRANSFORMS]
+TRIANGLE = [sq for sq in range(64) if (sq & 7) <= 3 and (sq >> 3) <= (sq & 7)]
+HALF_BOARD = [sq for sq in range(64) if (sq & 7) <= 3]
+
+
+def _king_tables(allowed: List[int], transforms: List[int]):
+    # Pour chaque case du roi blanc : la symétrie qui la ramène dans la zone autorisée
+    slot = {sq: i for i, sq in enumerate(allowed)}
+    choice = []
+    for sq in range(64):
+        t = next(t for t in transforms if SYM[t][sq] in slot)
+        choice.append(t)
+    return slot, choice
+
+
+KSLOT_PAWNLESS, KSYM_PAWNLESS = _king_tables(TRIANGLE, list(range(8)))
+KSLOT_PAWNS, KSYM_PAWNS = _king_tables(HALF_BOARD, [0, 1])
+
+
+# ---------------- Matériel ----------------
+def _sort_pieces(pieces: List[str], squares: List[int]) -> Tuple[List[str], List[int]]:
+    order = sorted(range(len(pieces)),
+                   key=lambda i: (pieces[i].islower(), PIECE_ORDER.index(pieces[i].upper()), squares[i]))
+    return [pieces[i] for i in order], [squares[i] for i in order]
+
+
+def table_name(pieces: List[str]) -> str:
+    white = ''.join(sorted((p for p in pieces if p.isupper()), key=PIECE_ORDER.index))
+    black = ''.join(sorted((p.upper() for p in pieces if p.islower()), key=PIECE_ORDER.index))
+    return f"{white}v{black}"
+
+
+def parse_name(name: str) -> List[str]:
+    white, black = name.split('v')
+    return _sort_pieces(list(white) + [p.lower() for p in black], [0] * (len(white) + len(black)))[0]
+
+
+def _strength(side: str):
+    return sorted((PIECE_VALUES[p] for p in side), reverse=True), side
+
+
+def canonical_name(name: str) -> Tuple[str, bool]:
+    """Nom de la table stockée et indicateur d'inversion des couleurs (KvKQ -> KQvK, True)."""
+    white, black = name.split('v')
+    if _strength(black) > _strength(white):
+        return f"{black}v{white}", True
+    return name, False
+
+
+def _mirror_colors(pieces, squares, stm):
+    pieces = [p.swapcase() for p in pieces]
+    squares = [(7 - (sq >> 3)) * 8 + (sq & 7) for sq in squares]
+    return pieces, squares, BLACK if stm == WHITE else WHITE
+
+
+class TableLayout:
+    """Correspondance index <-> (cases des pièces, trait) pour une table."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pieces = parse_name(name)
+        self.has_pawns = any(p.upper() == 'P' for p in self.pieces)
+        self.kslot, self.ksym = (KSLOT_PAWNS, KSYM_PAWNS) if self.has_pawns else (KSLOT_PAWNLESS, KSYM_PAWNLESS)
+        self.kallowed = HALF_BOARD if self.has_pawns else TRIANGLE
+        self.per_side = len(self.kallowed) * 64 ** (len(self.pieces) - 1)
+        self.size = 2 * self.per_side
+
+    def index(self, squares: List[int], stm: str) -> int:
+        """squares dans l'ordre de self.pieces (roi blanc en tête)."""
+        t = self.ksym[squares[0]]
+        sym = SYM[t]
+        idx = self.kslot[sym[squares[0]]]
+        for sq in squares[1:]:
+            idx = idx * 64 + sym[sq]
+        return idx + (self.per_side if stm == BLACK else 0)
+
+    def decode(self, idx: int) -> Tuple[List[int], str]:
+        stm = BLACK if idx >= self.per_side else WHITE
+        idx %= self.per_side
+        squares = []
+        for _ in range(len(self.pieces) - 1):
+            squares.append(idx % 64)
+            idx //= 64
+        squares.append(self.kallowed[idx])
+        return squares[::-1], stm
+
+
+def decode_value(v: int) -> Optional[Tuple[str, int]]:
+    if v == INVALID: return None
+    if v == DRAW: return ('draw', 0)
+    dtm = v - 1
+    return ('win' if dtm % 2 else 'loss', dtm)
+
+
+# ---------------- Consultation ----------------
+class Tablebase:
+    def __init__(self, directory: str = DEFAULT_TB_DIR):
+        self.directory = directory
+        self._tables: Dict[str, Optional[Tuple[TableLayout, mmap.mmap]]] = {}
+
+    @classmethod
+    def open_default(cls, directory: str = DEFAULT_TB_DIR) -> Optional['Tablebase']:
+        """Ouvre le répertoire de tables s'il existe, sinon None."""
+        return cls(directory) if os.path.isdir(directory) else None
+
+    def available(self) -> List[str]:
+        return sorted(f[:-3] for f in os.listdir(self.directory) if f.endswith('.tb'))
+
+    def _table(self, name: str):
+        if name not in self._tables:
+            path = os.path.join(self.directory, name + '.tb')
+            try:
+                with open(path, 'rb') as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._tables[name] = (TableLayout(name), mm)
+            except (OSError, ValueError):
+                self._tables[name] = None
+        return self._tables[name]
+
+    def probe_placement(self, pieces: List[str], squares: List[int], stm: str) -> Optional[int]:
+        """Valeur brute (u16) d'une position décrite par ses pièces ; None si table absente."""
+        if all(p.upper() == 'K' for p in pieces): return DRAW
+        name, swapped = canonical_name(table_name(pieces))
+        if swapped:
+            pieces, squares, stm = _mirror_colors(pieces, squares, stm)
+        table = self._table(name)
+        if table is None: return None
+        layout, mm = table
+        pieces, squares = _sort_pieces(pieces, squares)
+        pos = 2 * layout.index(squares, stm)
+        return mm[pos] | mm[pos + 1] << 8
+
+    def probe(self, board: Board) -> Optional[Tuple[str, int]]:
+        """('win' | 'loss' | 'draw', distance au mat en demi-coups) pour le trait, ou None."""
+        if any(board.castling_rights.values()): return None
+        pieces, squares = [], []
+        for r in range(8):
+            for c in range(8):
+                p = board.board[r][c]
+                if p:
+                    pieces.append(p)
+                    squares.append(r * 8 + c)
+        v = self.probe_placement(pieces, squares, board.turn)
+        return decode_value(v) if v is not None else None
+
+    def best_move(self, board: Board) -> Optional[Tuple[Move, Tuple[str, int]]]:
+        """Meilleur coup selon la table (mat le plus court, défense la plus longue)."""
+        if self.probe(board) is None: return None
+        best, best_key = None, None
+        for m in board.generate_moves(legal=True):
+            board.push_move(m)
+            child = self.probe(board)
+            board.undo_move()
+            if child is None: continue
+            result, dtm = child
+            # Du point de vue du joueur qui joue m : une perte adverse est un gain
+            key = (0, dtm) if result == 'loss' else (1, 0) if result == 'draw' else (2, -dtm)
+            if best_key is None or key < best_key:
+                best, best_key = (m, child), key
+        if best is None: return None
+        m, (result, dtm) = best
+        outcome = {'loss': 'win', 'win': 'loss', 'draw': 'draw'}[result]
+        return m, (outcome, dtm + 1 if outcome != 'draw' else 0)
+
+    def close(self):
+        for t in self._tables.values():
+            if t: t[1].close()
+        self._tables.clear()
+
+
+# ---------------- Génération ----------------
+# Géométrie sur cases 0..63, pour les attaques et les coups à rebours
+def _steps(sq: int, deltas) -> List[int]:
+    r, c = sq >> 3, sq & 7
+    return [(r + dr) * 8 + c + dc for dr, dc in deltas if 0 <= r + dr < 8 and 0 <= c + dc < 8]
+
+
+def _rays(sq: int, deltas) -> List[List[int]]:
+    rays = []
+    for dr, dc in deltas:
+        r, c, ray = (sq >> 3) + dr, (sq & 7) + dc, []
+        while 0 <= r < 8 and 0 <= c < 8:
+            ray.append(r * 8 + c)
+            r, c = r + dr, c + dc
+        rays.append(ray)
+    return rays
+
+
+_DIAG = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+_LINE = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+_JUMP = [(1, 2), (2, 1), (-1, 2), (-2, 1), (1, -2), (2, -1), (-1, -2), (-2, -1)]
+KING_STEPS = [_steps(sq, _DIAG + _LINE) for sq in range(64)]
+KNIGHT_STEPS = [_steps(sq, _JUMP) for sq in range(64)]
+RAYS = {'B': [_rays(sq, _DIAG) for sq in range(64)], 'R': [_rays(sq, _LINE) for sq in range(64)],
+        'Q': [_rays(sq, _DIAG + _LINE) for sq in range(64)]}
+_ALIGNED = [[('R' if t != s and (s >> 3 == t >> 3 or s & 7 == t & 7)
+              else 'B' if t != s and abs((s >> 3) - (t >> 3)) == abs((s & 7) - (t & 7)) else None)
+             for t in range(64)] for s in range(64)]
+_BETWEEN = [[next((ray[:ray.index(t)] for ray in RAYS['Q'][s] if t in ray), ())
+             for t in range(64)] for s in range(64)]
+
+
+def _in_check(pieces: List[str], squares: List[int], color: str) -> bool:
+    """Roi de color attaqué : avec si peu de pièces, on teste chaque pièce adverse vers le roi."""
+    king = squares[pieces.index('K' if color == WHITE else 'k')]
+    occupied = set(squares)
+    by_white = color == BLACK
+    for p, sq in zip(pieces, squares):
+        if p.isupper() != by_white: continue
+        kind = p.upper()
+        if kind == 'K':
+            if king in KING_STEPS[sq]: return True
+        elif kind == 'N':
+            if king in KNIGHT_STEPS[sq]: return True
+        elif kind == 'P':
+            if (king >> 3) - (sq >> 3) == (1 if by_white else -1) and abs((king & 7) - (sq & 7)) == 1: return True
+        elif (kind == 'Q' and _ALIGNED[sq][king]) or _ALIGNED[sq][king] == kind:
+            if not any(b in occupied for b in _BETWEEN[sq][king]): return True
+    return False
+
+
+_worker_state = {}
+
+
+def _worker_init(name: str, directory: str):
+    _worker_state['layout'] = TableLayout(name)
+    _worker_state['tb'] = Tablebase(directory)
+    _worker_state['board'] = Board('8/8/8/8/8/8/8/8 w - - 0 1')
+
+
+def _forward_chunk(bounds: Tuple[int, int]):
+    """Passe avant sur [start, stop) : statut, nombre d'enfants internes et résumé des enfants externes."""
+    start, stop = bounds
+    layout, tb, board = _worker_state['layout'], _worker_state['tb'], _worker_state['board']
+    pieces = layout.pieces
+    status = array.array('B')      # 0 impossible, 1 normal, 2 mat, 3 pat
+    n_children = array.array('B')  # coups sans prise ni promotion (moins de 256 avec 5 pièces)
+    ext_loss_min = array.array('h')  # plus court mat d'un enfant externe perdant (-1 : aucun)
+    ext_win_max = array.array('h')   # plus long mat d'un enfant externe gagnant (-1 : aucun)
+    ext_blocking = array.array('B')  # enfant externe nul : la position ne peut pas être perdue
+    grid = board.board
+    opponent = {WHITE: BLACK, BLACK: WHITE}
+    for idx in range(start, stop):
+        squares, stm = layout.decode(idx)
+        n_children.append(0)
+        ext_loss_min.append(-1)
+        ext_win_max.append(-1)
+        ext_blocking.append(0)
+        child_stm = opponent[stm]
+        if len(set(squares)) != len(squares) or any(
+                p.upper() == 'P' and sq >> 3 in (0, 7) for p, sq in zip(pieces, squares)):
+            status.append(0)
+            continue
+        if _in_check(pieces, squares, child_stm):
+            status.append(0)
+            continue
+        # Coups pseudo-légaux pris sur la grille seule (ni roque ni prise en passant dans les tables)
+        for row in grid:
+            row[:] = [None] * 8
+        for p, sq in zip(pieces, squares):
+            grid[sq >> 3][sq & 7] = p
+        by_square = {sq: i for i, sq in enumerate(squares)}
+        legal, count, loss_min, win_max, blocking = 0, 0, -1, -1, 0
+        for p, sq in zip(pieces, squares):
+            if p.isupper() != (stm == WHITE): continue
+            for m in board._piece_moves(sq >> 3, sq & 7, p, False):
+                c_pieces, c_squares = list(pieces), list(squares)
+                mover = by_square[sq]
+                c_squares[mover] = m.to_sq[0] * 8 + m.to_sq[1]
+                if m.promotion: c_pieces[mover] = m.promotion
+                if m.captured:
+                    victim = by_square[m.to_sq[0] * 8 + m.to_sq[1]]
+                    del c_pieces[victim], c_squares[victim]
+                if _in_check(c_pieces, c_squares, stm): continue
+                legal += 1
+                if m.captured or m.promotion:
+                    v = tb.probe_placement(c_pieces, c_squares, child_stm)
+                    if v is None:
+                        raise RuntimeError(f"Table manquante pour {table_name(c_pieces)}")
+                    res = decode_value(v)
+                    if res[0] == 'loss':
+                        loss_min = res[1] if loss_min < 0 else min(loss_min, res[1])
+                    elif res[0] == 'win':
+                        win_max = max(win_max, res[1])
+                    else:
+                        blocking = 1
+                else:
+                    count += 1
+        if not legal:
+            status.append(2 if _in_check(pieces, squares, stm) else 3)
+            continue
+        status.append(1)
+        n_children[-1] = count
+        ext_loss_min[-1] = loss_min
+        ext_win_max[-1] = win_max
+        ext_blocking[-1] = blocking
+    return start, status, n_children, ext_loss_min, ext_win_max, ext_blocking
+
+
+def dependencies(name: str) -> List[str]:
+    """Tables atteintes par une prise ou une promotion (hors KvK)."""
+    pieces = parse_name(name)
+    deps = set()
+    for i, p in enumerate(pieces):
+        if p.upper() == 'K': continue
+        rest = pieces[:i] + pieces[i + 1:]
+        deps.add(table_name(rest))
+        if p.upper() == 'P':
+            for promo in 'QRBN':
+                deps.add(table_name(pieces[:i] + [promo if p.isupper() else promo.lower()] + pieces[i + 1:]))
+    return sorted(canonical_name(d)[0] for d in deps if d != 'KvK')
+
+
+def _unmoves(pieces: List[str], squares: List[int], stm: str):
+    """(indice de la pièce, case de départ) des coups internes qui ont pu mener ici (trait stm)."""
+    mover_white = stm == BLACK
+    occupied = set(squares)
+    for i, (p, sq) in enumerate(zip(pieces, squares)):
+        if p.isupper() != mover_white: continue
+        kind = p.upper()
+        if kind == 'P':
+            back, start = (-8, 1) if mover_white else (8, 6)
+            prev = sq + back
+            if not 0 < prev >> 3 < 7 or prev in occupied: continue
+            yield i, prev
+            if (prev + back) >> 3 == start and prev + back not in occupied: yield i, prev + back
+        elif kind in 'KN':
+            for prev in (KING_STEPS if kind == 'K' else KNIGHT_STEPS)[sq]:
+                if prev not in occupied: yield i, prev
+        else:
+            for ray in RAYS[kind][sq]:
+                for prev in ray:
+                    if prev in occupied: break
+                    yield i, prev
+
+
+def _retrograde(layout: TableLayout, status, n_children, ext_loss_min, ext_win_max, ext_blocking) -> array.array:
+    # Pas de graphe des prédécesseurs en mémoire (deux u32 par coup : des centaines de Mo dès
+    # 4 pièces) : les parents d'une position résolue sont regénérés par coups à rebours.
+    size, pieces = layout.size, layout.pieces
+    transforms = [0, 1] if layout.has_pawns else list(range(8))
+    in_zone = [[SYM[t][sq] in layout.kslot for sq in range(64)] for t in transforms]
+
+    def parents(idx: int):
+        # Chaque image symétrique distincte de même indice est un enfant possible
+        squares, stm = layout.decode(idx)
+        images, seen = [], set()
+        for k, t in enumerate(transforms):
+            image = tuple(SYM[t][sq] for sq in squares)
+            if image not in seen and layout.index(image, stm) == idx:
+                seen.add(image)
+                images.append(k)
+        parent_stm = BLACK if stm == WHITE else WHITE
+        for i, prev in _unmoves(pieces, squares, stm):
+            q_squares = list(squares)
+            q_squares[i] = prev
+            for k in images:
+                # Parent rangé sous cette forme seulement si son roi blanc est dans la zone
+                if in_zone[k][q_squares[0]]:
+                    sym = SYM[transforms[k]]
+                    yield layout.index([sym[sq] for sq in q_squares], parent_stm)
+
+    values = array.array('H', [INVALID]) * size
+    resolved = bytearray(size)
+    remaining = array.array('B', n_children)
+    win_max = array.array('h', ext_win_max)
+    buckets: Dict[int, array.array] = {}  # distance -> positions codées idx << 1 | gain (u32)
+
+    def push(d, idx, win):
+        buckets.setdefault(d, array.array('I')).append(idx << 1 | win)
+
+    for idx in range(size):
+        st = status[idx]
+        if st == 0: continue
+        values[idx] = DRAW
+        if st == 2:
+            push(0, idx, False)
+        elif st == 3:
+            resolved[idx] = 1
+        else:
+            if ext_loss_min[idx] >= 0: push(ext_loss_min[idx] + 1, idx, True)
+            if n_children[idx] == 0 and not ext_blocking[idx] and ext_loss_min[idx] < 0:
+                push(ext_win_max[idx] + 1, idx, False)
+
+    d = 0
+    while buckets:
+        for code in buckets.pop(d, ()):
+            idx, win = code >> 1, code & 1
+            if resolved[idx]: continue
+            resolved[idx] = 1
+            values[idx] = d + 1
+            for q in parents(idx):
+                if resolved[q] or status[q] != 1: continue
+                if not win:
+                    push(d + 1, q, True)
+                else:
+                    remaining[q] -= 1
+                    if d > win_max[q]: win_max[q] = d
+                    if remaining[q] == 0 and not ext_blocking[q] and ext_loss_min[q] < 0:
+                        push(win_max[q] + 1, q, False)
+        d += 1
+    return values
+
+
+def generate(name: str, directory: str = DEFAULT_TB_DIR, workers: Optional[int] = None, log=print) -> Dict:
+    """Génère une table (et ses dépendances manquantes) ; renvoie temps et taille."""
+    name, _ = canonical_name(name)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name + '.tb')
+    if os.path.exists(path):
+        return {'name': name, 'seconds': 0.0, 'bytes': os.path.getsize(path), 'cached': True}
+    for dep in dependencies(name):
+        generate(dep, directory, workers, log)
+
+    layout = TableLayout(name)
+    workers = workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    n_chunks = max(1, workers * 8)
+    step = -(-layout.size // n_chunks)
+    bounds = [(s, min(s + step, layout.size)) for s in range(0, layout.size, step)]
+    status, n_children = array.array('B'), array.array('B')
+    ext_loss_min, ext_win_max, ext_blocking = array.array('h'), array.array('h'), array.array('B')
+    with multiprocessing.Pool(workers, initializer=_worker_init, initargs=(name, directory)) as pool:
+        for part in pool.imap(_forward_chunk, bounds):
+            _, st, nc, lm, wm, bl = part
+            status.extend(st); n_children.extend(nc)
+            ext_loss_min.extend(lm); ext_win_max.extend(wm); ext_blocking.extend(bl)
+    t_forward = time.perf_counter() - t0
+    values = _retrograde(layout, status, n_children, ext_loss_min, ext_win_max, ext_blocking)
+    if sys.byteorder != 'little': values.byteswap()
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        values.tofile(f)
+    os.replace(tmp, path)
+    seconds = time.perf_counter() - t0
+    longest = max((v - 1 for v in values if v not in (DRAW, INVALID)), default=0)
+    stats = {'name': name, 'seconds': seconds, 'forward_seconds': t_forward, 'bytes': os.path.getsize(path),
+             'positions': layout.size, 'longest_mate_plies': longest, 'cached': False}
+    log(f"{name:<8} {layout.size:>10} positions  {stats['bytes'] / 1024:>9.0f} Ko  "
+        f"{seconds:7.1f} s (passe avant {t_forward:.1f} s, {workers} processus)  mat le plus long : {longest} demi-coups")
+    return stats
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    directory = DEFAULT_TB_DIR
+    jobs = None
+    if '-d' in args:
+        i = args.index('-d'); directory = args[i + 1]; del args[i:i + 2]
+    if '-j' in args:
+        i = args.index('-j'); jobs = int(args[i + 1]); del args[i:i + 2]
+    if args and args[0] == 'gen':
+        for n in args[1:]:
+            generate(n, directory, jobs)
+    elif len(args) >= 2 and args[0] == 'probe':
+        tb = Tablebase(directory)
+        b = Board(args[1])
+        print(tb.probe(b))
+        best = tb.best_move(b)
+        if best: print(best[0].uci(), best[1])
+    else:
+        print(__doc__)
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/tournament.py - Matchs moteur contre moteur sans interface.
+
+Deux configurations de moteur (EnginePlayer) jouent chaque ouverture deux
+fois, couleurs inversées, en parallèle dans un pool de processus. Chaque camp
+a sa pendule (GameClock, même cadence pour les deux) : le temps de réflexion
+de chaque coup est pris sur la pendule et une chute de drapeau perd la partie.
+L'arbitrage suit Board.game_status() (mat, pat, 50 coups, triple répétition),
+avec nulle d'office au-delà de MAX_PLIES demi-coups.
+
+Les parties sont ajoutées au fichier PGN au fil de l'eau ; le bilan donne
+l'écart Elo de A sur B avec son intervalle de confiance à 95 % et, si un SPRT
+est demandé, s'arrête dès que le rapport de vraisemblance franchit une borne.
+
+Un moteur s'écrit nom[:profondeur][@module:fonction] ; la fonction (ex.
+monpaquet.evals:evaluate) remplace Board.evaluate : elle reçoit le Board et
+rend des centipions du point de vue des Blancs. Elle est importée dans chaque
+processus du pool.
+
+Usage : python -m echecs.tournament <moteur A> <moteur B> [parties] [cadence]
+                                    [ouvertures.txt | -] [sortie.pgn]
+"""
+import importlib
+import math
+import multiprocessing as mp
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from echecs.clock import GameClock, TimeControl
+from echecs.engine import BLACK, WHITE, Board
+from echecs.pgn import move_to_san, write_game
+from echecs.search import EnginePlayer, Evaluation
+
+MAX_PLIES = 300
+MOVES_TO_GO = 30  # part du temps restant accordée à un coup, hors incrément
+MIN_MOVE_TIME = 0.01
+DEFAULT_TIME_CONTROL = '1+0.1'
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+DEFAULT_OPENINGS = (
+    START_FEN,
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkb1r/pppppppp/5n2/8/2P5/8/PP1PPPPP/RNBQKBNR w KQkq - 1 2",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "rnbqkbnr/pppp1ppp/4p3/8/3PP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 2",
+    "rnbqkb1r/pppppp1p/5np1/8/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3",
+)
+
+
+def load_callable(spec: str) -> Callable:
+    """'module:attribut' (attribut pointé accepté, ex. echecs.engine:Board.evaluate)."""
+    module, sep, attr = spec.partition(':')
+    if not sep or not module or not attr:
+        raise ValueError(f"{spec!r} : attendu module:fonction")
+    obj = importlib.import_module(module)
+    for part in attr.split('.'):
+        obj = getattr(obj, part)
+    if not callable(obj): raise ValueError(f"{spec!r} n'est pas appelable")
+    return obj
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    name: str
+    max_depth: int = 64
+    evaluate: Optional[str] = None  # 'module:fonction', None : Board.evaluate
+
+    @classmethod
+    def parse(cls, spec: str) -> 'EngineConfig':
+        """'nom', 'nom:profondeur', suivis ou non de '@module:fonction'."""
+        spec, _, evaluate = spec.partition('@')
+        name, _, depth = spec.partition(':')
+        config = cls(name, int(depth) if depth else cls.max_depth, evaluate or None)
+        config.evaluation()  # erreur de spécification signalée avant de lancer le pool
+        return config
+
+    def evaluation(self) -> Optional[Evaluation]:
+        return load_callable(self.evaluate) if self.evaluate else None
+
+    def player(self) -> EnginePlayer:
+        return EnginePlayer(max_depth=self.max_depth, ponder=False, evaluate=self.evaluation())
+
+
+@dataclass(frozen=True)
+class GameJob:
+    index: int
+    fen: str
+    white: EngineConfig
+    black: EngineConfig
+    time_control: str
+    a_is_white: bool  # les deux configurations peuvent être identiques : le camp de A est explicite
+    max_plies: int = MAX_PLIES
+
+
+@dataclass
+class GameResult:
+    job: GameJob
+    result: str  # '1-0', '0-1' ou '1/2-1/2'
+    termination: str
+    sans: List[str] = field(default_factory=list)
+    duration: float = 0.0
+
+
+def _move_time(clock: GameClock, color: str) -> float:
+    left = clock.remaining(color)
+    return max(MIN_MOVE_TIME, min(left / 2, left / MOVES_TO_GO + clock.current_stage(color).increment))
+
+
+def play_game(job: GameJob) -> GameResult:
+    """Joue une partie complète (appelée dans un processus du pool)."""
+    t0 = time.perf_counter()
+    board = Board(job.fen)
+    clock = GameClock(TimeControl.parse(job.time_control))
+    players = {WHITE: job.white.player(), BLACK: job.black.player()}
+    sans: List[str] = []
+    clock.start(board.turn)
+    while True:
+        status, winner = board.game_status()
+        if status == 'checkmate':
+            result, termination = ('1-0' if winner == WHITE else '0-1'), 'checkmate'
+            break
+        if status != 'ongoing':
+            result, termination = '1/2-1/2', 'stalemate' if status == 'stalemate' else 'draw'
+            break
+        if len(sans) >= job.max_plies:
+            result, termination = '1/2-1/2', 'adjudication'
+            break
+        color = board.turn
+        m = players[color].think(board, _move_time(clock, color))
+        if clock.flagged(color) or m is None:
+            result, termination = ('0-1' if color == WHITE else '1-0'), 'time forfeit'
+            break
+        sans.append(move_to_san(board, m))
+        board.push_move(m)
+        clock.press(color)
+    return GameResult(job, result, termination, sans, time.perf_counter() - t0)
+
+
+def elo_from_score(p: float) -> float:
+    p = min(max(p, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / p - 1)
+
+
+def expected_score(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+class MatchStats:
+    """Bilan de A contre B (gains, nulles, pertes du point de vue de A)."""
+
+    def __init__(self):
+        self.wins = self.draws = self.losses = 0
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    def add(self, result: str, a_white: bool):
+        if result == '1/2-1/2':
+            self.draws += 1
+        elif (result == '1-0') == a_white:
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    def score(self) -> float:
+        return (self.wins + self.draws / 2) / self.games if self.games else 0.5
+
+    def variance(self) -> float:
+        """Variance du résultat d'une partie (loi trinomiale observée)."""
+        n, p = self.games, self.score()
+        if not n: return 0.0
+        return (self.wins * (1 - p) ** 2 + self.draws * (0.5 - p) ** 2 + self.losses * p ** 2) / n
+
+    def elo(self) -> Tuple[float, float]:
+        """
+        Écart Elo et demi-largeur de son intervalle de confiance à 95 % ; marge
+        infinie (indéfinie) tant que la variance observée est nulle, par exemple
+        si toutes les parties sont nulles.
+        """
+        if not self.games: return 0.0, math.inf
+        p, var = self.score(), self.variance()
+        elo = elo_from_score(p) + 0.0  # jamais -0.0 à l'affichage
+        if not var: return elo, math.inf
+        margin = 1.959964 * math.sqrt(var / self.games)
+        return elo, (elo_from_score(p + margin) - elo_from_score(p - margin)) / 2
+
+    def llr(self, elo0: float, elo1: float) -> float:
+        """Log-rapport de vraisemblance H1 (elo1) contre H0 (elo0), approximation normale."""
+        var = self.variance()
+        if not var: return 0.0
+        s0, s1 = expected_score(elo0), expected_score(elo1)
+        return self.games * (s1 - s0) * (2 * self.score() - s0 - s1) / (2 * var)
+
+    def __str__(self) -> str:
+        elo, margin = self.elo()
+        spread = f"± {margin:.1f}" if math.isfinite(margin) else "± ? (pas encore de variance)"
+        return (f"+{self.wins} ={self.draws} -{self.losses} ({self.games} parties, "
+                f"{self.score():.1%}) Elo {elo:+.1f} {spread}")
+
+
+@dataclass(frozen=True)
+class Sprt:
+    """Test séquentiel : H0 Elo <= elo0 contre H1 Elo >= elo1, risques alpha et beta."""
+    elo0: float = 0.0
+    elo1: float = 10.0
+    alpha: float = 0.05
+    beta: float = 0.05
+
+    def bounds(self) -> Tuple[float, float]:
+        return math.log(self.beta / (1 - self.alpha)), math.log((1 - self.beta) / self.alpha)
+
+    def decision(self, stats: MatchStats) -> Optional[str]:
+        """'H1' (A plus fort), 'H0' ou None tant qu'aucune borne n'est franchie."""
+        lower, upper = self.bounds()
+        llr = stats.llr(self.elo0, self.elo1)
+        if llr >= upper: return 'H1'
+        if llr <= lower: return 'H0'
+        return None
+
+
+def schedule(a: EngineConfig, b: EngineConfig, openings: Sequence[str], games: int,
+             time_control: str, max_plies: int = MAX_PLIES) -> Iterator[GameJob]:
+    """Paires de parties par ouverture, couleurs inversées, en reprenant les ouvertures en boucle."""
+    for i in range(games):
+        fen = openings[(i // 2) % len(openings)]
+        white, black = (a, b) if i % 2 == 0 else (b, a)
+        yield GameJob(i, fen, white, black, time_control, i % 2 == 0, max_plies)
+
+
+def _headers(game: GameResult) -> dict:
+    job = game.job
+    headers = {'Event': f"{job.white.name} - {job.black.name}", 'Site': '?', 'Date': time.strftime('%Y.%m.%d'),
+               'Round': str(job.index + 1), 'White': job.white.name, 'Black': job.black.name}
+    if job.fen != START_FEN: headers.update(SetUp='1', FEN=job.fen)
+    tc = TimeControl.parse(job.time_control).stage(0)
+    headers['TimeControl'] = f"{tc.base:g}+{tc.increment:g}" if tc.increment else f"{tc.base:g}"
+    headers['Termination'] = game.termination
+    headers['PlyCount'] = str(len(game.sans))
+    return headers
+
+
+def run_match(a: EngineConfig, b: EngineConfig, games: int, openings: Sequence[str] = DEFAULT_OPENINGS,
+              time_control: str = DEFAULT_TIME_CONTROL, workers: Optional[int] = None,
+              pgn_path: Optional[str] = None, sprt: Optional[Sprt] = None, max_plies: int = MAX_PLIES,
+              on_game: Optional[Callable[[GameResult, MatchStats], None]] = None) -> Tuple[MatchStats, Optional[str]]:
+    """Joue jusqu'à games parties de A contre B ; renvoie le bilan et la décision du SPRT."""
+    TimeControl.parse(time_control)  # erreur de cadence signalée avant de lancer le pool
+    stats, decision = MatchStats(), None
+    jobs = schedule(a, b, list(openings), games, time_control, max_plies)
+    pgn = open(pgn_path, 'a', encoding='utf-8') if pgn_path else None
+    try:
+        with mp.get_context().Pool(workers) as pool:
+            # imap_unordered : chaque partie est comptée dès qu'elle finit ; sortir du bloc arrête le pool
+            for game in pool.imap_unordered(play_game, jobs):
+                stats.add(game.result, game.job.a_is_white)
+                if pgn:
+                    write_game(pgn, _headers(game), game.sans, game.result)
+                    pgn.flush()
+                if on_game: on_game(game, stats)
+                if sprt:
+                    decision = sprt.decision(stats)
+                    if decision: break
+    finally:
+        if pgn: pgn.close()
+    return stats, decision
+
+
+def read_openings(path: str) -> List[str]:
+    """Une FEN par ligne ; lignes vides et commentaires (#) ignorés."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    engine_a, engine_b = EngineConfig.parse(sys.argv[1]), EngineConfig.parse(sys.argv[2])
+    n_games = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    tc_spec = sys.argv[4] if len(sys.argv) > 4 else DEFAULT_TIME_CONTROL
+    fens = read_openings(sys.argv[5]) if len(sys.argv) > 5 and sys.argv[5] != '-' else DEFAULT_OPENINGS
+    out = sys.argv[6] if len(sys.argv) > 6 else None
+
+    def report(game: GameResult, st: MatchStats):
+        job = game.job
+        print(f"{job.index + 1:4d}. {job.white.name} - {job.black.name} {game.result} ({game.termination}, "
+              f"{len(game.sans)} demi-coups)   {engine_a.name} : {st}")
+
+    final, verdict = run_match(engine_a, engine_b, n_games, fens, tc_spec, pgn_path=out, sprt=Sprt(), on_game=report)
+    print(f"{engine_a.name} contre {engine_b.name} : {final}")
+    if verdict:
+        print(f"SPRT [{Sprt().elo0:g}, {Sprt().elo1:g}] : {verdict} accepté")
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/validation.py - Validation des coups entrants pour un hôte multi-parties.
+
+Les coups légaux d'une position sont rangés dans un dictionnaire indexé par
+chaîne UCI : valider un coup devient une simple recherche. Le dictionnaire est
+rempli case de départ par case de départ (seules les pièces effectivement
+jouées sont générées) et conservé dans un cache LRU indexé par clé de Zobrist,
+si bien que les positions déjà vues (ouvertures, parties parallèles
+identiques, coups rejoués) ne sont plus jamais régénérées.
+"""
+import collections
+import copy
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from echecs.engine import FILES, RANKS, Board, Move
+
+DEFAULT_CACHE_ENTRIES = 100_000
+
+
+def _from_square(uci: str) -> Optional[Tuple[int, int]]:
+    if len(uci) < 4 or uci[0] not in FILES or uci[1] not in RANKS: return None
+    return RANKS.index(uci[1]), FILES.index(uci[0])
+
+
+class _Entry:
+    __slots__ = ('moves', 'expanded', 'complete')
+
+    def __init__(self):
+        self.moves: Dict[str, Move] = {}
+        self.expanded = set()
+        self.complete = False
+
+
+class MoveValidator:
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._cache: 'collections.OrderedDict[int, _Entry]' = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, board: Board) -> _Entry:
+        key = board.position_hash()
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry
+        entry = self._cache[key] = _Entry()
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _expand(board: Board, entry: _Entry, sq: Tuple[int, int]):
+        entry.expanded.add(sq)
+        p = board.board[sq[0]][sq[1]]
+        if p is None or board.piece_color(p) != board.turn: return
+        for m in board._piece_moves(sq[0], sq[1], p):
+            if board._leaves_king_safe(m): entry.moves[m.uci()] = m
+
+    def legal_moves_by_uci(self, board: Board) -> Dict[str, Move]:
+        """Tous les coups légaux de la position, indexés par UCI (ne pas modifier)."""
+        entry = self._entry(board)
+        if not entry.complete:
+            for sq in board.piece_squares[board.turn]:
+                if sq not in entry.expanded: self._expand(board, entry, sq)
+            entry.complete = True
+        return entry.moves
+
+    def validate(self, board: Board, uci: str) -> Optional[Move]:
+        """Coup légal correspondant à uci (copie, le cache reste intact), sinon None."""
+        entry = self._entry(board)
+        m = entry.moves.get(uci)
+        if m is None and not entry.complete:
+            sq = _from_square(uci)
+            if sq is not None and sq not in entry.expanded:
+                self.misses += 1
+                self._expand(board, entry, sq)
+                m = entry.moves.get(uci)
+            else:
+                self.hits += 1
+        else:
+            self.hits += 1
+        return copy.copy(m) if m else None
+
+    def apply(self, board: Board, uci: str) -> Optional[Move]:
+        """Équivalent de Board.make_move_uci, servi par le cache."""
+        m = self.validate(board, uci)
+        if m: board.push_move(m)
+        return m
+
+    def apply_batch(self, boards: Dict[Hashable, Board],
+                    queue: Iterable[Tuple[Hashable, str]]) -> List[Optional[Move]]:
+        """
+        Traite une rafale de coups (partie, uci) dans l'ordre d'arrivée : chaque coup
+        légal est joué sur sa partie, un coup illégal ou d'une partie inconnue donne None.
+        """
+        results = []
+        for game_id, uci in queue:
+            board = boards.get(game_id)
+            results.append(self.apply(board, uci) if board is not None else None)
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {'entries': len(self._cache), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+echecs/zobrist.py - Clés de Zobrist 64 bits pour identifier une position.
+Les tables sont tirées d'un générateur à graine fixe : une même position donne
+la même clé d'une exécution à l'autre (indispensable pour les fichiers de
+bibliothèque ou de finales écrits sur disque).
+"""
+import random
+
+PIECES = 'PNBRQKpnbrqk'
+PIECE_INDEX = {p: i for i, p in enumerate(PIECES)}
+
+_rng = random.Random(0x0EC4EC5)
+PIECE_KEYS = [[_rng.getrandbits(64) for _ in range(64)] for _ in PIECES]
+CASTLING_KEYS = {k: _rng.getrandbits(64) for k in 'KQkq'}
+EP_FILE_KEYS = [_rng.getrandbits(64) for _ in range(8)]
+SIDE_KEY = _rng.getrandbits(64)
+# Chess960 : tirés après les autres pour laisser inchangées les clés des échecs classiques
+CHESS960_KEY = _rng.getrandbits(64)
+CASTLING_ROOK_KEYS = {k: [_rng.getrandbits(64) for _ in range(8)] for k in 'KQkq'}
+del _rng
+
+
+def castling_keys(board) -> dict:
+    """Clé de chaque droit de roque ; en Chess960 elle dépend de la colonne de la tour."""
+    if not board.chess960: return CASTLING_KEYS
+    files = {side: sq[1] for sq, side in board.castling_rooks.items()}
+    return {k: CASTLING_ROOK_KEYS[k][files[k]] for k in 'KQkq'}
+
+
+def position_hash(board) -> int:
+    """Clé complète d'un Board (pièces, trait, roques, prise en passant, Chess960)."""
+    h = CHESS960_KEY if board.chess960 else 0
+    for r in range(8):
+        row = board.board[r]
+        for c in range(8):
+            p = row[c]
+            if p: h ^= PIECE_KEYS[PIECE_INDEX[p]][r * 8 + c]
+    keys = castling_keys(board)
+    for k, v in board.castling_rights.items():
+        if v: h ^= keys[k]
+    if board.en_passant_target:
+        h ^= EP_FILE_KEYS[board.en_passant_target[1]]
+    if board.turn == 'b':
+        h ^= SIDE_KEY
+    return h
@@ -8,20 +8,23 @@ main.py - Version STABLE FINALE V33 (Fix Réseau & Logique Tour)
 """
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from dataclasses import dataclass
 from typing import List, Optional, Tuple, Dict, Union
-import copy, collections, math
-import socket
+import collections, math
 import threading
 import traceback
 import sys
-
-# ---------------- CONSTANTES DE BASE ----------------
-FILES = 'abcdefgh'
-RANKS = '12345678'
-WHITE = 'w'
-BLACK = 'b'
-PORT = 5000
+import time
+
+from echecs.engine import FILES, RANKS, WHITE, BLACK, Move, Board, GameRecord, move_to_readable
+from echecs.network import PORT, SPECTATOR_PORT, NetworkManager
+from echecs.book import OpeningBook
+from echecs.tablebase import Tablebase
+from echecs.validation import MoveValidator
+from echecs.premove import PremoveQueue
+from echecs.positions import PositionGraph
+from echecs.search import AnalysisWorker, mate_in
+from echecs.profiling import PROFILER
+from echecs.clock import GameClock, TimeControl, format_time, next_display_change
 
 # Images
 IMAGE_MAP = {
@@ -31,6 +34,12 @@ IMAGE_MAP = {
 }
 GROUP_ORDER = ['P', 'N', 'B', 'R', 'Q', 'K']
 
+# Analyse de fond (onglet Infos)
+ANALYSIS_MULTIPV = 3
+ANALYSIS_POLL_MS = 300
+PROFILING_OVERLAY_MS = 500
+DEFAULT_TIME_CONTROL = '5'
+
 # ---------------- THÈMES ----------------
 UI_BG_PRIMARY = '#262421'
 UI_BG_SECONDARY = '#312E2B'
@@ -58,477 +67,10 @@ HIGHLIGHT_SELECTED = DARK_HIGHLIGHT_SELECTED
 HIGHLIGHT_TARGET = DARK_HIGHLIGHT_TARGET
 
 CIRCLE_COLOR = '#769656'
+PREMOVE_COLOR = '#C05050'
 ARROW_COLOR = '#769656'
 
 
-# ---------------- GESTIONNAIRE RÉSEAU ----------------
-class NetworkManager:
-    def __init__(self, is_host, ip=None):
-        self.is_host = is_host
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.conn = None
-        self.addr = None
-        self.connected = False
-        self.local_ip = "127.0.0.1"
-        self.target_ip = ip
-
-        if self.is_host:
-            self._start_server()
-
-    def _start_server(self):
-        try:
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.connect(("8.8.8.8", 80))
-                self.local_ip = s.getsockname()[0]
-                s.close()
-            except:
-                self.local_ip = socket.gethostbyname(socket.gethostname())
-
-            self.socket.bind(('0.0.0.0', PORT))
-            self.socket.listen(1)
-        except Exception as e:
-            raise RuntimeError(f"Erreur liaison port {PORT}: {e}")
-
-    def connect(self):
-        try:
-            if self.is_host:
-                self.conn, self.addr = self.socket.accept()
-                self.connected = True
-                return True
-            else:
-                self.socket.settimeout(5)
-                self.socket.connect((self.target_ip, PORT))
-                self.socket.settimeout(None)
-                self.conn = self.socket
-                self.connected = True
-                return True
-        except Exception as e:
-            print(f"Erreur connexion: {e}")
-            return False
-
-    def send_packet(self, data: str):
-        """Envoie une donnée (Coup ou Commande)"""
-        if self.connected and self.conn:
-            try:
-                self.conn.send(data.encode())
-            except Exception as e:
-                print(f"Erreur d'envoi: {e}")
-                self.connected = False
-
-    def receive_packet(self) -> Optional[str]:
-        if self.connected and self.conn:
-            try:
-                data = self.conn.recv(1024)
-                if not data:
-                    self.connected = False
-                    return None
-                return data.decode()
-            except:
-                return None
-        return None
-
-    def close(self):
-        self.connected = False
-        try:
-            if self.conn:
-                self.conn.shutdown(socket.SHUT_RDWR)
-                self.conn.close()
-        except:
-            pass
-        try:
-            if self.socket: self.socket.close()
-        except:
-            pass
-
-
-# ---------------- Move & Board engine ----------------
-@dataclass
-class Move:
-    from_sq: Tuple[int, int]
-    to_sq: Tuple[int, int]
-    piece: str
-    captured: Optional[str] = None
-    promotion: Optional[str] = None
-    is_en_passant: bool = False
-    is_castle: bool = False
-
-    def uci(self) -> str:
-        f = FILES[self.from_sq[1]] + RANKS[self.from_sq[0]]
-        t = FILES[self.to_sq[1]] + RANKS[self.to_sq[0]]
-        prom = self.promotion.lower() if self.promotion else ''
-        return f + t + prom
-
-
-class Board:
-    def __init__(self, fen: Optional[str] = None):
-        self.board: List[List[Optional[str]]] = [[None] * 8 for _ in range(8)]
-        self.turn = WHITE
-        self.castling_rights = {'K': True, 'Q': True, 'k': True, 'q': True}
-        self.en_passant_target: Optional[Tuple[int, int]] = None
-        self.halfmove_clock = 0
-        self.fullmove_number = 1
-        self.history: List[Tuple[Move, dict]] = []
-        self.fen_history: List[str] = []
-        if fen:
-            self.set_fen(fen)
-        else:
-            self.set_startpos()
-
-    def set_startpos(self):
-        self.set_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
-
-    def set_fen(self, fen: str):
-        parts = fen.split()
-        rows = parts[0].split('/')
-        self.board = [[None] * 8 for _ in range(8)]
-        for r, row in enumerate(rows[::-1]):
-            file_idx = 0
-            for ch in row:
-                if ch.isdigit():
-                    file_idx += int(ch)
-                else:
-                    self.board[r][file_idx] = ch
-                    file_idx += 1
-        self.turn = WHITE if parts[1] == 'w' else BLACK
-        cast = parts[2]
-        self.castling_rights = {'K': 'K' in cast, 'Q': 'Q' in cast, 'k': 'k' in cast, 'q': 'q' in cast}
-        ep = parts[3]
-        if ep != '-':
-            self.en_passant_target = (RANKS.index(ep[1]), FILES.index(ep[0]))
-        else:
-            self.en_passant_target = None
-        if len(parts) >= 6:
-            self.halfmove_clock = int(parts[4]);
-            self.fullmove_number = int(parts[5])
-        else:
-            self.halfmove_clock = 0;
-            self.fullmove_number = 1
-        self.history = []
-        self.fen_history = [self._fen_for_repetition()]
-
-    def _fen_for_repetition(self) -> str:
-        rows = []
-        for r in range(7, -1, -1):
-            empty = 0;
-            rowstr = ''
-            for c in range(8):
-                p = self.board[r][c]
-                if p is None:
-                    empty += 1
-                else:
-                    if empty: rowstr += str(empty); empty = 0
-                    rowstr += p
-            if empty: rowstr += str(empty)
-            rows.append(rowstr)
-        cast = ''.join([k for k, v in self.castling_rights.items() if v]) or '-'
-        ep = FILES[self.en_passant_target[1]] + RANKS[self.en_passant_target[0]] if self.en_passant_target else '-'
-        return f"{'/'.join(rows)} {'w' if self.turn == WHITE else 'b'} {cast} {ep}"
-
-    def in_bounds(self, r, c):
-        return 0 <= r < 8 and 0 <= c < 8
-
-    def piece_color(self, p):
-        return WHITE if p.isupper() else BLACK
-
-    def _opponent(self, color):
-        return BLACK if color == WHITE else WHITE
-
-    def find_king(self, color):
-        king = 'K' if color == WHITE else 'k'
-        for r in range(8):
-            for c in range(8):
-                if self.board[r][c] == king:
-                    return (r, c)
-        return None
-
-    def is_square_attacked(self, sq, by_color):
-        rtarget, ctarget = sq
-        for r in range(8):
-            for c in range(8):
-                p = self.board[r][c]
-                if not p or self.piece_color(p) != by_color: continue
-                for m in self._piece_moves(r, c, p, check_legality=False):
-                    if m.to_sq == sq:
-                        return True
-        return False
-
-    def king_in_check(self, color):
-        kp = self.find_king(color)
-        if not kp: return True
-        return self.is_square_attacked(kp, self._opponent(color))
-
-    def generate_moves(self, legal=True) -> List[Move]:
-        moves = []
-        for r in range(8):
-            for c in range(8):
-                p = self.board[r][c]
-                if not p: continue
-                if self.piece_color(p) != self.turn: continue
-                moves.extend(self._piece_moves(r, c, p))
-        if legal:
-            legal_moves = []
-            for m in moves:
-                b2 = copy.deepcopy(self)
-                b2._make_move_internal(m)
-                if not b2.king_in_check(self.turn):
-                    legal_moves.append(m)
-            return legal_moves
-        return moves
-
-    def _piece_moves(self, r, c, p, check_legality=True):
-        moves = []
-        color = self.piece_color(p)
-        pt = p.upper()
-        dir_sign = 1 if color == WHITE else -1
-
-        if pt == 'P':
-            nr = r + dir_sign
-            if self.in_bounds(nr, c) and self.board[nr][c] is None:
-                if nr == 0 or nr == 7:
-                    for promo in ['Q', 'R', 'B', 'N']:
-                        moves.append(Move((r, c), (nr, c), p, promotion=promo if color == WHITE else promo.lower()))
-                else:
-                    moves.append(Move((r, c), (nr, c), p))
-                start_rank = 1 if color == WHITE else 6
-                nr2 = r + 2 * dir_sign
-                if r == start_rank and self.in_bounds(nr2, c) and self.board[nr2][c] is None:
-                    moves.append(Move((r, c), (nr2, c), p))
-            for dc in (-1, 1):
-                nc = c + dc;
-                nr = r + dir_sign
-                if not self.in_bounds(nr, nc): continue
-                target = self.board[nr][nc]
-                if target and self.piece_color(target) != color:
-                    if nr == 0 or nr == 7:
-                        for promo in ['Q', 'R', 'B', 'N']:
-                            moves.append(Move((r, c), (nr, nc), p, captured=target,
-                                              promotion=promo if color == WHITE else promo.lower()))
-                    else:
-                        moves.append(Move((r, c), (nr, nc), p, captured=target))
-            if self.en_passant_target:
-                ep_r, ep_c = self.en_passant_target
-                if ep_r == r + dir_sign and abs(ep_c - c) == 1:
-                    cap_r = r;
-                    cap_c = ep_c
-                    target = self.board[cap_r][cap_c]
-                    if target and target.upper() == 'P' and self.piece_color(target) != color:
-                        moves.append(Move((r, c), (ep_r, ep_c), p, captured=target, is_en_passant=True))
-            return moves
-
-        if pt == 'N':
-            for dr, dc in [(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)]:
-                nr, nc = r + dr, c + dc
-                if not self.in_bounds(nr, nc): continue
-                target = self.board[nr][nc]
-                if target is None or self.piece_color(target) != color:
-                    moves.append(Move((r, c), (nr, nc), p, captured=target if target else None))
-            return moves
-
-        if pt in ('B', 'R', 'Q'):
-            directions = []
-            if pt in ('B', 'Q'): directions += [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-            if pt in ('R', 'Q'): directions += [(1, 0), (-1, 0), (0, 1), (0, -1)]
-            for dr, dc in directions:
-                nr, nc = r + dr, c + dc
-                while self.in_bounds(nr, nc):
-                    target = self.board[nr][nc]
-                    if target is None:
-                        moves.append(Move((r, c), (nr, nc), p))
-                    else:
-                        if self.piece_color(target) != color:
-                            moves.append(Move((r, c), (nr, nc), p, captured=target))
-                        break
-                    nr += dr;
-                    nc += dc
-            return moves
-
-        if pt == 'K':
-            for dr in (-1, 0, 1):
-                for dc in (-1, 0, 1):
-                    if dr == 0 and dc == 0: continue
-                    nr, nc = r + dr, c + dc
-                    if not self.in_bounds(nr, nc): continue
-                    target = self.board[nr][nc]
-                    if target is None or self.piece_color(target) != color:
-                        moves.append(Move((r, c), (nr, nc), p, captured=target if target else None))
-
-            if not check_legality: return moves
-
-            if (r, c) == ((0, 4) if color == WHITE else (7, 4)):
-                if color == WHITE:
-                    king_side = self.castling_rights.get('K', False)
-                    queen_side = self.castling_rights.get('Q', False)
-                    rank = 0
-                else:
-                    king_side = self.castling_rights.get('k', False)
-                    queen_side = self.castling_rights.get('q', False)
-                    rank = 7
-                if king_side:
-                    if self.board[rank][5] is None and self.board[rank][6] is None:
-                        rook = self.board[rank][7]
-                        if rook and rook.upper() == 'R' and self.piece_color(rook) == color:
-                            if not self.is_square_attacked((rank, 4),
-                                                           self._opponent(color)) and not self.is_square_attacked(
-                                (rank, 5), self._opponent(color)) and not self.is_square_attacked((rank, 6),
-                                                                                                  self._opponent(
-                                                                                                      color)):
-                                moves.append(Move((r, c), (rank, 6), p, is_castle=True))
-                if queen_side:
-                    if self.board[rank][3] is None and self.board[rank][2] is None and self.board[rank][1] is None:
-                        rook = self.board[rank][0]
-                        if rook and rook.upper() == 'R' and self.piece_color(rook) == color:
-                            if not self.is_square_attacked((rank, 4),
-                                                           self._opponent(color)) and not self.is_square_attacked(
-                                (rank, 3), self._opponent(color)) and not self.is_square_attacked((rank, 2),
-                                                                                                  self._opponent(
-                                                                                                      color)):
-                                moves.append(Move((r, c), (rank, 2), p, is_castle=True))
-            return moves
-
-        return moves
-
-    def _make_move_internal(self, m: Move):
-        fr_r, fr_c = m.from_sq;
-        to_r, to_c = m.to_sq
-        piece = self.board[fr_r][fr_c]
-        assert piece is not None
-        if piece.upper() == 'P' or m.captured:
-            self.halfmove_clock = 0
-        else:
-            self.halfmove_clock += 1
-        if m.is_en_passant:
-            cap_r = fr_r;
-            cap_c = to_c
-            m.captured = self.board[cap_r][cap_c]
-            self.board[cap_r][cap_c] = None
-        if m.is_castle:
-            if to_c == 6:
-                rank = to_r
-                self.board[rank][5] = self.board[rank][7]
-                self.board[rank][7] = None
-            elif to_c == 2:
-                rank = to_r
-                self.board[rank][3] = self.board[rank][0]
-                self.board[rank][0] = None
-        if self.board[to_r][to_c] is not None and not m.is_en_passant:
-            m.captured = self.board[to_r][to_c]
-        self.board[to_r][to_c] = piece
-        self.board[fr_r][fr_c] = None
-        if m.promotion:
-            self.board[to_r][to_c] = m.promotion
-        self.en_passant_target = None
-        if piece.upper() == 'P' and abs(to_r - fr_r) == 2:
-            ep_r = (to_r + fr_r) // 2;
-            ep_c = fr_c
-            self.en_passant_target = (ep_r, ep_c)
-        if piece.upper() == 'K':
-            if piece.isupper():
-                self.castling_rights['K'] = False;
-                self.castling_rights['Q'] = False
-            else:
-                self.castling_rights['k'] = False;
-                self.castling_rights['q'] = False
-        if piece.upper() == 'R':
-            if fr_r == 0 and fr_c == 0: self.castling_rights['Q'] = False
-            if fr_r == 0 and fr_c == 7: self.castling_rights['K'] = False
-            if fr_r == 7 and fr_c == 0: self.castling_rights['q'] = False
-            if fr_r == 7 and fr_c == 7: self.castling_rights['k'] = False
-        if m.captured and m.captured.upper() == 'R':
-            cr = to_r;
-            cc = to_c
-            if cr == 0 and cc == 0: self.castling_rights['Q'] = False
-            if cr == 0 and cc == 7: self.castling_rights['K'] = False
-            if cr == 7 and cc == 0: self.castling_rights['q'] = False
-            if cr == 7 and cc == 7: self.castling_rights['k'] = False
-
-    def push_move(self, m: Move):
-        state = {
-            'board': copy.deepcopy(self.board),
-            'castling_rights': copy.deepcopy(self.castling_rights),
-            'en_passant_target': self.en_passant_target,
-            'halfmove_clock': self.halfmove_clock,
-            'fullmove_number': self.fullmove_number,
-            'turn': self.turn
-        }
-        self.history.append((m, state))
-        self._make_move_internal(m)
-        if self.turn == BLACK: self.fullmove_number += 1
-        self.turn = self._opponent(self.turn)
-        self.fen_history.append(self._fen_for_repetition())
-
-    def undo_move(self):
-        if not self.history: return
-        m, state = self.history.pop()
-        self.board = state['board']
-        self.castling_rights = state['castling_rights']
-        self.en_passant_target = state['en_passant_target']
-        self.halfmove_clock = state['halfmove_clock']
-        self.fullmove_number = state['fullmove_number']
-        self.turn = state['turn']
-        if self.fen_history: self.fen_history.pop()
-
-    def make_move_uci(self, uci: str, prompt_promotion: bool = False) -> Optional[Move]:
-        if len(uci) < 4: return None
-        try:
-            from_file = FILES.index(uci[0]);
-            from_rank = RANKS.index(uci[1])
-            to_file = FILES.index(uci[2]);
-            to_rank = RANKS.index(uci[3])
-        except ValueError:
-            return None
-        fr = (from_rank, from_file);
-        to = (to_rank, to_file)
-        promotion = uci[4] if len(uci) >= 5 else None
-        moves = self.generate_moves(legal=True)
-        candidates = [m for m in moves if m.from_sq == fr and m.to_sq == to]
-        if not candidates: return None
-        promos = [m for m in candidates if m.promotion]
-        if promos and not promotion: return None
-        for m in candidates:
-            if promotion:
-                if m.promotion and promotion.lower() == m.promotion[0].lower():
-                    self.push_move(m);
-                    return m
-            else:
-                if not m.promotion:
-                    self.push_move(m);
-                    return m
-        return None
-
-    def game_status(self):
-        in_check = self.king_in_check(self.turn)
-        moves = self.generate_moves(legal=True)
-        if not moves:
-            if in_check:
-                return ('checkmate', self._opponent(self.turn))
-            else:
-                return ('stalemate', None)
-        if self.halfmove_clock >= 100: return ('draw', None)
-        rep_count = collections.Counter(self.fen_history)
-        if rep_count[self._fen_for_repetition()] >= 3: return ('draw', None)
-        return ('ongoing', None)
-
-
-# ---------------- notation ----------------
-def move_to_readable(m: Move) -> str:
-    if m.is_castle: return "O-O" if m.to_sq[1] == 6 else "O-O-O"
-    piece = m.piece.upper()
-    dest = FILES[m.to_sq[1]] + RANKS[m.to_sq[0]]
-    capture = 'x' if m.captured else ''
-    promo = f"={m.promotion.upper()}" if m.promotion else ''
-
-    if piece == 'P':
-        if capture:
-            from_file = FILES[m.from_sq[1]]
-            return f"{from_file}x{dest}{promo}"
-        else:
-            return f"{dest}{promo}"
-    else:
-        return f"{piece}{capture}{dest}{promo}"
-
-
 # ---------------- Treeview History ----------------
 class TreeviewHistory(tk.Frame):
     def __init__(self, master, app_instance, *args, **kwargs):
@@ -587,7 +129,7 @@ class TreeviewHistory(tk.Frame):
         self.tree.see(item_id)
 
     def on_history_select(self, event):
-        full_moves = self.app.full_history_data
+        full_moves = self.app.game_record
         if not full_moves: self.deselect_all_cells(); return
         item_id = self.tree.identify_row(event.y)
         col_id = self.tree.identify_column(event.x)
@@ -616,25 +158,99 @@ class InfoTab(tk.Frame):
         self.text_area.pack(fill='both', expand=False, padx=5, pady=5)
         self.text_area.insert(tk.END, "Informations sur le jeu...")
         self.text_area.config(state=tk.DISABLED)
+        self.header = ""
+        self.header_key = None  # (clé, demi-coups) de la position décrite par header
+        self.analysis_enabled = True
+        self.worker: Optional[AnalysisWorker] = None
+        self.analysis_key = None
+        self.shown_info = None
+        self.poll_job = None
 
     def refresh_info(self):
-        self.text_area.config(state=tk.NORMAL);
-        self.text_area.delete(1.0, tk.END)
-        if self.app.animating: self.text_area.insert(tk.END, "Animation..."); self.text_area.config(
-            state=tk.DISABLED); return
-        moves = self.app.board.generate_moves(legal=True)
-        turn = "Blancs" if self.app.board.turn == WHITE else "Noirs"
-        self.text_area.insert(tk.END, f"--- À jouer : {turn} ---\n\n")
-        if not moves:
-            st, _ = self.app.board.game_status()
-            self.text_area.insert(tk.END, f"Partie terminée : {st.upper()}!\n")
-            self.text_area.config(state=tk.DISABLED);
+        board = self.app.board
+        if self.app.animating:
+            self.stop_analysis()
+            self.header = "Animation..."
+            self.header_key = None
+            self._render()
             return
-        piece_moves = collections.defaultdict(list)
-        for m in moves: piece_moves[m.piece.upper()].append(move_to_readable(m))
-        self.text_area.insert(tk.END, f"Coups légaux ({len(moves)}) :\n")
-        for p in GROUP_ORDER:
-            if p in piece_moves: self.text_area.insert(tk.END, f"\n{p} : {', '.join(sorted(piece_moves[p]))}")
+        # Redessins purement visuels (flèches, surbrillances, prémouvements) : même position, rien à recalculer
+        key = (board.position_hash(), len(board.hash_history))
+        if key == self.header_key: return
+        self.header_key = key
+        turn = "Blancs" if board.turn == WHITE else "Noirs"
+        lines = [f"--- À jouer : {turn} ---\n"]
+        balance = board.material[WHITE] - board.material[BLACK]
+        lines.append(f"Matériel : {balance / 100:+.1f}   Évaluation : {board.evaluate() / 100:+.2f}")
+        if not self.app.positions.legal_moves(board):
+            st, _ = board.game_status()
+            lines.append(f"\nPartie terminée : {st.upper()}!")
+            self.stop_analysis()
+            self.header = '\n'.join(lines)
+            self._render()
+            return
+        if self.app.opening_book:
+            book_moves = self.app.opening_book.probe(board)
+            if book_moves:
+                listing = ', '.join(f"{move_to_readable(m)} ({freq})" for m, freq in book_moves)
+                lines.append(f"\nBibliothèque : {listing}")
+        if self.app.tablebase:
+            best = self.app.tablebase.best_move(board)
+            if best:
+                m, (result, dtm) = best
+                verdict = {'win': f"Gain (mat en {(dtm + 1) // 2})", 'loss': f"Perte (mat en {dtm // 2})",
+                           'draw': "Nulle"}[result]
+                lines.append(f"\nTable de finale : {verdict} - {move_to_readable(m)}")
+        self.header = '\n'.join(lines)
+        self.start_analysis(board)
+        self._render()
+
+    def start_analysis(self, board: Board):
+        """Relance l'analyse de fond uniquement si la position a changé."""
+        if not self.analysis_enabled: return
+        key = (board.position_hash(), len(board.hash_history))
+        if key == self.analysis_key and self.worker: return
+        self.stop_analysis()
+        self.analysis_key = key
+        self.worker = AnalysisWorker(board, multipv=ANALYSIS_MULTIPV).start()
+        self.poll_job = self.after(ANALYSIS_POLL_MS, self._poll_analysis)
+
+    def stop_analysis(self):
+        if self.worker: self.worker.stop()
+        if self.poll_job: self.after_cancel(self.poll_job)
+        self.worker = None
+        self.analysis_key = None
+        self.shown_info = None
+        self.poll_job = None
+
+    def _poll_analysis(self):
+        self.poll_job = None
+        worker = self.worker
+        if not worker: return
+        if worker.latest is not self.shown_info: self._render()
+        if not worker.done:
+            self.poll_job = self.after(ANALYSIS_POLL_MS, self._poll_analysis)
+
+    def _format_score(self, score: int) -> str:
+        # Score du point de vue du trait, affiché du point de vue des Blancs
+        if self.worker and self.worker.board.turn != WHITE: score = -score
+        mate = mate_in(score)
+        return f"#{mate}" if mate is not None else f"{score / 100:+.2f}"
+
+    def _render(self):
+        text = self.header
+        info = self.worker.latest if self.worker else None
+        self.shown_info = info
+        if self.worker:
+            if info:
+                text += f"\n\nAnalyse - profondeur {info['depth']}, {info['nps'] / 1000:.1f} kN/s"
+                for i, (score, pv) in enumerate(info['lines'], 1):
+                    text += f"\n{i}. {self._format_score(score)}  {' '.join(move_to_readable(m) for m in pv)}"
+            else:
+                text += "\n\nAnalyse en cours..."
+        self.text_area.config(state=tk.NORMAL)
+        self.text_area.delete(1.0, tk.END)
+        self.text_area.insert(tk.END, text)
         self.text_area.config(state=tk.DISABLED)
 
 
@@ -659,9 +275,9 @@ class GamesTab(tk.Frame):
 
     def refresh_list(self):
         for item in self.tree.get_children(): self.tree.delete(item)
-        for idx, (name, history) in enumerate(self.app.saved_games):
+        for idx, (name, record) in enumerate(self.app.saved_games):
             item_id = f"saved_game_{idx}"
-            display = f"{name} ({len(history)} coups)" if history else f"{name} (Vide)"
+            display = f"{name} ({len(record)} coups)" if len(record) else f"{name} (Vide)"
             self.tree.insert('', 'end', text=name, values=(display,), iid=item_id)
 
     def on_game_select(self, event):
@@ -672,9 +288,9 @@ class GamesTab(tk.Frame):
         except:
             return
         if idx < len(self.app.saved_games):
-            name, history = self.app.saved_games[idx]
-            self.app.full_history_data = copy.deepcopy(history)
-            target = len(history) - 1
+            name, record = self.app.saved_games[idx]
+            self.app.game_record = record  # partagé : un GameRecord est immuable
+            target = len(record) - 1
             if target >= 0:
                 self.app.restore_position(target, animate=False)
             else:
@@ -682,6 +298,7 @@ class GamesTab(tk.Frame):
             self.app.started = False;
             self.app.game_over = False
             self.app.is_analyzing_saved_game = True
+            self.app._stop_clock()
             self.app.tab_control.select(0)
             self.tree.selection_remove(sel[0])
 
@@ -693,11 +310,11 @@ class StartMenu(tk.Tk):
         self.title("Sélection du Mode de Jeu")
         self.resizable(False, False)
         self.configure(bg=UI_BG_PRIMARY)
-        self.geometry("300x300")
+        self.geometry("300x360")
 
         self.mode = None
         self.network_config = None
-        self.initial_time = 300
+        self.time_control = DEFAULT_TIME_CONTROL
 
         style = ttk.Style()
         style.theme_use("default")
@@ -731,6 +348,9 @@ class StartMenu(tk.Tk):
         ttk.Button(lan_frame, text="Rejoindre", command=lambda: self.select_mode('lan', 'client'),
                    style='Menu.TButton').pack(side='right', expand=True, fill='x', padx=(5, 0))
 
+        ttk.Button(main_frame, text="Regarder (spectateur)", command=lambda: self.select_mode('lan', 'spectator'),
+                   style='Menu.TButton').pack(fill='x', pady=(10, 0))
+
         self.center_window()
 
     def center_window(self):
@@ -742,10 +362,9 @@ class StartMenu(tk.Tk):
         self.geometry(f'{width}x{height}+{x}+{y}')
 
     def setup_host(self):
-        val = simpledialog.askinteger("Temps de la partie", "Temps initial par joueur (minutes) :",
-                                      initialvalue=5, minvalue=1, parent=self)
-        if val:
-            self.initial_time = val * 60
+        spec = ask_time_control(self, self.time_control)
+        if spec:
+            self.time_control = spec
             self.select_mode('lan', 'host')
 
     def select_mode(self, mode, net_config=None):
@@ -754,33 +373,57 @@ class StartMenu(tk.Tk):
         self.destroy()
 
 
+def ask_time_control(parent, initial: str) -> Optional[str]:
+    """Demande une cadence (ex. 5, 3+2, 15d5, 40/90+30, 30+30) jusqu'à obtenir une saisie valide."""
+    while True:
+        spec = simpledialog.askstring("Cadence",
+                                      "Minutes[+incrément s][d délai s], périodes séparées par des virgules\n"
+                                      "ex. 5   3+2   15d5   40/90+30, 30+30", initialvalue=initial, parent=parent)
+        if not spec: return None
+        try:
+            return str(TimeControl.parse(spec))
+        except ValueError as e:
+            messagebox.showerror("Cadence", str(e), parent=parent)
+            initial = spec
+
+
 # ---------------- ChessApp (Fenêtre Principale) ----------------
 class ChessApp(tk.Tk):
     canvas_images: List[tk.PhotoImage] = []
 
-    def __init__(self, mode: str, network_config=None, initial_time_seconds=300):
+    def __init__(self, mode: str, network_config=None, time_control: str = DEFAULT_TIME_CONTROL):
         super().__init__()
 
         # 1. INITIALISATION DES VARIABLES (AVANT TOUT UI)
         self.game_mode = mode
         self.network_manager = None
         self.is_host = False
-        self.init_seconds = initial_time_seconds
+        self.is_spectator = False
+        self.link_state = 'connected'
+        self.time_control = TimeControl.parse(time_control)
         self.is_analyzing_saved_game = False
         self.square_size = 72
         self.board_px = 8 * self.square_size
         self.board = Board()
+        self.opening_book = OpeningBook.open_default()
+        self.tablebase = Tablebase.open_default()
+        self.validator = MoveValidator()
         self.captured_by_white = []
         self.captured_by_black = []
-        self.full_history_data = []
-        self.saved_games = []
+        self.game_record: GameRecord = self.board.record()
+        # Positions déjà vues pendant la session (coups légaux, SAN) : navigation sans régénération
+        self.positions = PositionGraph()
+        self._record_moves_cache: Tuple[Optional[GameRecord], List[str]] = (None, [])
+        self.saved_games: List[Tuple[str, GameRecord]] = []
         self.selected = None
         self.legal_targets = []
         self.animating = False
         self.game_over = False
         self.started = False
-        self.time_left = {WHITE: self.init_seconds, BLACK: self.init_seconds}
-        self.clock_history: List[Tuple[int, int]] = []
+        self.clock = GameClock(self.time_control)
+        self.clock_history: List[Tuple] = []
+        self._clock_text = {WHITE: None, BLACK: None}
+        self._clock_job = None
         self.last_move_squares: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
 
         self.is_flipped = False  # Initialisation par défaut
@@ -793,9 +436,15 @@ class ChessApp(tk.Tk):
         # Config Réseau
         if self.game_mode == 'lan':
             self.is_host = (network_config == 'host')
+            self.is_spectator = (network_config == 'spectator')
             if self.is_host:
                 try:
                     self.network_manager = NetworkManager(is_host=True)
+                    self.network_manager.on_state_change = self._link_state_from_thread
+                    try:
+                        self.network_manager.enable_spectators()
+                    except OSError as e:
+                        print(f"Mode spectateur indisponible: {e}")
                     self.after(100, lambda: messagebox.showinfo("Hébergement",
                                                                 f"En attente de connexion...\nVotre IP Locale : {self.network_manager.local_ip}"))
                     threading.Thread(target=self._wait_for_connection, daemon=True).start()
@@ -806,9 +455,12 @@ class ChessApp(tk.Tk):
             else:
                 target_ip = simpledialog.askstring("Connexion", "Entrez l'IP de l'hôte:")
                 if target_ip:
-                    self.network_manager = NetworkManager(is_host=False, ip=target_ip)
+                    port = SPECTATOR_PORT if self.is_spectator else PORT
+                    self.network_manager = NetworkManager(is_host=False, ip=target_ip, spectator=self.is_spectator,
+                                                          port=port)
+                    self.network_manager.on_state_change = self._link_state_from_thread
                     if self.network_manager.connect():
-                        self.is_flipped = True
+                        self.is_flipped = not self.is_spectator
                         threading.Thread(target=self._listen_network, daemon=True).start()
                     else:
                         messagebox.showerror("Erreur", "Impossible de se connecter à l'hôte.")
@@ -823,6 +475,9 @@ class ChessApp(tk.Tk):
         self.configure(bg=UI_BG_PRIMARY)
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
+        # Coups anticipés du joueur local (LAN) : le camp de l'hôte est les Blancs
+        self.premoves = PremoveQueue(WHITE if self.is_host else BLACK)
+
         # 2. INITIALISATION UI DIRECTE
         self._setup_widgets()
 
@@ -835,9 +490,10 @@ class ChessApp(tk.Tk):
     def _wait_for_connection(self):
         if self.network_manager.connect():
             if self.is_host:
-                self.network_manager.send_packet(f"TIME:{self.init_seconds}")
+                self.network_manager.send_packet(f"TIME:{self.time_control}")
             self.after(0, lambda: messagebox.showinfo("Info", "Client connecté !"))
             self.after(0, self.on_start)
+            self.after(0, lambda: self._broadcast_spectators(f"TIME:{self.time_control}"))
             threading.Thread(target=self._listen_network, daemon=True).start()
 
     def _listen_network(self):
@@ -845,20 +501,30 @@ class ChessApp(tk.Tk):
             msg = self.network_manager.receive_packet()
             if msg:
                 if msg.startswith("TIME:"):
-                    try:
-                        t = int(msg.split(":")[1])
-                        self.after(0, lambda val=t: self._sync_time_client(val))
-                    except:
-                        pass
+                    self.after(0, lambda spec=msg[len("TIME:"):]: self._sync_time_client(spec))
                 elif msg.startswith("CMD:"):
                     self.after(0, lambda c=msg: self.handle_network_command(c))
+                elif msg.startswith("SNAP:"):
+                    self.after(0, lambda snap=msg: self.apply_snapshot(snap))
+                elif msg.startswith("CLOCK:"):
+                    self.after(0, lambda clk=msg: self._sync_clock(clk))
                 else:
                     self.after(0, lambda m=msg: self.apply_network_move(m))
             else:
                 break
 
+    def _link_state_from_thread(self, state: str):
+        self.after(0, lambda: self._on_link_state(state))
+
+    def _on_link_state(self, state: str):
+        """Reprise de session LAN : 'reconnecting', 'connected' ou 'lost'."""
+        self.link_state = state
+        self.draw_board()
+        if state == 'lost':
+            messagebox.showerror("Réseau", "Connexion perdue : l'adversaire ne répond plus.")
+
     def handle_network_command(self, cmd):
-        if cmd == "CMD:REMATCH":
+        if cmd == "CMD:REMATCH" and not self.is_spectator:
             res = messagebox.askyesno("Revanche", "L'adversaire propose une revanche. Accepter ?")
             if res:
                 self.network_manager.send_packet("CMD:RESET")
@@ -873,36 +539,98 @@ class ChessApp(tk.Tk):
         self.animating = False
         self.game_over = False
         self.started = True
-        self.time_left = {WHITE: self.init_seconds, BLACK: self.init_seconds}
+        self.clock = GameClock(self.time_control)
+        self.clock.start(WHITE)
+        self._schedule_clock()
         self.clock_history = []
         self.captured_by_white = []
         self.captured_by_black = []
-        self.full_history_data = []
+        self.game_record = self.board.record()
         self.last_move_squares = None
         self.drawn_annotations = []
+        self.premoves.clear()
 
         self.draw_board()
         self.info_tab.refresh_info()
         self.games_tab.refresh_list()
         self.update_clock_labels()
+        self._broadcast_spectators("CMD:RESET")
+
+    def _broadcast_spectators(self, msg: str):
+        """Côté hôte : relaie un message aux spectateurs avec l'instantané de l'état qui en résulte."""
+        nm = self.network_manager
+        if not self.is_host or not nm or not nm.spectators: return
+        w, b = self.clock.remaining(WHITE), self.clock.remaining(BLACK)
+        nm.broadcast(msg, snapshot=f"SNAP:{self.board.fen()}|{w:.3f}|{b:.3f}")
+        nm.broadcast(f"CLOCK:{w:.3f}:{b:.3f}")
+
+    def apply_snapshot(self, snap: str):
+        """Côté spectateur : repart de l'instantané (FEN + pendules) envoyé par l'hôte."""
+        try:
+            fen, w, b = snap[len("SNAP:"):].split('|')
+            board = Board(fen)
+            w, b = float(w), float(b)
+        except (ValueError, IndexError):
+            return
+        self.board = board
+        self.game_record = board.record()
+        self.captured_by_white = []
+        self.captured_by_black = []
+        self.last_move_squares = None
+        self.selected = None
+        self.legal_targets = []
+        self.premoves.clear()
+        self.game_over = False
+        self.clock.set_remaining(w, b)
+        self.clock.start(board.turn)
+        self.started = True
+        self._schedule_clock()
+        self.draw_board()
+
+    def _sync_clock(self, msg: str):
+        try:
+            _, w, b = msg.split(':')
+            self.clock.set_remaining(float(w), float(b))
+        except ValueError:
+            return
+        if not self.game_over: self.clock.start(self.board.turn)
+        self._schedule_clock()
+        self.update_clock_labels()
 
-    def _sync_time_client(self, seconds):
-        self.init_seconds = seconds
-        self.time_left = {WHITE: seconds, BLACK: seconds}
+    def _sync_time_client(self, spec: str):
+        try:
+            self.time_control = TimeControl.parse(spec)
+        except ValueError:
+            return
+        self.clock = GameClock(self.time_control)
         self.update_clock_labels()
         self.on_start()
 
+    def _press_clock(self, color: str):
+        """color vient de jouer : incrément, délai et périodes, état empilé pour l'annulation."""
+        self.clock_history.append(self.clock.snapshot())
+        if not self.game_over: self.clock.press(color)
+        self._schedule_clock()
+
+    def _note_move(self, move: Move):
+        """Pendule, partie enregistrée, dernier coup et prises après un coup déjà joué sur self.board."""
+        self._press_clock(WHITE if move.piece.isupper() else BLACK)
+        self.game_record = self.board.record()
+        self.last_move_squares = move.from_sq, move.to_sq
+        if move.captured:
+            c = WHITE if move.piece.isupper() else BLACK
+            if c == WHITE:
+                self.captured_by_white.append(move.captured)
+            else:
+                self.captured_by_black.append(move.captured)
+
     def apply_network_move(self, uci: str):
-        move = self.board.make_move_uci(uci)
+        move = self.validator.apply(self.board, uci)
         if move:
-            self.full_history_data.append(copy.deepcopy(move))
-            self.last_move_squares = move.from_sq, move.to_sq
-            if move.captured:
-                c = WHITE if move.piece.isupper() else BLACK
-                if c == WHITE:
-                    self.captured_by_white.append(move.captured)
-                else:
-                    self.captured_by_black.append(move.captured)
+            self._note_move(move)
+            self._broadcast_spectators(uci)
+            # Réponse anticipée envoyée tout de suite, avant tout rafraîchissement de l'interface
+            if self.premoves: self._play_premove()
 
             self.draw_board()
             self.info_tab.refresh_info()
@@ -910,6 +638,18 @@ class ChessApp(tk.Tk):
             if not self.started:
                 self.started = True
 
+    def _play_premove(self):
+        """Joue le premier coup anticipé s'il est légal dans la position reçue, sinon vide la file."""
+        uci = self.premoves.pop(self.board)
+        if uci is None: return
+        move = self.validator.apply(self.board, uci) if self.board.game_status()[0] == 'ongoing' else None
+        if not move:
+            self.premoves.clear()
+            return
+        self._note_move(move)
+        self.network_manager.send_packet(uci)
+        self._broadcast_spectators(uci)
+
     def _setup_widgets(self):
         self._load_images()
         style = ttk.Style(self)
@@ -988,7 +728,8 @@ class ChessApp(tk.Tk):
                                            style='Dark.TButton')
             self.start_button.grid(row=2, column=0, sticky='we', pady=(6, 0))
         else:
-            self.start_button = tk.Label(self.board_frame, text="Partie Réseau", bg=UI_BG_PRIMARY, fg=UI_FG)
+            self.start_button = tk.Label(self.board_frame, text="Spectateur" if self.is_spectator else "Partie Réseau",
+                                         bg=UI_BG_PRIMARY, fg=UI_FG)
             self.start_button.grid(row=2, column=0, sticky='we', pady=(6, 0))
 
         global BOARD_LIGHT, BOARD_DARK, HIGHLIGHT_LAST_MOVE, HIGHLIGHT_SELECTED, HIGHLIGHT_TARGET
@@ -1004,7 +745,6 @@ class ChessApp(tk.Tk):
             if isinstance(w, tk.Label): w.config(bg=UI_BG_SECONDARY, fg=UI_FG)
 
         self.update_clock_labels()
-        self.after(1000, self._tick)
 
         self.update_idletasks()
         self.draw_board()
@@ -1043,13 +783,13 @@ class ChessApp(tk.Tk):
                               font=('TkDefaultFont', 10, 'bold'))
         name_label.pack(side='left', padx=(0, 10))
         if color == WHITE:
-            self.time_label_white = tk.Label(frame, text="05:00", font=('Courier', 20, 'bold'), bg=UI_TIMER_INACTIVE,
-                                             fg=UI_FG, width=6, padx=5)
+            self.time_label_white = tk.Label(frame, text=format_time(self.clock.remaining(WHITE)),
+                                             font=('Courier', 20, 'bold'), bg=UI_TIMER_INACTIVE, fg=UI_FG, width=7, padx=5)
             self.time_label_white.pack(side='right', padx=(10, 0))
             self.white_timer_bg = self.time_label_white
         else:
-            self.time_label_black = tk.Label(frame, text="05:00", font=('Courier', 20, 'bold'), bg=UI_TIMER_INACTIVE,
-                                             fg=UI_FG, width=6, padx=5)
+            self.time_label_black = tk.Label(frame, text=format_time(self.clock.remaining(BLACK)),
+                                             font=('Courier', 20, 'bold'), bg=UI_TIMER_INACTIVE, fg=UI_FG, width=7, padx=5)
             self.time_label_black.pack(side='right', padx=(10, 0))
             self.black_timer_bg = self.time_label_black
         capture_frame = tk.Frame(frame, bg=UI_BG_SECONDARY)
@@ -1167,6 +907,14 @@ class ChessApp(tk.Tk):
             self.canvas.create_text(text_x, self.board_px - offset, anchor='se', text=files_display[i],
                                     fill=coord_color, font=('Arial', 9))
 
+        for pm in self.premoves.moves:
+            for sq in (pm.from_sq, pm.to_sq):
+                cr, cc = self.board_to_canvas(*sq)
+                x1 = cc * self.square_size;
+                y1 = cr * self.square_size
+                self.canvas.create_rectangle(x1, y1, x1 + self.square_size, y1 + self.square_size,
+                                             outline=PREMOVE_COLOR, width=3)
+
         st, winner = self.board.game_status()
 
         # Gestion du texte de statut et sauvegarde
@@ -1174,6 +922,7 @@ class ChessApp(tk.Tk):
         if st == 'checkmate':
             if not self.game_over:
                 self.game_over = True
+                self._stop_clock()
                 if self.game_mode != 'lan': self.start_button.config(text="Partie terminée")
                 if not self.is_analyzing_saved_game: self.save_game(st)
                 winner_str = 'Les Blancs' if winner == WHITE else 'Les Noirs'
@@ -1183,6 +932,7 @@ class ChessApp(tk.Tk):
         elif st in ('stalemate', 'draw'):
             if not self.game_over:
                 self.game_over = True
+                self._stop_clock()
                 if self.game_mode != 'lan': self.start_button.config(text="Partie terminée")
                 if not self.is_analyzing_saved_game: self.save_game(st)
                 if self.game_mode == 'lan': self.handle_lan_end_game()
@@ -1194,7 +944,8 @@ class ChessApp(tk.Tk):
                 status_text = f"Trait aux {'Blancs' if self.board.turn == WHITE else 'Noirs'}"
 
         if self.game_mode == 'lan':
-            status_text += " (LAN)"
+            status_text += {'reconnecting': " (LAN - reconnexion...)", 'lost': " (LAN - déconnecté)"}.get(
+                self.link_state, " (LAN)")
 
         self.status.config(text=status_text)
 
@@ -1206,6 +957,7 @@ class ChessApp(tk.Tk):
 
     def handle_lan_end_game(self):
         """Gestion fin de partie LAN : Demande de revanche."""
+        if self.is_spectator: return
         res = messagebox.askyesno("Partie Terminée", "Voulez-vous proposer une revanche ?")
         if res:
             self.network_manager.send_packet("CMD:REMATCH")
@@ -1213,14 +965,10 @@ class ChessApp(tk.Tk):
             pass
 
     def on_click_move(self, event):
-        if self.animating: return
-
-        if self.game_mode == 'lan':
-            if self.network_manager.is_host and self.board.turn == BLACK: return
-            if not self.network_manager.is_host and self.board.turn == WHITE: return
+        if self.animating or self.is_spectator: return
 
-        if len(self.board.history) != len(self.full_history_data) and len(self.full_history_data) > 0:
-            self.restore_position(len(self.full_history_data) - 1, animate=False)
+        if len(self.board.history) != len(self.game_record) and len(self.game_record) > 0:
+            self.restore_position(len(self.game_record) - 1, animate=False)
 
         if not self.started and self.board.game_status()[0] == 'ongoing':
             self.started = True
@@ -1234,6 +982,10 @@ class ChessApp(tk.Tk):
         br, bc = self.canvas_to_board(row, col)
         piece = self.board.board[br][bc]
 
+        if self.game_mode == 'lan' and self.board.turn != self.premoves.color:
+            self._premove_click(br, bc)
+            return
+
         if self.selected is None:
             if piece and self.board.piece_color(piece) == self.board.turn:
                 self.selected = (br, bc)
@@ -1242,7 +994,6 @@ class ChessApp(tk.Tk):
             else:
                 return
         else:
-            fr, fc = self.selected
             if piece and self.board.piece_color(piece) == self.board.turn:
                 self.selected = (br, bc)
                 self.compute_legal_targets(br, bc)
@@ -1250,7 +1001,7 @@ class ChessApp(tk.Tk):
                 return
 
             end_sq = (br, bc)
-            legal = self.board.generate_moves(legal=True)
+            legal = self.positions.legal_moves(self.board)
             candidates = [m for m in legal if m.from_sq == self.selected and m.to_sq == end_sq]
 
             chosen_move = None
@@ -1266,19 +1017,13 @@ class ChessApp(tk.Tk):
                 chosen_move = candidates[0]
 
             if chosen_move:
-                move_copy = copy.deepcopy(chosen_move)
-                self.full_history_data.append(move_copy)
-                self.board.push_move(chosen_move)
-                self.last_move_squares = (fr, fc), (br, bc)
-                if chosen_move.captured:
-                    c = WHITE if chosen_move.piece.isupper() else BLACK
-                    if c == WHITE:
-                        self.captured_by_white.append(chosen_move.captured)
-                    else:
-                        self.captured_by_black.append(chosen_move.captured)
+                # Les coups de positions.legal_moves appartiennent au cache : push joue une copie
+                chosen_move = self.positions.push(self.board, chosen_move.uci())
+                self._note_move(chosen_move)
 
                 if self.game_mode == 'lan':
                     self.network_manager.send_packet(chosen_move.uci())
+                    self._broadcast_spectators(chosen_move.uci())
 
                 self.drawn_annotations = []
                 self.history_widget.deselect_all_cells()
@@ -1290,8 +1035,27 @@ class ChessApp(tk.Tk):
                 self.legal_targets = []
                 self.draw_board()
 
+    def _premove_click(self, br, bc):
+        """Pendant le trait adverse (LAN) : sélection puis mise en file d'un coup anticipé."""
+        if self.selected and (br, bc) in self.legal_targets:
+            promotion = None
+            if self.premoves.is_promotion(self.board, self.selected, (br, bc)):
+                promotion = self.ask_promotion()
+            if promotion or not self.premoves.is_promotion(self.board, self.selected, (br, bc)):
+                self.premoves.push(self.board, self.selected, (br, bc), promotion)
+            self.selected = None
+            self.legal_targets = []
+        else:
+            targets = self.premoves.targets(self.board, (br, bc))
+            self.selected = (br, bc) if targets else None
+            self.legal_targets = list(targets)
+        self.draw_board()
+
     def on_right_click_clear(self, event):
         self.drawn_annotations = []
+        self.premoves.clear()
+        self.selected = None
+        self.legal_targets = []
         self.draw_board()
 
     def on_ctrl_click_start(self, event):
@@ -1333,18 +1097,15 @@ class ChessApp(tk.Tk):
         self.draw_board()
 
     def save_game(self, status: str):
-        if not self.full_history_data: return
+        if not len(self.game_record): return
         game_name = f"Partie {len(self.saved_games) + 1} ({status.capitalize()})"
-        self.saved_games.append((game_name, copy.deepcopy(self.full_history_data)))
+        self.saved_games.append((game_name, self.game_record))
         self.games_tab.refresh_list()
 
     def on_undo(self):
         if not self.board.history: return
-        if self.full_history_data: self.full_history_data.pop()
         if self.clock_history:
-            w, b = self.clock_history.pop()
-            self.time_left[WHITE] = w;
-            self.time_left[BLACK] = b
+            self.clock.restore(self.clock_history.pop())
 
         last = self.board.history[-1][0] if self.board.history else None
         if last and last.captured:
@@ -1355,6 +1116,9 @@ class ChessApp(tk.Tk):
                 if self.captured_by_black: self.captured_by_black.pop()
 
         self.board.undo_move()
+        self.game_record = self.board.record()
+        if self.clock.running: self.clock.start(self.board.turn)
+        self._schedule_clock()
         self.last_move_squares = self._get_last_move_from_history()
         self.selected = None;
         self.legal_targets = [];
@@ -1367,7 +1131,7 @@ class ChessApp(tk.Tk):
 
     def on_new(self):
         is_finished = self.board.game_status()[0] != 'ongoing'
-        if self.full_history_data and not is_finished and not self.is_analyzing_saved_game:
+        if len(self.game_record) and not is_finished and not self.is_analyzing_saved_game:
             self.save_game("Abandon")
 
         self.board = Board()
@@ -1378,20 +1142,39 @@ class ChessApp(tk.Tk):
         self.started = False
         self.is_analyzing_saved_game = False
         if self.game_mode != 'lan': self.start_button.config(text="Commencer la partie")
-        self.time_left = {WHITE: self.init_seconds, BLACK: self.init_seconds}
+        self.clock = GameClock(self.time_control)
+        self._schedule_clock()
         self.clock_history = []
         self.captured_by_white = []
         self.captured_by_black = []
         self.drawn_annotations = []
-        self.full_history_data = []
+        self.game_record = self.board.record()
         self.last_move_squares = None
         self.draw_board()
         self.info_tab.refresh_info()
         self.games_tab.refresh_list()
 
+    def _get_last_move_from_history(self):
+        if not self.board.history: return None
+        last = self.board.history[-1][0]
+        return last.from_sq, last.to_sq
+
+    def restore_position(self, index: int, animate: bool = False):
+        """Reconstruit la position après le coup d'indice index de game_record."""
+        self.board, _ = self.positions.replay(self.game_record, index + 1)
+        self.captured_by_white = []
+        self.captured_by_black = []
+        for m, _ in self.board.history:
+            if m.captured:
+                (self.captured_by_white if m.piece.isupper() else self.captured_by_black).append(m.captured)
+        self.last_move_squares = self._get_last_move_from_history()
+        self.selected = None
+        self.legal_targets = []
+        self.draw_board()
+
     def compute_legal_targets(self, fr, fc):
         self.legal_targets = []
-        for m in self.board.generate_moves(legal=True):
+        for m in self.positions.legal_moves(self.board):
             if m.from_sq == (fr, fc): self.legal_targets.append(m.to_sq)
 
     def ask_promotion(self):
@@ -1409,15 +1192,23 @@ class ChessApp(tk.Tk):
         self.wait_window(top)
         return res['val']
 
+    def _record_sans(self) -> List[str]:
+        """SAN des coups de game_record, rejoués dans le graphe des positions (déjà calculées en général)."""
+        record, sans = self._record_moves_cache
+        if record is self.game_record: return sans
+        _, sans = self.positions.replay(self.game_record)
+        self._record_moves_cache = (self.game_record, sans)
+        return sans
+
     def refresh_history(self):
         self.history_widget.clear()
-        moves = self.full_history_data
-        if not moves: return
-        count = len(moves)
+        sans = self._record_sans()
+        if not sans: return
+        count = len(sans)
         n_rows = count // 2 + (count % 2)
         for i in range(n_rows):
-            wm = move_to_readable(moves[i * 2]) if i * 2 < count else ""
-            bm = move_to_readable(moves[i * 2 + 1]) if i * 2 + 1 < count else ""
+            wm = sans[i * 2] if i * 2 < count else ""
+            bm = sans[i * 2 + 1] if i * 2 + 1 < count else ""
             self.history_widget.add_row(i + 1, wm, bm)
         self.history_widget.tree.yview_moveto(1.0)
 
@@ -1440,14 +1231,21 @@ class ChessApp(tk.Tk):
         if self.game_mode == 'lan':
             messagebox.showwarning("Interdit", "Impossible de changer le temps en partie LAN.")
             return
-        val = simpledialog.askinteger("Temps", "Minutes:", initialvalue=5, minvalue=1, parent=parent)
-        if val:
-            self.init_seconds = val * 60
+        spec = ask_time_control(parent, str(self.time_control))
+        if spec:
+            self.time_control = TimeControl.parse(spec)
             self.on_new()
 
+    def _refresh_clock_text(self, color):
+        """Ne touche au libellé que si le texte affiché change."""
+        text = format_time(self.clock.remaining(color))
+        if text != self._clock_text[color]:
+            self._clock_text[color] = text
+            (self.time_label_white if color == WHITE else self.time_label_black).config(text=text)
+
     def update_clock_labels(self):
-        self.time_label_white.config(text=self._fmt_time(self.time_left[WHITE]))
-        self.time_label_black.config(text=self._fmt_time(self.time_left[BLACK]))
+        self._refresh_clock_text(WHITE)
+        self._refresh_clock_text(BLACK)
         # Couleurs actives/inactives
         if self.started and not self.game_over:
             if self.board.turn == WHITE:
@@ -1460,23 +1258,45 @@ class ChessApp(tk.Tk):
             self.white_timer_bg.config(bg=UI_TIMER_INACTIVE)
             self.black_timer_bg.config(bg=UI_TIMER_INACTIVE)
 
-    def _fmt_time(self, s):
-        return f"{s // 60:02d}:{s % 60:02d}"
-
     def on_start(self):
         if not self.started: self.started = True;
+        if self.clock.running is None and not self.game_over: self.clock.start(self.board.turn)
+        self._schedule_clock()
         if self.game_mode != 'lan': self.start_button.config(text="En cours")
 
+    def _schedule_clock(self):
+        """
+        Arme _tick pour le prochain changement visible de la pendule en marche ;
+        aucun réveil tant qu'aucune pendule ne tourne (avant le début, après la fin,
+        pendant la consultation d'une partie sauvegardée).
+        """
+        if self._clock_job is not None:
+            self.after_cancel(self._clock_job)
+            self._clock_job = None
+        color = self.clock.running
+        if color and self.started and not self.game_over:
+            delay = next_display_change(self.clock.remaining(color))
+            self._clock_job = self.after(max(1, math.ceil(delay * 1000)), self._tick)
+
+    def _stop_clock(self):
+        self.clock.stop()
+        self._schedule_clock()
+
     def _tick(self):
-        if self.started and not self.animating and not self.game_over:
-            self.time_left[self.board.turn] -= 1
-            if self.time_left[self.board.turn] <= 0:
-                self.game_over = True
-                if self.game_mode != 'lan': self.start_button.config(text="Temps écoulé")
-                if not self.is_analyzing_saved_game: self.save_game("Temps")
-                messagebox.showinfo("Fin", "Temps écoulé !")
+        # Le temps vient de la pendule (time.monotonic) : seul le libellé du camp au trait est redessiné
+        self._clock_job = None
+        color = self.clock.running
+        if not (self.started and not self.game_over and color): return
+        if self.clock.flagged(color):
+            self.game_over = True
+            self._stop_clock()
             self.update_clock_labels()
-        self.after(1000, self._tick)
+            if self.game_mode != 'lan': self.start_button.config(text="Temps écoulé")
+            if not self.is_analyzing_saved_game: self.save_game("Temps")
+            messagebox.showinfo("Fin", "Temps écoulé !")
+            return
+        self._refresh_clock_text(color)
+        self._schedule_clock()
 
     def toggle_theme(self, theme):
         self.current_theme = theme
@@ -1515,7 +1335,39 @@ class ChessApp(tk.Tk):
         ttk.Button(top, text="Clair", command=lambda: self.toggle_theme('light'), style='Dark.TButton').pack(pady=5)
         ttk.Button(top, text="Retourner", command=self.flip_board, style='Dark.TButton').pack(pady=5)
         ttk.Button(top, text="Temps", command=lambda: self._set_time_dialog(top), style='Dark.TButton').pack(pady=5)
+        self._build_profiling_overlay(top)
+
+    def _build_profiling_overlay(self, top):
+        """Panneau de débogage : coût par image et compteurs des chemins chauds."""
+        enabled = tk.BooleanVar(top, value=PROFILER.enabled)
+
+        def toggle():
+            PROFILER.enable() if enabled.get() else PROFILER.disable()
+
+        tk.Checkbutton(top, text="Profilage", variable=enabled, command=toggle, bg=UI_BG_PRIMARY, fg=UI_FG,
+                       selectcolor=UI_BG_SECONDARY, activebackground=UI_BG_PRIMARY).pack(pady=5)
+        overlay = tk.Label(top, text="", justify='left', anchor='w', bg=UI_BG_SECONDARY, fg=UI_FG,
+                           font=('Courier', 9))
+        overlay.pack(fill='x', padx=5, pady=5)
+        ttk.Button(top, text="Exporter JSON", style='Dark.TButton',
+                   command=lambda: PROFILER.dump_json(f"profil_{time.strftime('%Y%m%d_%H%M%S')}.json")).pack(pady=5)
+
+        def update():
+            if not top.winfo_exists(): return
+            if PROFILER.enabled:
+                frame = PROFILER.stats['ChessApp.draw_board'].last * 1000
+                overlay.config(text=f"Image (draw_board) : {frame:.2f} ms\n\n{PROFILER.summary()}")
+            else:
+                overlay.config(text="Profilage désactivé.")
+            top.after(PROFILING_OVERLAY_MS, update)
+
+        update()
+
 
+# Méthodes de l'interface suivies par le profileur (en plus de celles du Board)
+PROFILER.register(ChessApp, 'draw_board')
+PROFILER.register(ChessApp, 'refresh_history')
+PROFILER.register(InfoTab, 'refresh_info')
 
 # ---------------- main ----------------
 if __name__ == "__main__":
@@ -1523,5 +1375,5 @@ if __name__ == "__main__":
     menu.mainloop()
 
     if menu.mode:
-        app = ChessApp(mode=menu.mode, network_config=menu.network_config, initial_time_seconds=menu.initial_time)
+        app = ChessApp(mode=menu.mode, network_config=menu.network_config, time_control=menu.time_control)
         app.mainloop()
\ No newline at end of file
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration commune des tests : racine du dépôt dans sys.path et parties
+aléatoires à graine fixe.
+
+Le nombre de parties et la graine se règlent en ligne de commande, pour
+valider un générateur optimisé à plus grande échelle :
+    python -m pytest tests --fuzz-games 2000 --fuzz-seed 7
+"""
+import collections
+import os
+import random
+import sys
+from typing import Iterator, Tuple
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from echecs.engine import Board, chess960_fen  # noqa: E402
+
+DEFAULT_FUZZ_GAMES = 20
+MAX_PLIES = 160
+CHESS960_EVERY = 3  # une partie sur trois part d'une position Chess960
+
+
+def pytest_addoption(parser):
+    parser.addoption('--fuzz-games', type=int, default=DEFAULT_FUZZ_GAMES,
+                     help="parties aléatoires par test d'invariants")
+    parser.addoption('--fuzz-seed', type=int, default=0, help="graine des parties aléatoires")
+
+
+def random_game(seed: int, max_plies: int = MAX_PLIES) -> Iterator[Board]:
+    """
+    Partie aléatoire reproductible : le même Board est rendu avant chaque
+    demi-coup (le test peut jouer et annuler des coups, à condition de le
+    laisser dans l'état reçu), jusqu'à la fin de la partie ou max_plies.
+    """
+    rng = random.Random(seed)
+    board = Board(chess960_fen(rng.randrange(960)), chess960=True) if seed % CHESS960_EVERY == 0 else Board()
+    for _ in range(max_plies):
+        yield board
+        if board.game_status()[0] != 'ongoing': return
+        board.push_move(rng.choice(board.generate_moves(legal=True)))
+    yield board
+
+
+def _seeds(config) -> range:
+    first = config.getoption('--fuzz-seed') * 1_000_003
+    return range(first, first + config.getoption('--fuzz-games'))
+
+
+@pytest.fixture
+def fuzz_positions(request) -> Iterator[Tuple[int, Board]]:
+    """(graine, plateau) pour chaque position de chaque partie aléatoire."""
+    return ((seed, board) for seed in _seeds(request.config) for board in random_game(seed))
+
+
+@pytest.fixture
+def fuzz_games(request) -> Iterator[Tuple[int, Board]]:
+    """(graine, plateau en fin de partie) pour chaque partie aléatoire."""
+    return ((seed, collections.deque(random_game(seed), maxlen=1)[0]) for seed in _seeds(request.config))
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Invariants de Board sur des parties aléatoires : push_move puis undo_move
+rend exactement l'état de départ, l'état incrémental (clé de Zobrist,
+matériel, listes de pièces) vaut celui d'un plateau recréé depuis la FEN, et
+la FEN fait l'aller-retour.
+"""
+import collections
+
+from echecs import zobrist
+from echecs.engine import Board, chess960_fen
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def snapshot(board: Board) -> dict:
+    """Tout l'état que push_move / undo_move doivent préserver, en copie."""
+    return {
+        'board': [row[:] for row in board.board],
+        'castling_rights': dict(board.castling_rights),
+        'en_passant_target': board.en_passant_target,
+        'halfmove_clock': board.halfmove_clock,
+        'fullmove_number': board.fullmove_number,
+        'turn': board.turn,
+        'hash': board.hash,
+        'material': dict(board.material),
+        'pst_score': dict(board.pst_score),
+        'piece_squares': {color: set(squares) for color, squares in board.piece_squares.items()},
+        'king_sq': dict(board.king_sq),
+        'hash_history': list(board.hash_history),
+        'rep_counts': +board.rep_counts,  # sans les compteurs retombés à zéro
+        'move_codes': list(board.move_codes),
+        'history': len(board.history),
+        'fen': board.fen(),
+    }
+
+
+def incremental_state(board: Board) -> dict:
+    rooks = {sq: side for sq, side in board.castling_rooks.items() if board.castling_rights[side]}
+    return {
+        'hash': board.hash,
+        'material': board.material,
+        'pst_score': board.pst_score,
+        'piece_squares': board.piece_squares,
+        'king_sq': board.king_sq,
+        'castling_rights': board.castling_rights,
+        'castling_rooks': rooks,
+        'en_passant_target': board.en_passant_target,
+    }
+
+
+def test_push_undo_restores_state(fuzz_positions):
+    for seed, board in fuzz_positions:
+        before = snapshot(board)
+        for m in board.generate_moves(legal=True):
+            board.push_move(m)
+            assert board.hash == zobrist.position_hash(board), (seed, before['fen'], m.uci())
+            assert board.repetitions() == board.hash_history.count(board.hash)
+            board.undo_move()
+            assert snapshot(board) == before, (seed, before['fen'], m.uci())
+
+
+def test_incremental_state_matches_fresh_board(fuzz_positions):
+    for seed, board in fuzz_positions:
+        fresh = Board(board.fen(), chess960=board.chess960)
+        assert incremental_state(board) == incremental_state(fresh), (seed, board.fen())
+        assert board.evaluate() == fresh.evaluate()
+
+
+def test_fen_round_trip(fuzz_positions):
+    for seed, board in fuzz_positions:
+        fen = board.fen()
+        assert Board(fen, chess960=board.chess960).fen() == fen, seed
+        assert board._fen_for_repetition() == ' '.join(fen.split()[:4])
+        # set_fen sur un plateau déjà utilisé repart de zéro
+        reused = Board(chess960=board.chess960)
+        reused.push_move(reused.generate_moves(legal=True)[0])
+        reused.set_fen(fen)
+        assert reused.fen() == fen and reused.hash == board.hash
+        assert reused.hash_history == [reused.hash] and not reused.history
+    # Chess960 déduit de la FEN : une FEN classique remet le plateau en mode classique
+    reused = Board(chess960_fen(100))
+    assert reused.chess960
+    reused.set_fen(START_FEN)
+    assert reused.fen() == START_FEN and not reused.chess960 and reused.hash == Board().hash
+    reused.set_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    assert {m.uci() for m in reused.generate_moves(legal=True) if m.is_castle} == {'e1g1', 'e1c1'}
+    # Chess960 demandé au constructeur : conservé
+    reused = Board(chess960_fen(100), chess960=True)
+    reused.set_fen(START_FEN)
+    assert reused.chess960 and reused.fen() == Board(START_FEN, chess960=True).fen()
+
+
+def test_undo_back_to_start(fuzz_games):
+    for seed, board in fuzz_games:
+        final_fen, hashes, record = board.fen(), list(board.hash_history), board.record()
+        replayed = record.board()
+        assert replayed.fen() == final_fen and replayed.hash_history == hashes, seed
+        while board.history:
+            board.undo_move()
+            assert board.hash == zobrist.position_hash(board)
+        assert board.fen() == board.start_fen, seed
+        assert board.hash_history == [board.hash]
+        assert +board.rep_counts == collections.Counter({board.hash: 1})
+        # Le GameRecord pris avant l'annulation n'a pas bougé
+        assert len(record) == len(hashes) - 1 and record.board().fen() == final_fen
+
+
+def test_playout_is_reproducible_and_restores_board(fuzz_games):
+    for seed, board in fuzz_games:
+        before = snapshot(board)
+        status, winner, plies = board.playout(seed, max_plies=60)
+        assert snapshot(board) == before, seed
+        assert board.playout(seed, max_plies=60) == (status, winner, plies)
+        assert plies == 60 if status == 'ongoing' else plies <= 60
+        assert (winner is not None) == (status == 'checkmate')
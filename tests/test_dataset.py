@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Jeu de positions : aller-retour DatasetWriter -> PositionDataset, déduplication
+par clé de Zobrist et agrandissement du fichier projeté.
+"""
+import os
+import random
+
+import pytest
+
+from echecs.dataset import HEADER, RECORD, DatasetWriter, PositionDataset
+from echecs.engine import Board, Move
+
+
+def random_moves(seed: int, plies: int):
+    rng, board, moves = random.Random(seed), Board(), []
+    for _ in range(plies):
+        legal = board.generate_moves(legal=True)
+        if not legal: break
+        m = rng.choice(legal)
+        moves.append(m)
+        board.push_move(m)
+    return moves
+
+
+def positions(moves):
+    board = Board()
+    fens = [board._fen_for_repetition()]
+    for m in moves:
+        board.push_move(board.find_move_uci(m.uci()))
+        fens.append(board._fen_for_repetition())
+    return fens
+
+
+def test_round_trip_with_growth(tmp_path):
+    path = str(tmp_path / 'positions.bin')
+    games = [random_moves(seed, 40) for seed in range(3)]
+    with DatasetWriter(path, dedup=False, reserve=2) as writer:
+        for i, moves in enumerate(games):
+            assert writer.add_game(moves, 1 - i) == len(moves) + 1
+    expected = [(fen, 1 - i) for i, moves in enumerate(games) for fen in positions(moves)]
+    assert os.path.getsize(path) == HEADER.size + len(expected) * RECORD.size
+    with PositionDataset(path) as ds:
+        assert len(ds) == len(expected)
+        for i, (fen, result) in enumerate(expected):
+            assert ds.board(i)._fen_for_repetition() == fen
+            assert ds.result(i) == result
+
+
+def test_dedup_across_games_and_reopen(tmp_path):
+    path = str(tmp_path / 'positions.bin')
+    moves = random_moves(7, 30)
+    unique = len(set(positions(moves)))
+    with DatasetWriter(path, reserve=4) as writer:
+        assert writer.add_game(moves, 0) == unique
+        assert writer.add_game(moves, 0) == 0
+        assert writer.skipped == len(moves) + 1 + (len(moves) + 1 - unique)
+    # Réouverture : les clés déjà écrites sont relues
+    with DatasetWriter(path) as writer:
+        assert writer.count == unique
+        assert not writer.add(Board(), 0)
+        assert writer.add_game(random_moves(8, 10), 1) > 0
+    with PositionDataset(path) as ds:
+        assert ds.board(0).fen() == Board().fen()
+        keys = {Board(ds.board(i).fen()).position_hash() for i in range(len(ds))}
+        assert len(keys) == len(ds)
+
+
+def test_unplayable_move_stops_the_game(tmp_path):
+    path = str(tmp_path / 'positions.bin')
+    moves = random_moves(3, 6)
+    moves.insert(3, Move((0, 0), (5, 5), 'R'))  # a1f6 : impossible dans cette partie
+    with DatasetWriter(path, dedup=False) as writer:
+        assert writer.add_game(moves, 0) == 4
+    with PositionDataset(path) as ds:
+        assert [ds.board(i)._fen_for_repetition() for i in range(len(ds))] == positions(moves[:3])
+
+
+def test_records_view(tmp_path):
+    np = pytest.importorskip('numpy')
+    path = str(tmp_path / 'positions.bin')
+    moves = random_moves(11, 20)
+    with DatasetWriter(path, dedup=False, reserve=1) as writer:
+        writer.add_game(moves, -1)
+    with PositionDataset(path) as ds:
+        assert list(ds.records['ply']) == list(range(len(moves) + 1))
+        assert np.all(ds.records['result'] == -1)
+        assert ds.piece_codes().shape == (len(moves) + 1, 64)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Générateur de coups : perft contre les valeurs publiées (classique et
+Chess960), puis, sur des parties aléatoires, coups légaux et prises comparés
+à une génération de référence (pseudo-légaux filtrés en jouant le coup) et
+statut de partie comparé à un recalcul complet.
+"""
+import pytest
+
+from echecs.engine import Board
+
+# Profondeurs limitées pour garder la suite rapide ; benchmarks/perft.py va plus loin
+STANDARD = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", [20, 400, 8902]),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264]),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486]),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079]),
+]
+
+CHESS960 = [
+    ("bqnb1rkr/pp3ppp/3ppn2/2p5/5P2/P2P4/NPP1P1PP/BQ1BNRKR w HFhf - 2 9", [21, 528]),
+    ("2nnrbkr/p1qppppp/8/1ppb4/6PP/3PP3/PPP2P2/BQNNRBKR w HEhe - 1 9", [21, 807]),
+    ("b1q1rrkb/pppppppp/3nn3/8/P7/1PPP4/4PPPP/BQNNRKRB w GE - 1 9", [20, 479]),
+    ("qbbnnrkr/2pp2pp/p7/1p2pp2/8/P3PP2/1PPP1KPP/QBBNNR1R w hf - 0 9", [22, 593]),
+    ("1nbbnrkr/p1p1ppp1/3p4/1p3P1p/3Pq2P/8/PPP1P1P1/QNBBNRKR w HFhf - 0 9", [28, 1120]),
+]
+
+
+def perft(board: Board, depth: int) -> int:
+    if depth == 0: return 1
+    n = 0
+    for m in board.generate_moves(legal=True):
+        board.push_move(m)
+        n += perft(board, depth - 1)
+        board.undo_move()
+    return n
+
+
+@pytest.mark.parametrize('fen, expected', STANDARD + CHESS960)
+def test_perft(fen, expected):
+    board = Board(fen)
+    assert [perft(board, depth) for depth in range(1, len(expected) + 1)] == expected
+    assert board.fen() == fen
+
+
+def reference_legal(board: Board) -> list:
+    """Pseudo-légaux dont le coup joué ne laisse pas le roi en échec."""
+    color, out = board.turn, []
+    for m in board.generate_moves(legal=False):
+        board.push_move(m)
+        if not board.king_in_check(color): out.append(m.uci())
+        board.undo_move()
+    return sorted(out)
+
+
+def test_legal_moves_match_reference(fuzz_positions):
+    for seed, board in fuzz_positions:
+        legal = sorted(m.uci() for m in board.generate_moves(legal=True))
+        assert len(set(legal)) == len(legal), (seed, board.fen())
+        assert legal == reference_legal(board), (seed, board.fen())
+
+
+def test_captures_match_legal_moves(fuzz_positions):
+    for seed, board in fuzz_positions:
+        moves = board.generate_moves(legal=True)
+        expected = sorted(m.uci() for m in moves if (m.captured and not m.is_castle) or m.promotion)
+        assert sorted(m.uci() for m in board.generate_captures(legal=True)) == expected, (seed, board.fen())
+
+
+def test_find_move_uci_round_trip(fuzz_positions):
+    for seed, board in fuzz_positions:
+        moves = board.generate_moves(legal=True)
+        # find_move_uci régénère tous les coups : un coup ordinaire et tous les coups spéciaux
+        for m in moves[:1] + [m for m in moves if m.is_castle or m.promotion or m.is_en_passant]:
+            found = board.find_move_uci(m.uci())
+            assert found is not None and (found.from_sq, found.to_sq, found.promotion, found.is_castle) == (
+                m.from_sq, m.to_sq, m.promotion, m.is_castle), (seed, board.fen(), m.uci())
+
+
+def test_game_status_matches_full_recount(fuzz_positions):
+    for seed, board in fuzz_positions:
+        if not board.generate_moves(legal=True):
+            expected = ('checkmate', board._opponent(board.turn)) if board.king_in_check(board.turn) \
+                else ('stalemate', None)
+        elif board.halfmove_clock >= 100 or board.hash_history.count(board.hash) >= 3:
+            expected = ('draw', None)
+        else:
+            expected = ('ongoing', None)
+        assert board.game_status() == expected, (seed, board.fen())
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Liaison LAN : un message envoyé juste après le rejeu (poignée de main de
+reprise terminée, liaison pas encore déclarée rétablie) doit arriver au pair,
+et un spectateur rejoint le SpectatorHub sur le port qui lui est donné.
+"""
+import threading
+
+from echecs.network import NetworkManager
+
+
+def _pair():
+    host = NetworkManager(is_host=True, port=0)
+    client = NetworkManager(is_host=False, ip='127.0.0.1', port=host.socket.getsockname()[1])
+    accepted = threading.Thread(target=host.connect)
+    accepted.start()
+    assert client.connect()
+    accepted.join(5)
+    assert host.connected and client.connected
+    return host, client
+
+
+def test_packet_sent_right_after_resume_reaches_peer():
+    host, client = _pair()
+    try:
+        client.send_packet('e2e4')
+        assert host.receive_packet() == 'e2e4'
+
+        # Le fil de l'interface envoie un coup dès la fin de la poignée de main de reprise
+        handshake = client._handshake
+
+        def handshake_then_send():
+            ok = handshake()
+            if ok: client.send_packet('g1f3')
+            return ok
+
+        client._handshake = handshake_then_send
+        received = []
+        reader = threading.Thread(target=lambda: received.append(host.receive_packet()))
+        reader.start()
+        client.conn.close()  # coupure : l'hôte voit la fin du flux et attend la reprise
+        assert client._reconnect()
+        reader.join(10)
+        assert received == ['g1f3']
+        assert client.link_up and host.link_up
+    finally:
+        client.close()
+        host.close()
+
+
+def test_spectator_connects_to_its_own_port():
+    host = NetworkManager(is_host=True, port=0)
+    hub = host.enable_spectators(port=0)
+    hub.set_snapshot('SNAP:8/8/8/8/8/8/8/K6k w - - 0 1|60.000|60.000')
+    viewer = NetworkManager(is_host=False, ip='127.0.0.1', spectator=True, port=hub.port)
+    try:
+        assert viewer.connect()
+        assert viewer.receive_packet().startswith('SNAP:')
+        host.broadcast('a1a2')
+        assert viewer.receive_packet() == 'a1a2'
+    finally:
+        viewer.close()
+        host.close()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Graphe des positions : les coups mis en cache ne sont jamais ceux que le
+plateau joue (push_move écrit dans Move), et replay redonne la partie.
+"""
+from echecs.engine import Board
+from echecs.pgn import move_to_san
+from echecs.positions import PositionGraph
+
+# Prise en passant, roque et promotion avec prise
+LINE = ['e2e4', 'g8f6', 'e4e5', 'd7d5', 'e5d6', 'e7d6', 'g1f3', 'f8e7', 'f1c4', 'e8g8', 'e1g1', 'b7b5', 'c4b5',
+        'c7c5', 'b5a4', 'c5c4', 'b2b3', 'c4b3', 'c2c3', 'b3a2', 'd2d3', 'a2b1q']
+
+
+def test_pushed_moves_are_copies_of_cached_moves():
+    graph, board = PositionGraph(), Board()
+    for uci in LINE:
+        cached = {id(m) for m in graph.legal_moves(board)}
+        played = graph.push(board, uci)
+        assert played is not None and id(played) not in cached
+        assert id(board.history[-1][0]) not in cached
+
+
+def test_replay_matches_game_record():
+    graph, board = PositionGraph(), Board()
+    sans = []
+    for uci in LINE:
+        m = board.find_move_uci(uci)
+        sans.append(move_to_san(board, m))
+        board.push_move(m)
+    replayed, replay_sans = graph.replay(board.record())
+    assert replayed.fen() == board.fen() and replay_sans == sans
+    half, _ = graph.replay(board.record(), 7)
+    assert half.fen() == board.record().board(7).fen()
+
+
+def test_standard_and_chess960_positions_are_distinct_nodes():
+    fen = "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"
+    graph, standard, c960 = PositionGraph(), Board(fen), Board(fen, chess960=True)
+    assert graph.push(standard, 'e1g1') is not None
+    assert Board(fen) in graph and c960 not in graph
+    assert graph.push(Board(fen, chess960=True), 'e1g1') is None
+    assert graph.push(c960, 'e1h1') is not None
+    assert c960.fen().split()[0] == standard.fen().split()[0]
+    assert len(graph) == 4
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Profileur : les appels faits hors du fil principal (analyse, réseau) sont
+comptés à part, et désactiver remet les méthodes d'origine.
+"""
+import threading
+
+from echecs.engine import Board
+from echecs.profiling import Profiler
+
+
+def test_background_threads_are_reported_separately():
+    original = Board.__dict__['generate_moves']
+    profiler = Profiler()
+    profiler.register(Board, 'generate_moves', 'gen')
+    profiler.enable()
+    try:
+        board = Board()
+        board.generate_moves()
+        worker = threading.Thread(target=lambda: [Board().generate_moves() for _ in range(3)])
+        worker.start()
+        worker.join()
+    finally:
+        profiler.disable()
+    assert profiler.stats['gen'].count == 1
+    assert profiler.background_stats['gen'].count == 3
+    assert 'Autres fils' in profiler.summary()
+    assert Board.__dict__['generate_moves'] is original
+    board.generate_moves()
+    assert profiler.stats['gen'].count == 1
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Scores de mat et table de transposition : une entrée rangée à un demi-coup
+donné doit redonner la bonne distance au mat quand on la relit à un autre
+(table dict de Search et SharedTT de la recherche parallèle). Seul un dict
+est vidé quand il atteint TT_MAX_ENTRIES.
+"""
+import pytest
+
+from echecs import search as search_module
+from echecs.engine import Board
+from echecs.search import INF, MATE, Search, mate_in
+from echecs.smp import SharedTT
+
+MATE_IN_ONE = "k7/8/1K6/8/8/8/8/7R w - - 0 1"  # Th8#
+
+
+@pytest.fixture(params=['dict', 'shared'])
+def tt(request):
+    if request.param == 'dict':
+        yield {}
+    else:
+        table = SharedTT(1)
+        yield table
+        table.close()
+
+
+def test_mate_distance_survives_tt_at_another_ply(tt):
+    search = Search(Board(MATE_IN_ONE), tt)
+    assert search._negamax(2, -INF, INF, 1) == MATE - 2
+    # Même position relue dans la table, quatre demi-coups plus loin de la racine
+    assert search._negamax(2, -INF, INF, 5) == MATE - 6
+    assert Search(Board(MATE_IN_ONE), {})._negamax(2, -INF, INF, 5) == MATE - 6
+
+
+def test_mated_score_survives_tt_at_another_ply(tt):
+    # Noirs au trait : seul Rb8 est jouable, puis Th8#
+    search = Search(Board(MATE_IN_ONE.replace(' w ', ' b ')), tt)
+    assert search._negamax(3, -INF, INF, 1) == -(MATE - 3)
+    assert search._negamax(3, -INF, INF, 5) == -(MATE - 7)
+
+
+def test_iterate_reports_mate_in_one():
+    info = Search(Board(MATE_IN_ONE)).iterate(max_depth=3)
+    assert mate_in(info['lines'][0][0]) == 1
+    assert info['lines'][0][1][0].uci() == 'h1h8'
+
+
+def test_only_dict_tables_are_cleared(monkeypatch):
+    monkeypatch.setattr(search_module, 'TT_MAX_ENTRIES', 8)
+    search = Search(Board())
+    search.iterate(max_depth=3)
+    assert 0 < len(search.tt) <= 8
+    shared = SharedTT(1)
+    try:
+        Search(Board(), shared).iterate(max_depth=3)
+        assert shared.get(Board().position_hash()) is not None
+    finally:
+        shared.close()
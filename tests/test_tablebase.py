@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Tables de finales : l'échec testé pièce par pièce vaut Board.king_in_check, et
+les coups à rebours sont exactement l'inverse des coups sans prise ni
+promotion de Board (sans quoi la propagation rétrograde fausserait la table).
+"""
+import random
+
+import pytest
+
+from echecs.engine import BLACK, WHITE, Board
+from echecs.tablebase import _in_check, _unmoves, parse_name
+
+MATERIAL = ['KQvKR', 'KPvKN', 'KBvKP', 'KRvKB']
+
+
+def random_placements(name: str, count: int, seed: int):
+    rng, pieces = random.Random(seed), parse_name(name)
+    for _ in range(count):
+        squares = rng.sample(range(64), len(pieces))
+        if any(p.upper() == 'P' and sq >> 3 in (0, 7) for p, sq in zip(pieces, squares)): continue
+        yield pieces, squares, rng.choice((WHITE, BLACK))
+
+
+def grid_board(pieces, squares, stm) -> Board:
+    board = Board('8/8/8/8/8/8/8/8 w - - 0 1')
+    for p, sq in zip(pieces, squares):
+        board.board[sq >> 3][sq & 7] = p
+    board.turn = stm
+    board._refresh_incremental()
+    return board
+
+
+@pytest.mark.parametrize('name', MATERIAL)
+def test_in_check_matches_board(name):
+    for pieces, squares, _ in random_placements(name, 400, 1):
+        board = grid_board(pieces, squares, WHITE)
+        for color in (WHITE, BLACK):
+            assert _in_check(pieces, squares, color) == board.king_in_check(color), (squares, color)
+
+
+@pytest.mark.parametrize('name', MATERIAL)
+def test_unmoves_invert_quiet_moves(name):
+    for pieces, squares, stm in random_placements(name, 60, 2):
+        mover_white = stm == BLACK
+        expected = set()
+        for i, (p, sq) in enumerate(zip(pieces, squares)):
+            if p.isupper() != mover_white: continue
+            for prev in set(range(64)) - set(squares):
+                parent = list(squares)
+                parent[i] = prev
+                if p.upper() == 'P' and prev >> 3 in (0, 7): continue
+                board = grid_board(pieces, parent, WHITE if mover_white else BLACK)
+                if any(m.to_sq == (sq >> 3, sq & 7) and not m.captured and not m.promotion
+                       for m in board._piece_moves(prev >> 3, prev & 7, p, False)):
+                    expected.add((i, prev))
+        assert set(_unmoves(pieces, squares, stm)) == expected, (squares, stm)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Tournoi : spécification des moteurs (profondeur, évaluation importée),
+attribution des résultats à A quand les deux configurations sont identiques,
+et marge Elo tant qu'aucune partie n'est décisive.
+"""
+import math
+
+import pytest
+
+from echecs.engine import Board
+from echecs.search import Search
+from echecs.tournament import EngineConfig, MatchStats, schedule
+
+
+def test_engine_spec():
+    assert EngineConfig.parse('base') == EngineConfig('base')
+    assert EngineConfig.parse('base:3') == EngineConfig('base', 3)
+    config = EngineConfig.parse('pst:2@echecs.engine:Board.evaluate')
+    assert (config.max_depth, config.evaluate) == (2, 'echecs.engine:Board.evaluate')
+    assert config.evaluation() is Board.evaluate
+    assert config.player().evaluate is Board.evaluate
+    with pytest.raises(ValueError):
+        EngineConfig.parse('x@echecs.engine')
+    with pytest.raises(AttributeError):
+        EngineConfig.parse('x@echecs.engine:absent')
+
+
+def test_search_uses_custom_evaluation():
+    calls = []
+
+    def material_only(board: Board) -> int:
+        calls.append(board.position_hash())
+        return board.material['w'] - board.material['b']
+
+    Search(Board(), evaluate=material_only).iterate(max_depth=2)
+    assert calls
+
+
+def test_identical_configs_split_colours():
+    a = b = EngineConfig('same', 2)
+    jobs = list(schedule(a, b, ['8/8/8/8/8/8/8/K6k w - - 0 1'], 4, '1+0'))
+    assert [job.a_is_white for job in jobs] == [True, False, True, False]
+    stats = MatchStats()
+    for job in jobs: stats.add('1-0', job.a_is_white)  # les Blancs gagnent toujours
+    assert (stats.wins, stats.losses) == (2, 2)
+
+
+def test_elo_margin_undefined_without_decisive_games():
+    stats = MatchStats()
+    for _ in range(4): stats.add('1/2-1/2', True)
+    elo, margin = stats.elo()
+    assert elo == 0.0 and math.isinf(margin)
+    assert '± ?' in str(stats)
+    stats.add('1-0', True)
+    assert math.isfinite(stats.elo()[1])
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+Validation des coups d'un hôte multi-parties : une partie classique et une
+partie Chess960 sur la même position ne partagent pas l'entrée du cache (le
+roque ne s'écrit pas pareil).
+"""
+from echecs.engine import Board
+from echecs.validation import MoveValidator
+
+FEN = "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"
+
+
+def test_standard_and_chess960_games_do_not_share_entries():
+    validator = MoveValidator()
+    standard, c960 = Board(FEN), Board(FEN, chess960=True)
+    assert standard.position_hash() != c960.position_hash()
+    assert validator.validate(standard, 'e1g1') is not None
+    assert validator.validate(standard, 'e1h1') is None
+    assert validator.validate(c960, 'e1g1') is None
+    assert validator.apply(c960, 'e1h1') is not None
+    assert c960.fen().split()[0] == "r3k2r/8/8/8/8/8/8/R4RK1"
+    assert 'e1h1' not in validator.legal_moves_by_uci(standard)
+    assert validator.apply(standard, 'e1g1') is not None
+    assert standard.fen().split()[0] == c960.fen().split()[0]